@@ -1,101 +1,179 @@
-import ifcopenshell
-import numpy as np
 import os
-import tkinter as tk
-from tkinter import messagebox, filedialog
-import customtkinter as ctk
-from tkinterdnd2 import DND_FILES, TkinterDnD
+import sys
+
+_MISSING = object()
+
+# Files at least this large (in MB) are opened in low-memory mode; unset means never
+LOW_MEMORY_ENV = 'IFC_ANALYZER_LOW_MEMORY_MB'
+
+
+def use_low_memory(ifc_path, low_memory=None):
+    """Resolves the low_memory argument: an explicit bool wins, None defers to the size threshold."""
+    if low_memory is not None:
+        return bool(low_memory)
+    threshold = os.environ.get(LOW_MEMORY_ENV)
+    if not threshold:
+        return False
+    try:
+        return os.path.getsize(ifc_path) >= float(threshold) * 1e6
+    except OSError:
+        return False
+
 
 class IFCAnalyzer:
-    def __init__(self, ifc_path):
+    """Model session for one IFC file.
+
+    The file is opened once, on first use, and the parsed model is shared by
+    every extractor in read_methods and calculate for the rest of the run.
+    With an ExtractionCache attached, results requested through cached() are
+    served from disk for files seen before, so the model is never opened.
+
+    With low_memory the file is streamed into a streamed_model.StreamedModel
+    holding only the entity types the analysis reads, instead of being
+    loaded whole by ifcopenshell, and its points into a memory-mapped
+    coordinate_store file (see store_path).
+    """
+    def __init__(self, ifc_path, cache=None, low_memory=None):
         self.ifc_path = ifc_path
         self.ifc_file = None
+        self.cache = cache
+        self.low_memory = use_low_memory(ifc_path, low_memory)
+        self._file_hash = None
+        self._property_index = None
+        self._derived = {}
+        self._store_dir = None
 
     def load_ifc_file(self):
+        if self.ifc_file is not None:
+            return self.ifc_file
         try:
-            self.ifc_file = ifcopenshell.open(self.ifc_path)
-            print(f"Successfully loaded IFC file: {self.ifc_path}")
+            if self.low_memory:
+                from streamed_model import StreamedModel
+                self.ifc_file = StreamedModel.open(self.ifc_path, point_store=self.store_path('points'))
+            else:
+                import ifcopenshell
+                self.ifc_file = ifcopenshell.open(self.ifc_path)
+            print(f"Successfully loaded IFC file: {self.ifc_path}" + (" (low-memory mode)" if self.low_memory else ""), file=sys.stderr)
         except Exception as e:
-            print(f"Error loading IFC file: {e}")
+            print(f"Error loading IFC file: {e}", file=sys.stderr)
             raise
+        return self.ifc_file
+
+    @property
+    def model(self):
+        """The opened ifcopenshell model, loaded on first access."""
+        return self.load_ifc_file()
+
+    @property
+    def schema(self):
+        return self.model.schema
+
+    def by_type(self, ifc_type):
+        return self.model.by_type(ifc_type)
+
+    @property
+    def file_hash(self):
+        """Content hash of the IFC file, computed once per session."""
+        if self._file_hash is None:
+            from extraction_cache import file_digest
+            self._file_hash = file_digest(self.ifc_path)
+        return self._file_hash
+
+    def store_path(self, name):
+        """Path for a coordinate store of this file: in the cache when one is
+        attached, so it outlives the session, else in a temporary directory
+        removed with the session."""
+        if self.cache is not None:
+            return self.cache.store_path(self.file_hash, name)
+        if self._store_dir is None:
+            import shutil
+            import tempfile
+            import weakref
+            self._store_dir = tempfile.mkdtemp(prefix='ifc_points_')
+            weakref.finalize(self, shutil.rmtree, self._store_dir, ignore_errors=True)
+        return os.path.join(self._store_dir, f"{name}.npy")
+
+    def memo_key(self):
+        """Identity of the model for stage_graph memo keys: its content hash."""
+        return self.file_hash
+
+    def cached(self, name, func, *args, **kwargs):
+        """Returns func(self, *args, **kwargs), going through the cache when one is attached.
+
+        name identifies the result in the cache and must change whenever the
+        arguments change what func returns.
+        """
+        if self.cache is None:
+            return func(self, *args, **kwargs)
+        value = self.cache.get(self.file_hash, name, default=_MISSING)
+        if value is _MISSING:
+            value = func(self, *args, **kwargs)
+            self.cache.put(self.file_hash, name, value)
+        return value
+
+    @property
+    def property_index(self):
+        """PropertyIndex over the model, built on first access."""
+        if self._property_index is None:
+            from property_index import PropertyIndex
+            self._property_index = PropertyIndex.build(self.model)
+        return self._property_index
+
+    def derived(self, name, build):
+        """Returns build(), computed once per session and kept in memory under name."""
+        if name not in self._derived:
+            self._derived[name] = build()
+        return self._derived[name]
+
+    def close(self):
+        """Drops the references to the parsed model so it can be freed."""
+        self.ifc_file = None
+        self._property_index = None
+        self._derived = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def extract_element_counts(self):
         """Extract counts of specific elements from the IFC file."""
-        if not self.ifc_file:
-            raise ValueError("IFC file is not loaded.")
-        
         element_counts = {
-            'IfcBeam': len(self.ifc_file.by_type('IfcBeam')),
-            'IfcColumn': len(self.ifc_file.by_type('IfcColumn'))
+            'IfcBeam': len(self.model.by_type('IfcBeam')),
+            'IfcColumn': len(self.model.by_type('IfcColumn'))
         }
         return element_counts
 
     def calculate_total_weight(self):
         """Calculate total weight from the IFC file."""
-        if not self.ifc_file:
-            raise ValueError("IFC file is not loaded.")
-        
-        total_weight = sum(quantity.WeightValue for quantity in self.ifc_file.by_type('IfcQuantityWeight') if quantity)
+        total_weight = sum(quantity.WeightValue for quantity in self.model.by_type('IfcQuantityWeight') if quantity)
         return round(total_weight, 2)
 
-class Application(TkinterDnD.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("IFC Analyzer")
-        self.geometry("400x300")
-        self.create_widgets()
-        self.register_drop_target()
-
-    def create_widgets(self):
-        self.result_label = ctk.CTkLabel(self, text="Drag and drop an IFC file here")
-        self.result_label.pack(pady=20)
-
-        self.analyze_button = ctk.CTkButton(self, text="Analyze", command=self.analyze_ifc)
-        self.analyze_button.pack(pady=10)
-
-        self.file_path = ""
-
-    def register_drop_target(self):
-        self.drop_target_register(DND_FILES)
-        self.dnd_bind('<<Drop>>', self.on_drop)
-
-    def on_drop(self, event):
-        dropped_file = event.data.replace("{","").replace("}", "")
-        dropped_file = os.path.normpath(dropped_file)
-        print(f"Dropped file data: {dropped_file}")  # Debugging line
-        
-        # Debugging: print the full event data
-        print(f"Full event data: {event.data}")
-        
-        if dropped_file.lower().endswith('.ifc'):
-            self.file_path = dropped_file
-            self.result_label.configure(text=f"Dropped file: {self.file_path}")
-        else:
-            messagebox.showerror("Error", "Please drop a valid IFC file.")
-
-    # def open_file_dialog(self):
-    #     file_path = filedialog.askopenfilename(filetypes=[("IFC files", "*.ifc")])
-    #     if file_path:
-    #         self.file_path = file_path
-    #         self.result_label.configure(text=f"Selected file: {self.file_path}")
-
-    def analyze_ifc(self):
-        if not self.file_path:
-            messagebox.showerror("Error", "Please drag and drop a valid IFC file.")
-            return
-        
-        analyzer = IFCAnalyzer(self.file_path)
-        try:
-            analyzer.load_ifc_file()
-            counts = analyzer.extract_element_counts()
-            total_weight = analyzer.calculate_total_weight()
-            result_text = f"Counts: {counts}\nTotal Weight: {total_weight} kg"
-            self.result_label.configure(text=result_text)
-        except ValueError as ve:
-            messagebox.showerror("Error", str(ve))
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+def open_model(ifc_source):
+    """Returns the ifcopenshell model for a path, an IFCAnalyzer session or an already opened model.
+
+    Passing a path keeps the old behaviour of opening the file on every call;
+    passing a session reuses the model it already holds.
+    """
+    if isinstance(ifc_source, IFCAnalyzer):
+        return ifc_source.model
+    if isinstance(ifc_source, (str, os.PathLike)):
+        import ifcopenshell
+        return ifcopenshell.open(os.fspath(ifc_source))
+    return ifc_source
+
+
+def source_path(ifc_source):
+    """Returns the file path behind a path or an IFCAnalyzer session."""
+    if isinstance(ifc_source, IFCAnalyzer):
+        return ifc_source.ifc_path
+    if isinstance(ifc_source, (str, os.PathLike)):
+        return os.fspath(ifc_source)
+    raise TypeError(f"Cannot determine the file path of {type(ifc_source).__name__}")
+
 
 if __name__ == "__main__":
+    from analyzer_app import Application
     app = Application()
     app.mainloop()
@@ -1,5 +1,6 @@
 import numpy as np
 
+
 def compute_seismic_load(site_class, importance_factor, spectral_response_acceleration):
     # Example seismic load calculation based on ASCE 7-16
     # Note: This is a simplified example. Actual calculations will depend on the standard used.
@@ -25,78 +26,170 @@ def equivalent_static_analysis(W, Cs):
     V = Cs * W
     return V
 
-# Example usage
-W = 1000  # total weight of the structure in kN
-Cs = 0.2  # seismic response coefficient
-V = equivalent_static_analysis(W, Cs)
-print(f"Equivalent Static Analysis Base Shear: {V} kN")
-
 
 def response_spectrum_analysis(Vx, Vy, Vz):
     V = np.sqrt(Vx**2 + Vy**2 + Vz**2)
     return V
 
-# Example usage
-Vx = 150  # response in x direction in kN
-Vy = 120  # response in y direction in kN
-Vz = 80   # response in z direction in kN
-V = response_spectrum_analysis(Vx, Vy, Vz)
-print(f"Response Spectrum Analysis Base Shear: {V} kN")
-
 
 def time_history_analysis(masses, accelerations):
     V = np.sum(masses * accelerations)
     return V
 
-# Example usage
-masses = np.array([100, 200, 300])  # masses of different floors in kN
-accelerations = np.array([0.05, 0.04, 0.03])  # accelerations in m/s^2
-V = time_history_analysis(masses, accelerations)
-print(f"Time History Analysis Base Shear: {V} kN")
-
 
 def modal_analysis(mode_shapes, generalized_coords):
     U = np.sum(mode_shapes * generalized_coords, axis=0)
     return U
 
-# Example usage
-mode_shapes = np.array([[1, 0.8, 0.6], [0.9, 0.7, 0.5], [0.8, 0.6, 0.4]])  # mode shapes
-generalized_coords = np.array([0.05, 0.04, 0.03])  # generalized coordinates
-U = modal_analysis(mode_shapes, generalized_coords)
-print(f"Modal Analysis Response: {U}")
 
 def capacity_spectrum_method(Sd, T, xi):
     # This is a simplified example. Actual calculations would be more complex.
     Sa = Sd / (T * (1 + xi))
     return Sa
 
-# Example usage
-Sd = 0.05  # spectral displacement in meters
-T = 1.0  # fundamental period in seconds
-xi = 0.05  # damping ratio
-Sa = capacity_spectrum_method(Sd, T, xi)
-print(f"Capacity Spectrum Method Spectral Acceleration: {Sa} m/s^2")
 
 def simplified_method(W, SDS, R, I):
     V = (SDS / (R / I)) * W
     return V
 
-# Example usage
-W = 1000  # total weight in kN
-SDS = 1.0  # design spectral response acceleration
-R = 8  # response modification factor
-I = 1.25  # importance factor
-V = simplified_method(W, SDS, R, I)
-print(f"Simplified Method Base Shear: {V} kN")
 
 def design_base_shear(W, SDS, R, I):
     V = (SDS / (R / I)) * W
     return V
 
+
+# ASCE 7-16 equivalent lateral force procedure (section 12.8). Every function
+# broadcasts: storeys run along the last axis of weights and heights, and
+# any leading axes (buildings, load cases) match the shapes of the scalar
+# inputs, so a whole portfolio or load case table is one call.
+
+# ASCE 7-16 Table 12.8-2: approximate period parameters (Ct, x) by structure type
+PERIOD_PARAMETERS = {
+    'steel_moment_frame': (0.028, 0.8),
+    'concrete_moment_frame': (0.016, 0.9),
+    'eccentrically_braced_frame': (0.03, 0.75),
+    'buckling_restrained_braced_frame': (0.03, 0.75),
+    'other': (0.02, 0.75),
+}
+
+
+def approximate_period(hn, Ct=0.02, x=0.75):
+    """Ta = Ct * hn^x (eq. 12.8-7), hn in feet."""
+    return Ct * np.power(np.asarray(hn, dtype=float), x)
+
+
+def seismic_response_coefficient(SDS, SD1, R, I, T, TL=8.0, S1=0.0):
+    """Cs (eq. 12.8-2), capped by eqs. 12.8-3/12.8-4 and floored by eqs. 12.8-5/12.8-6."""
+    T = np.asarray(T, dtype=float)
+    R_I = np.asarray(R, dtype=float) / I
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cap = np.where(T <= TL, SD1 / (T * R_I), SD1 * TL / (T ** 2 * R_I))
+    cap = np.where(T > 0, cap, np.inf)
+    floor = np.maximum(0.044 * np.asarray(SDS) * I, 0.01)
+    floor = np.where(np.asarray(S1) >= 0.6, np.maximum(floor, 0.5 * np.asarray(S1) / R_I), floor)
+    return np.maximum(np.minimum(SDS / R_I, cap), floor)
+
+
+def distribution_exponent(T):
+    """k (section 12.8.3): 1 up to 0.5 s, 2 from 2.5 s, linear in between."""
+    return np.clip(1.0 + (np.asarray(T, dtype=float) - 0.5) / 2.0, 1.0, 2.0)
+
+
+def vertical_distribution(V, weights, heights, k):
+    """(Cvx, Fx) per storey (eqs. 12.8-11, 12.8-12); V and k broadcast over the leading axes.
+
+    Storeys at the base take no force, so where every storey is at height 0
+    Cvx and Fx are all zero.
+    """
+    weights = np.asarray(weights, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    k = np.asarray(k, dtype=float)[..., None]
+    wh = weights * np.power(np.maximum(heights, 0.0), k)
+    total = wh.sum(axis=-1, keepdims=True)
+    Cvx = np.divide(wh, total, out=np.zeros(np.broadcast_shapes(wh.shape, total.shape)), where=total > 0)
+    return Cvx, Cvx * np.asarray(V, dtype=float)[..., None]
+
+
+def equivalent_lateral_force(weights, heights, SDS, SD1, R, I=1.0, TL=8.0, S1=0.0, hn=None, Ct=0.02, x=0.75):
+    """Base shear and its vertical distribution by the ASCE 7-16 ELF procedure.
+
+    weights are the storey seismic weights and heights their heights in feet
+    above the base, lowest storey first, along the last axis; hn defaults to
+    the highest storey. Returns a dict of arrays: 'Ta', 'k', 'Cs', 'W' and
+    'V' with the leading shape, and the per-storey 'Cvx', 'Fx' and storey
+    shear 'Vx' with the storey axis last.
+    """
+    weights = np.asarray(weights, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    if hn is None:
+        hn = heights.max(axis=-1, initial=0.0)
+    Ta = approximate_period(hn, Ct, x)
+    Cs = seismic_response_coefficient(SDS, SD1, R, I, Ta, TL, S1)
+    W = weights.sum(axis=-1)
+    V = Cs * W
+    k = distribution_exponent(Ta)
+    Cvx, Fx = vertical_distribution(V, weights, heights, k)
+    # Storey shear: the forces at and above each storey
+    Vx = np.flip(np.cumsum(np.flip(Fx, axis=-1), axis=-1), axis=-1)
+    return {'Ta': Ta, 'k': k, 'Cs': Cs, 'W': W, 'V': V, 'Cvx': Cvx, 'Fx': Fx, 'Vx': Vx}
+
+
+def stack_storeys(buildings):
+    """Pads (weights, heights) pairs of buildings with different storey counts
+    into two (buildings, storeys) arrays; padding storeys weigh nothing."""
+    count = max((len(weights) for weights, _ in buildings), default=0)
+    weights = np.zeros((len(buildings), count))
+    heights = np.zeros((len(buildings), count))
+    for row, (building_weights, building_heights) in enumerate(buildings):
+        weights[row, :len(building_weights)] = building_weights
+        heights[row, :len(building_heights)] = building_heights
+    return weights, heights
+
+
 # Example usage
-W = 1000  # total weight in kN
-SDS = 1.0  # design spectral response acceleration at short periods
-R = 8  # response modification factor
-I = 1.25  # importance factor
-V = design_base_shear(W, SDS, R, I)
-print(f"Design Base Shear (ASCE 7-16): {V} kN")
+if __name__ == "__main__":
+    W = 1000  # total weight of the structure in kN
+    Cs = 0.2  # seismic response coefficient
+    V = equivalent_static_analysis(W, Cs)
+    print(f"Equivalent Static Analysis Base Shear: {V} kN")
+
+    Vx = 150  # response in x direction in kN
+    Vy = 120  # response in y direction in kN
+    Vz = 80   # response in z direction in kN
+    V = response_spectrum_analysis(Vx, Vy, Vz)
+    print(f"Response Spectrum Analysis Base Shear: {V} kN")
+
+    masses = np.array([100, 200, 300])  # masses of different floors in kN
+    accelerations = np.array([0.05, 0.04, 0.03])  # accelerations in m/s^2
+    V = time_history_analysis(masses, accelerations)
+    print(f"Time History Analysis Base Shear: {V} kN")
+
+    mode_shapes = np.array([[1, 0.8, 0.6], [0.9, 0.7, 0.5], [0.8, 0.6, 0.4]])  # mode shapes
+    generalized_coords = np.array([0.05, 0.04, 0.03])  # generalized coordinates
+    U = modal_analysis(mode_shapes, generalized_coords)
+    print(f"Modal Analysis Response: {U}")
+
+    Sd = 0.05  # spectral displacement in meters
+    T = 1.0  # fundamental period in seconds
+    xi = 0.05  # damping ratio
+    Sa = capacity_spectrum_method(Sd, T, xi)
+    print(f"Capacity Spectrum Method Spectral Acceleration: {Sa} m/s^2")
+
+    W = 1000  # total weight in kN
+    SDS = 1.0  # design spectral response acceleration
+    R = 8  # response modification factor
+    I = 1.25  # importance factor
+    V = simplified_method(W, SDS, R, I)
+    print(f"Simplified Method Base Shear: {V} kN")
+
+    W = 1000  # total weight in kN
+    SDS = 1.0  # design spectral response acceleration at short periods
+    R = 8  # response modification factor
+    I = 1.25  # importance factor
+    V = design_base_shear(W, SDS, R, I)
+    print(f"Design Base Shear (ASCE 7-16): {V} kN")
+
+    weights = np.array([400.0, 350.0, 250.0])  # storey seismic weights in kips
+    heights = np.array([12.0, 24.0, 36.0])  # storey heights above the base in feet
+    elf = equivalent_lateral_force(weights, heights, SDS=1.0, SD1=0.6, R=8, I=1.25)
+    print(f"ELF Base Shear (ASCE 7-16): {elf['V']:.1f} kips, storey forces {np.round(elf['Fx'], 1)}")
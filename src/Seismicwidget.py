@@ -1,8 +1,6 @@
-import tkinter as tk
-from tkinter import BooleanVar, Label, Entry, Checkbutton
-from tkinterdnd2 import TkinterDnD, DND_FILES
-import customtkinter as ctk
-import tkinter as tk
+# Only create_seismic_input_widgets needs Tk; the load calculation below is
+# importable on machines without a display.
+import numpy as np
 
 textcolor='white'
 
@@ -27,8 +25,15 @@ def compute_seismic_load(site_class, importance_factor, spectral_response_accele
         2.0: 2.0,
     }
     
-    # Use the float value to get the amplification factor
-    amplification_factor = amplification_factors.get(site_class, 1.0)  # Default to 1.0 if not found
+    if np.ndim(site_class):
+        # Parameter sweeps pass arrays: look every site class up at once
+        site_class = np.asarray(site_class, dtype=float)
+        amplification_factor = np.ones(site_class.shape)
+        for key, factor in amplification_factors.items():
+            amplification_factor[site_class == key] = factor
+    else:
+        # Use the float value to get the amplification factor
+        amplification_factor = amplification_factors.get(site_class, 1.0)  # Default to 1.0 if not found
 
     seismic_load = (importance_factor * spectral_response_acceleration * amplification_factor)
 
@@ -36,6 +41,7 @@ def compute_seismic_load(site_class, importance_factor, spectral_response_accele
 
 
 def create_seismic_input_widgets(master):
+    import customtkinter as ctk
     # Create and place widgets
     entry_width=200
     site_class_label = ctk.CTkLabel(master, text="Site Class" ,fg_color='transparent',font=("Arial", 16, "bold"))
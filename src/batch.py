@@ -0,0 +1,269 @@
+"""Headless batch mode: runs the drop-to-PDF analysis over many IFC files.
+
+    python batch.py models/ --params params.json --workers 4 --summary summary.jsonl
+
+Inputs may be directories (every *.ifc inside), files or glob patterns;
+named files and patterns may also be .npz model exports.
+The parameter file is JSON with the same fields as the GUI:
+
+    {
+        "wind_speed": 115, "snow_load": 30, "ice_load": 5,
+        "site_class": 1, "importance_factor": 1.0,
+        "spectral_response_acceleration": 0.4,
+        "remove_zero_point": true,
+        "dedup_tolerance": 0.01, "outlier_std_ratio": 3,
+        "roof_tolerance": 0.5, "roof_outline": "concave",
+        "seismic_sds": 1.0, "seismic_sd1": 0.6, "response_modification": 6.5,
+        "period_system": "steel_moment_frame",
+        "live_loads": [{"floor": 1, "percentage_load": 100, "area_load": 40}],
+        "files": {"tower.ifc": {"wind_speed": 130}}
+    }
+
+"files" optionally overrides any field for a single file, matched by file
+name. One JSON line is written per file with every computed value, or with
+an "error" field if the analysis failed.
+
+With --sweep FIELD=VALUES (repeatable) each file is parsed once and every
+combination of the swept inputs is written to <file>_sweep.csv instead of
+the PDFs; see sweep.py.
+
+With --export each file is read once and its extracted values are written
+to <file>.npz instead of the PDFs; see model_export.py. Later runs given the
+.npz skip the IFC model entirely:
+
+    python batch.py models/ --export --output-dir exports/
+    python batch.py 'exports/*.npz' --params params.json
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import queue
+import sys
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+def collect_ifc_files(patterns, recursive=False):
+    """Expands directories, files and glob patterns into a sorted list of IFC paths.
+
+    Directories contribute their .ifc files; named files and patterns may
+    also match .npz model exports.
+    """
+    found = set()
+    for pattern in patterns:
+        extensions = ('.ifc', '.npz')
+        if os.path.isdir(pattern):
+            sub = os.path.join(pattern, '**', '*') if recursive else os.path.join(pattern, '*')
+            candidates = glob.glob(sub, recursive=recursive)
+            extensions = ('.ifc',)
+        elif glob.has_magic(pattern):
+            candidates = glob.glob(pattern, recursive=True)
+        else:
+            candidates = [pattern]
+        for path in candidates:
+            if os.path.isfile(path) and path.lower().endswith(extensions):
+                found.add(os.path.abspath(path))
+    return sorted(found)
+
+
+def load_params(path):
+    """Reads the JSON parameter file; returns (values, live_loads, per-file overrides)."""
+    if not path:
+        return {}, [], {}
+    with open(path, 'r') as f:
+        params = json.load(f)
+    live_loads = params.pop('live_loads', [])
+    overrides = params.pop('files', {})
+    return params, live_loads, overrides
+
+
+def params_for_file(ifc_path, values, live_loads, overrides):
+    override = dict(overrides.get(os.path.basename(ifc_path), {}))
+    file_live_loads = override.pop('live_loads', live_loads)
+    return dict(values, **override), file_live_loads
+
+
+def _status_to_stderr():
+    """Sends anything a worker prints to stderr; stdout carries only the JSON summary lines."""
+    return contextlib.redirect_stdout(sys.stderr)
+
+
+def analyze_file(ifc_path, values, live_loads, output_dir=None, use_cache=True, profile=None, low_memory=None):
+    """Worker entry point: analyzes one file and never raises."""
+    from pipeline import parse_inputs, run_analysis
+    from extraction_cache import default_cache
+    try:
+        inputs = parse_inputs(values)
+        cache = default_cache() if use_cache else None
+        with _status_to_stderr():
+            return run_analysis(ifc_path, inputs, live_loads=live_loads, cache=cache, output_dir=output_dir, profile=profile, low_memory=low_memory)
+    except Exception as e:
+        return {
+            'file': ifc_path,
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+        }
+
+
+def analyze_job(job_id, ifc_path, inputs, messages, cancel, replies, output_dir=None, use_cache=True):
+    """Worker entry point for the GUI: analyzes one file, reporting through messages.
+
+    messages, cancel and replies are multiprocessing manager proxies. Posts
+    ('started', job_id), then ('progress', job_id, stage, index, total) per
+    stage and ('live_loads', job_id, floor_count) when the per-floor loads are
+    needed, which the GUI answers on replies. Ends with ('done', job_id,
+    summary), ('cancelled', job_id) or ('error', job_id, message).
+    """
+    from pipeline import run_analysis, AnalysisCancelled
+    from extraction_cache import default_cache
+
+    def ask_live_loads(floor_count):
+        messages.put(('live_loads', job_id, floor_count))
+        while True:
+            try:
+                return replies.get(timeout=0.2)
+            except queue.Empty:
+                if cancel.is_set():
+                    return []
+
+    messages.put(('started', job_id))
+    try:
+        summary = run_analysis(
+            ifc_path, inputs, live_loads=ask_live_loads,
+            cache=default_cache() if use_cache else None, output_dir=output_dir,
+            progress=lambda stage, index, total: messages.put(('progress', job_id, stage, index, total)),
+            cancel=cancel,
+        )
+        messages.put(('done', job_id, summary))
+    except AnalysisCancelled:
+        messages.put(('cancelled', job_id))
+    except Exception as e:
+        print(f"Error analyzing {ifc_path}: {e}\n{traceback.format_exc()}", file=sys.stderr)
+        messages.put(('error', job_id, f"{type(e).__name__}: {e}"))
+
+
+def sweep_file(ifc_path, values, ranges, output_dir=None, use_cache=True, low_memory=None):
+    """Worker entry point for --sweep: sweeps one file and never raises."""
+    from pipeline import parse_inputs
+    from sweep import run_sweep
+    from extraction_cache import default_cache
+    try:
+        inputs = parse_inputs(values)
+        cache = default_cache() if use_cache else None
+        with _status_to_stderr():
+            return run_sweep(ifc_path, ranges, inputs, cache=cache, output_dir=output_dir, low_memory=low_memory)
+    except Exception as e:
+        return {
+            'file': ifc_path,
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+        }
+
+
+def export_file(ifc_path, output_dir=None, use_cache=True, low_memory=None):
+    """Worker entry point for --export: exports one file and never raises."""
+    from model_export import export_model
+    from extraction_cache import default_cache
+    try:
+        cache = default_cache() if use_cache else None
+        with _status_to_stderr():
+            return export_model(ifc_path, cache=cache, output_dir=output_dir, low_memory=low_memory)
+    except Exception as e:
+        return {
+            'file': ifc_path,
+            'error': f"{type(e).__name__}: {e}",
+            'traceback': traceback.format_exc(),
+        }
+
+
+def run_batch(ifc_paths, values, live_loads, overrides=None, workers=None, output_dir=None, use_cache=True, on_result=None, profile=None, low_memory=None, sweep=None, export=False):
+    """Analyzes every file on a bounded process pool and returns the summaries in input order.
+
+    sweep maps input fields to value arrays; when given, each file is swept
+    (see sweep.py) instead of analyzed. export writes each file's .npz model
+    export (see model_export.py) instead.
+    """
+    overrides = overrides or {}
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for path in ifc_paths:
+            file_values, file_live_loads = params_for_file(path, values, live_loads, overrides)
+            if export:
+                future = executor.submit(export_file, path, output_dir, use_cache, low_memory)
+            elif sweep:
+                future = executor.submit(sweep_file, path, file_values, sweep, output_dir, use_cache, low_memory)
+            else:
+                future = executor.submit(analyze_file, path, file_values, file_live_loads, output_dir, use_cache, profile, low_memory)
+            futures[future] = path
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if on_result is not None:
+                on_result(result)
+    return [results[path] for path in ifc_paths]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the IFC load analysis over many files without the GUI.")
+    parser.add_argument('inputs', nargs='+', help="IFC files, directories or glob patterns")
+    parser.add_argument('--params', help="JSON file with wind/snow/ice/seismic inputs and live loads")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="maximum number of worker processes")
+    parser.add_argument('--summary', help="write one JSON line per file here (default: stdout)")
+    parser.add_argument('--output-dir', help="write the PDFs here instead of next to each IFC file")
+    parser.add_argument('--recursive', action='store_true', help="search directories recursively")
+    parser.add_argument('--no-cache', action='store_true', help="do not read or write the extraction cache")
+    parser.add_argument('--profile', action='store_true', default=None,
+                        help="record per-stage time and memory to <file>_profile.json (or set IFC_ANALYZER_PROFILE)")
+    parser.add_argument('--low-memory', action='store_true', default=None,
+                        help="stream only the entities the analysis needs instead of loading whole models")
+    parser.add_argument('--sweep', action='append', metavar='FIELD=VALUES',
+                        help="sweep an input over 'a,b,c' or 'start:stop:step' and write <file>_sweep.csv; repeatable")
+    parser.add_argument('--export', action='store_true',
+                        help="write the values read from each model to <file>.npz instead of analyzing it")
+    args = parser.parse_args(argv)
+
+    from sweep import parse_sweep_arg
+    try:
+        sweep = dict(parse_sweep_arg(arg) for arg in args.sweep or [])
+    except ValueError as e:
+        parser.error(str(e))
+    if args.export and sweep:
+        parser.error("--export and --sweep cannot be combined")
+
+    ifc_paths = collect_ifc_files(args.inputs, recursive=args.recursive)
+    if not ifc_paths:
+        print("No IFC files found.", file=sys.stderr)
+        return 1
+    values, live_loads, overrides = load_params(args.params)
+
+    summary_file = open(args.summary, 'w') if args.summary else sys.stdout
+    failures = 0
+
+    def on_result(result):
+        nonlocal failures
+        if 'error' in result:
+            failures += 1
+            print(f"FAILED {result['file']}: {result['error']}", file=sys.stderr)
+        summary_file.write(json.dumps(result) + '\n')
+        summary_file.flush()
+
+    try:
+        run_batch(ifc_paths, values, live_loads, overrides, workers=max(1, args.workers or 1),
+                  output_dir=args.output_dir, use_cache=not args.no_cache, on_result=on_result, profile=args.profile,
+                  low_memory=args.low_memory, sweep=sweep, export=args.export)
+    finally:
+        if summary_file is not sys.stdout:
+            summary_file.close()
+
+    action = 'Exported' if args.export else 'Swept' if sweep else 'Analyzed'
+    print(f"{action} {len(ifc_paths)} file(s), {failures} failed.", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
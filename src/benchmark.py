@@ -0,0 +1,281 @@
+"""Scaling benchmarks for every extractor, calculator and report writer.
+
+    python benchmark.py --sizes 1000,10000,100000 [--only read_methods,calculate] [--json results.json]
+
+For each size a synthetic IFC4 model (see synthetic_ifc.py) with that many
+cartesian points is generated, with element, quantity and vector counts
+growing alongside. Every function is then timed on a freshly loaded
+session (the model load itself is reported separately as "open"), and run
+a second time under tracemalloc for its peak traced memory. The report
+ends with the log-log slope of time against size for each function: about
+1.0 means linear scaling, and anything well above that marks the stage
+that stops scaling first.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+GROUPS = ['read_methods', 'calculate', 'report', 'Seismicaddons']
+
+
+def model_params(points):
+    """Generator parameters for a model with the given number of points."""
+    return {
+        'points': points,
+        'storeys': 5,
+        'beams_per_storey': max(5, points // 500),
+        'columns_per_storey': max(3, points // 1000),
+        'vectors_per_storey': max(1, points // 2000),
+    }
+
+
+class Context:
+    """Inputs shared by the benchmark cases for one model size, computed untimed."""
+    def __init__(self, path, workdir):
+        from IFCAnalyzer import IFCAnalyzer
+        from read_methods import parse_ifc_file
+        from calculate import calculate_area_from_coords
+        self.path = path
+        self.workdir = workdir
+        with contextlib.redirect_stdout(io.StringIO()):
+            session = IFCAnalyzer(path)
+            self.coordinates = parse_ifc_file(session, as_array=True)
+            self.areas = calculate_area_from_coords(self.coordinates)
+        self.n = len(self.coordinates)
+
+    def session(self):
+        from IFCAnalyzer import IFCAnalyzer
+        session = IFCAnalyzer(self.path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            session.load_ifc_file()
+        return session
+
+
+def on_session(func, *args, **kwargs):
+    """Case setup that calls func on a freshly loaded session."""
+    def setup(ctx):
+        session = ctx.session()
+        return lambda: func(session, *args, **kwargs)
+    return setup
+
+
+def _read_methods_cases():
+    import read_methods as rm
+    from IFCAnalyzer import IFCAnalyzer
+
+    return [
+        ('open', lambda ctx: lambda: IFCAnalyzer(ctx.path).load_ifc_file()),
+        ('parse_ifc_file', on_session(rm.parse_ifc_file, as_array=True)),
+        ('extract_element_counts', on_session(rm.extract_element_counts)),
+        ('extract_floor_data', on_session(rm.extract_floor_data)),
+        ('extract_forces_moments', lambda ctx: lambda: rm.extract_forces_moments(ctx.path)),
+        ('extract_roof_pressures', on_session(rm.extract_roof_pressures)),
+        ('extract_ifc_data', on_session(rm.extract_ifc_data)),
+        ('extract_section_types', on_session(rm.extract_section_types)),
+        ('extract_Aux_data', on_session(rm.extract_Aux_data)),
+        ('explore_ifc_properties', on_session(rm.explore_ifc_properties)),
+    ]
+
+
+def _calculate_cases():
+    import calculate as calc
+
+    live_loads = [{'floor': 1, 'percentage_load': 50, 'area_load': 40}]
+    return [
+        ('calculate_area_from_coords', lambda ctx: lambda: calc.calculate_area_from_coords(ctx.coordinates)),
+        ('calculate_perimeter', lambda ctx: lambda: calc.calculate_perimeter(ctx.coordinates)),
+        ('calculate_footing_perimeter', lambda ctx: lambda: calc.calculate_footing_perimeter(ctx.coordinates)),
+        ('calculate_roof_perimeter', lambda ctx: lambda: calc.calculate_roof_perimeter(ctx.coordinates)),
+        ('storey_geometry', lambda ctx: lambda: calc.storey_geometry(ctx.coordinates, np.unique(ctx.coordinates[:, 2]))),
+        ('calculate_wind_loads', on_session(calc.calculate_wind_loads)),
+        ('calculate_dead_load', on_session(calc.calculate_dead_load)),
+        ('calculate_dead_load_with_live_load', on_session(calc.calculate_dead_load_with_live_load, live_loads, 1000.0, 30.0, 5.0)),
+        ('calculate_beam_column_weight', on_session(calc.calculate_beam_column_weight)),
+        ('calculate_snow_load', lambda ctx: lambda: calc.calculate_snow_load(ctx.areas[0], 30.0)),
+        ('calculate_ice_load', lambda ctx: lambda: calc.calculate_ice_load(ctx.areas[0], 5.0)),
+    ]
+
+
+def _report_cases():
+    import report
+    from read_methods import extract_forces_moments
+
+    def plot(ctx):
+        out = os.path.join(ctx.workdir, 'bench_coordinate_plots.pdf')
+        return lambda: report.plot_coordinates(ctx.coordinates, ctx.areas, out, None, weight=0.0)
+
+    def aux(ctx):
+        with contextlib.redirect_stdout(io.StringIO()):
+            forces, moments = extract_forces_moments(ctx.path)
+        out = os.path.join(ctx.workdir, 'bench_Aux.pdf')
+        counts = {'IfcBeam': 0, 'IfcColumn': 0}
+        live_loads = [{'floor': i + 1, 'percentage_load': 50, 'area_load': 40} for i in range(len(forces))]
+        return lambda: report.create_Aux_pdf(
+            counts, out, ctx.path, len(forces), forces, moments, 100.0, {}, {}, 115.0, 20.0, 100.0,
+            ctx.areas, {'Wind Pressure': 0.0, 'Wall Moment': 0.0}, 0.0, 0.0, 0.0, 0.0, live_loads, 0.0)
+
+    return [('plot_coordinates', plot), ('create_Aux_pdf', aux)]
+
+
+def _seismic_cases():
+    import Seismicaddons as sa
+
+    # The seismic helpers take scalars or arrays; they are timed over one load case per point
+    def arrays(ctx):
+        rng = np.random.default_rng(0)
+        return rng.random(ctx.n) + 0.1, rng.random(ctx.n) + 0.1, rng.random(ctx.n) + 0.1
+
+    def case(func, arity, *constants):
+        def setup(ctx):
+            args = arrays(ctx)[:arity] + constants
+            return lambda: func(*args)
+        return setup
+
+    def elf(ctx):
+        # One call distributes every load case over a 20-storey building
+        sds, sd1, r = arrays(ctx)
+        weights = np.full(20, 100.0)
+        heights = np.arange(1, 21) * 12.0
+        return lambda: sa.equivalent_lateral_force(weights, heights, sds, sd1, r * 8)
+
+    return [
+        ('equivalent_static_analysis', case(sa.equivalent_static_analysis, 2)),
+        ('response_spectrum_analysis', case(sa.response_spectrum_analysis, 3)),
+        ('time_history_analysis', case(sa.time_history_analysis, 2)),
+        ('capacity_spectrum_method', case(sa.capacity_spectrum_method, 3)),
+        ('design_base_shear', case(sa.design_base_shear, 1, 1.0, 8.0, 1.25)),
+        ('equivalent_lateral_force', elf),
+    ]
+
+
+CASES = {
+    'read_methods': _read_methods_cases,
+    'calculate': _calculate_cases,
+    'report': _report_cases,
+    'Seismicaddons': _seismic_cases,
+}
+
+
+def measure(setup, ctx, memory=True, warmup=False):
+    """Returns (wall_s, cpu_s, peak_mb or None, error or None) for one case.
+
+    peak_mb is the peak traced by tracemalloc: Python and NumPy allocations,
+    not memory held inside ifcopenshell's C++ model. warmup runs the case
+    once untimed first, so one-off import costs do not skew the smallest size.
+    """
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            if warmup:
+                setup(ctx)()
+            run = setup(ctx)
+            wall0, cpu0 = time.perf_counter(), time.process_time()
+            run()
+            wall, cpu = time.perf_counter() - wall0, time.process_time() - cpu0
+            peak = None
+            if memory:
+                run = setup(ctx)
+                tracemalloc.start()
+                try:
+                    run()
+                    peak = tracemalloc.get_traced_memory()[1] / 1e6
+                finally:
+                    tracemalloc.stop()
+        return wall, cpu, peak, None
+    except Exception as e:
+        return None, None, None, f"{type(e).__name__}: {e}"
+
+
+def scaling_exponent(sizes, times):
+    """Log-log slope of time against size over the sizes that produced a time."""
+    pairs = [(n, t) for n, t in zip(sizes, times) if t is not None and t > 0]
+    if len(pairs) < 2:
+        return None
+    x, y = np.log([p[0] for p in pairs]), np.log([p[1] for p in pairs])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, groups=GROUPS, memory=True, workdir=None, log=print):
+    from synthetic_ifc import generate_ifc
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix='ifc_bench_')
+    results = {}
+    try:
+        for size in sizes:
+            path = os.path.join(workdir, f'synthetic_{size}.ifc')
+            generate_ifc(path, **model_params(size))
+            log(f"size {size}: {os.path.getsize(path) / 1e6:.1f} MB")
+            ctx = Context(path, workdir)
+            for group in groups:
+                for name, setup in CASES[group]():
+                    wall, cpu, peak, error = measure(setup, ctx, memory, warmup=size == sizes[0])
+                    entry = results.setdefault(f"{group}.{name}", {'sizes': [], 'wall_s': [], 'cpu_s': [], 'peak_mb': [], 'errors': []})
+                    entry['sizes'].append(size)
+                    entry['wall_s'].append(wall)
+                    entry['cpu_s'].append(cpu)
+                    entry['peak_mb'].append(peak)
+                    if error:
+                        entry['errors'].append(f"size {size}: {error}")
+    finally:
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    for entry in results.values():
+        entry['exponent'] = scaling_exponent(entry['sizes'], entry['wall_s'])
+    return results
+
+
+def format_report(results, sizes):
+    def cell(value, fmt):
+        return format(value, fmt) if value is not None else '-'
+
+    name_width = max(len(name) for name in results) + 2
+    header = 'function'.ljust(name_width) + ''.join(f"{size:>12}" for size in sizes) + f"{'peak MB':>10}{'exponent':>10}"
+    lines = ['Wall time (s) by number of points', header, '-' * len(header)]
+    for name, entry in results.items():
+        peak = max((p for p in entry['peak_mb'] if p is not None), default=None)
+        exponent = entry['exponent']
+        flag = '  <- superlinear' if exponent is not None and exponent > 1.3 else ''
+        lines.append(name.ljust(name_width) + ''.join(f"{cell(t, '.4f'):>12}" for t in entry['wall_s'])
+                     + f"{cell(peak, '.1f'):>10}{cell(exponent, '.2f'):>10}{flag}")
+        for error in entry['errors']:
+            lines.append(' ' * name_width + f"error at {error}")
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time and memory-profile each stage across model sizes.")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help="comma-separated point counts")
+    parser.add_argument('--only', help=f"comma-separated groups out of {', '.join(GROUPS)}")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--json', help="also write the raw results here")
+    parser.add_argument('--keep', help="generate the models in this directory and keep them")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    groups = args.only.split(',') if args.only else GROUPS
+    for group in groups:
+        if group not in CASES:
+            parser.error(f"unknown group {group!r}")
+    if args.keep:
+        os.makedirs(args.keep, exist_ok=True)
+
+    results = run_benchmarks(sizes, groups, memory=not args.no_memory, workdir=args.keep,
+                             log=lambda msg: print(msg, file=sys.stderr))
+    print(format_report(results, sizes))
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -18,28 +18,25 @@ Include a header with Mythic Systems branding in each Python file:
 '''
 
 
-from read_methods import *
-from report import *
-from widget import *
-import ifcopenshell
-import seaborn as sns
-import matplotlib.pyplot as plt 
+# Calculation layer: importable without Tk, plotting or PDF dependencies.
+# scipy.spatial is imported inside the geometry functions that need it.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-from scipy.spatial import Delaunay, ConvexHull
-from tkinterdnd2 import TkinterDnD, DND_FILES
+from IFCAnalyzer import open_model
+from coordinate_store import is_store, coordinate_bounds
+from property_index import property_index
+from quantities import quantity_totals
 
-def calculate_dead_load_with_live_load(ifc_file, live_loads, roof_area, snow_load_per_unit_area, ice_load_per_unit_area):
-    model = ifcopenshell.open(ifc_file)
+def _round(value, digits):
+    """round() for scalars, np.round for the arrays a parameter sweep passes in."""
+    return np.round(value, digits) if isinstance(value, np.ndarray) else round(value, digits)
 
-    total_dead_load = 0.0
+def calculate_dead_load_with_live_load(ifc_source, live_loads, roof_area, snow_load_per_unit_area, ice_load_per_unit_area):
+    total_dead_load = quantity_totals(ifc_source)['dead_load']
     total_live_load = 0.0
 
-    for element in model.by_type('IfcElementQuantity'):
-        for quantity in element.Quantities:
-            if quantity.is_a('IfcQuantityWeight'):
-                if 'Dead Load' in quantity.Name or 'DeadLoad' in quantity.Name or 'Gross Weight' in quantity.Name or 'GrossWeight' in quantity.Name:
-                    total_dead_load += quantity.WeightValue
-
     for load in live_loads:
         area_load = load['area_load']
         if area_load:
@@ -53,12 +50,10 @@ def calculate_dead_load_with_live_load(ifc_file, live_loads, roof_area, snow_loa
 
     return total_dead_load, total_live_load, total_snow_load, total_ice_load
 
-def calculate_beam_column_weight(ifc_path):
+def calculate_beam_column_weight(ifc_source):
     """Calculate the total weight of beams and columns using 'Gross Weight' or 'IFCQUANTITYLENGTH'."""
-    total_beam_weight = 0.0
-    total_column_weight = 0.0
-
-    ifc_file = ifcopenshell.open(ifc_path)
+    ifc_file = open_model(ifc_source)
+    index = property_index(ifc_source, ifc_file)
 
     # Helper function to get weight value
     def get_weight_value(element, attribute_names):
@@ -71,55 +66,110 @@ def calculate_beam_column_weight(ifc_path):
     # Define attribute names to check for weight values
     weight_attributes = ['GrossWeight', 'WeightValue']
 
-    # Iterate over beams
-    for beam in ifc_file.by_type('IfcBeam'):
-        for quantity in beam.IsDefinedBy:
-            if quantity.is_a('IfcRelDefinesByProperties'):
-                prop_set = quantity.RelatingPropertyDefinition
-                if prop_set.is_a('IfcElementQuantity'):
-                    for quantity in prop_set.Quantities:
-                        if quantity.is_a('IfcQuantityWeight') or quantity.Name == 'Gross Weight':
-                            total_beam_weight += get_weight_value(quantity, weight_attributes)
-
-    # Iterate over columns
-    for column in ifc_file.by_type('IfcColumn'):
-        for quantity in column.IsDefinedBy:
-            if quantity.is_a('IfcRelDefinesByProperties'):
-                prop_set = quantity.RelatingPropertyDefinition
-                if prop_set.is_a('IfcElementQuantity'):
-                    for quantity in prop_set.Quantities:
-                        if quantity.is_a('IfcQuantityWeight') or quantity.Name == 'Gross Weight':
-                            total_column_weight += get_weight_value(quantity, weight_attributes)
+    def element_weight(element):
+        weight = 0.0
+        for quantity in index.get_quantities(element.GlobalId):
+            if quantity.is_a('IfcQuantityWeight') or quantity.Name == 'Gross Weight':
+                weight += get_weight_value(quantity, weight_attributes)
+        return weight
+
+    total_beam_weight = sum(element_weight(beam) for beam in ifc_file.by_type('IfcBeam'))
+    total_column_weight = sum(element_weight(column) for column in ifc_file.by_type('IfcColumn'))
     total_weight = total_beam_weight + total_column_weight
     return round(total_weight, 2)
     # return round(total_beam_weight, 2), round(total_column_weight, 2)
 
+def triangle_areas(points, simplices):
+    """Areas of the 2D triangles points[simplices], as one array operation."""
+    corners = points[simplices]
+    ab = corners[:, 1] - corners[:, 0]
+    ac = corners[:, 2] - corners[:, 0]
+    return 0.5 * np.abs(ab[:, 0] * ac[:, 1] - ab[:, 1] * ac[:, 0])
+
+def triangulation_area(points):
+    """Area covered by the Delaunay triangulation of 2D points."""
+    from scipy.spatial import Delaunay
+    # Coincident points add nothing to the area but still cost qhull time
+    points = np.unique(points, axis=0)
+    if len(points) < 3:
+        return 0.0
+    tri = Delaunay(points)
+    return round(float(triangle_areas(points, tri.simplices).sum()), 1)
+
+def _hull_vertices(points):
+    """Vertices of the convex hull of points, or all of them (deduplicated) when they span none."""
+    from scipy.spatial import ConvexHull, QhullError
+    if len(points) > points.shape[1]:
+        try:
+            return points[ConvexHull(points).vertices]
+        except QhullError:
+            pass
+    return np.unique(points, axis=0)
+
+def _merged_hulls(store, column_sets):
+    """For each list of columns, the hull vertices of a coordinate store's points projected onto them.
+
+    The hull of all points is the hull of each chunk's hull vertices, so one
+    pass over the store's chunks gives the outline all points would.
+    """
+    parts = [[] for _ in column_sets]
+    for chunk in store.chunks():
+        for part, columns in zip(parts, column_sets):
+            part.append(_hull_vertices(chunk[:, columns]))
+    return [np.unique(np.concatenate(part), axis=0) if part else np.empty((0, len(columns)))
+            for part, columns in zip(parts, column_sets)]
+
+def _outline_points(points):
+    """Sorted, distinct hull vertices of points.
+
+    The hull is taken again over the sorted vertices, so qhull always sees
+    the same input for the same outline whether the points came from memory
+    or from a store's merged chunk hulls, and the areas and perimeters
+    measured from it agree to the last digit.
+    """
+    vertices = np.unique(_hull_vertices(points), axis=0)
+    return np.unique(_hull_vertices(vertices), axis=0)
+
 def calculate_area_from_coords(coord_list):
-    coords = np.array(coord_list)
-
-    def triangulation_area(points):
-        if len(points) < 3:
-            return 0.0
-        tri = Delaunay(points)
-        area = 0.0
-        for simplex in tri.simplices:
-            pts = points[simplex]
-            a = np.linalg.norm(pts[0] - pts[1])
-            b = np.linalg.norm(pts[1] - pts[2])
-            c = np.linalg.norm(pts[2] - pts[0])
-            s = (a + b + c) / 2
-            area += np.sqrt(s * (s - a) * (s - b) * (s - c))
-        return round(area, 1)
-
-    area_xy = triangulation_area(coords[:, [0, 1]])
-    area_yz = triangulation_area(coords[:, [1, 2]])
-    area_xz = triangulation_area(coords[:, [0, 2]])
+    if is_store(coord_list):
+        # A Delaunay triangulation covers exactly the convex hull, so the
+        # merged hull vertices triangulate to the same areas
+        projections = _merged_hulls(coord_list, [[0, 1], [1, 2], [0, 2]])
+    else:
+        coords = np.asarray(coord_list, dtype=float)
+        projections = [coords[:, [0, 1]], coords[:, [1, 2]], coords[:, [0, 2]]]
+    projections = [_outline_points(projection) for projection in projections]
+
+    # qhull releases the GIL, so the three projections triangulate concurrently
+    with ThreadPoolExecutor(max_workers=len(projections)) as executor:
+        area_xy, area_yz, area_xz = executor.map(triangulation_area, projections)
 
     return area_xy, area_yz, area_xz
 
+def plan_area(coordinates):
+    """XY area of the points, as calculate_area_from_coords measures it."""
+    if is_store(coordinates):
+        xy = _merged_hulls(coordinates, [[0, 1]])[0]
+    else:
+        xy = np.asarray(coordinates, dtype=float)[:, :2]
+    return triangulation_area(_outline_points(xy))
+
+def building_height(coordinates):
+    """Height in feet spanned by the points' z values."""
+    if not len(coordinates):
+        return 0.0
+    low, high = coordinate_bounds(coordinates)
+    return round(float(high[2] - low[2]), 2)
+
 def calculate_perimeter(coords):
+    if is_store(coords):
+        coords = _merged_hulls(coords, [[0, 1, 2]])[0]
+    # The sum depends on how qhull splits the hull's flat faces into
+    # triangles, so both paths measure the same canonical outline
+    coords = _outline_points(np.asarray(coords, dtype=float).reshape(-1, 3))
     if len(coords) < 3:
         return 0.0
+    from scipy.spatial import ConvexHull
     hull = ConvexHull(coords)
     perimeter = 0.0
     for simplex in hull.simplices:
@@ -132,11 +182,78 @@ def calculate_footing_perimeter(coords):
     if len(coords) < 3:
         return []
 
+    from scipy.spatial import ConvexHull
     hull = ConvexHull(coords)
     perimeter_coords = [coords[vertex] for vertex in hull.vertices]
 
     return perimeter_coords
 
+def storey_bands(z, elevations):
+    """Band index of each z value: band i spans [elevations[i], elevations[i + 1]).
+
+    elevations must be ascending. Values below the lowest elevation fall in band 0.
+    """
+    bands = np.searchsorted(np.asarray(elevations, dtype=float), np.asarray(z, dtype=float), side='right') - 1
+    return np.clip(bands, 0, None)
+
+def _plan_outline(xy):
+    """(area, perimeter, hull vertices) of a storey's plan; a convex hull's area
+    equals the area of the Delaunay triangulation triangulation_area measures."""
+    from scipy.spatial import ConvexHull, QhullError
+    xy = _outline_points(xy)
+    if len(xy) < 3:
+        return 0.0, 0.0, xy
+    try:
+        hull = ConvexHull(xy)
+    except QhullError:
+        # All points on a line: no area
+        return 0.0, 0.0, xy
+    # For 2D hulls qhull's volume is the area and its area is the perimeter
+    return round(float(hull.volume), 1), round(float(hull.area), 1), xy[hull.vertices]
+
+def storey_geometry(coordinates, elevations):
+    """Area, perimeter and footprint of the points in each storey's elevation band.
+
+    Points are binned once with storey_bands and grouped with a single sort;
+    the per-storey outlines are then computed concurrently. elevations are
+    ascending storey elevations in the same units as the coordinates; when
+    several storeys share an elevation, the first of them gets the band.
+    Returns one dict per elevation with 'points', 'area', 'perimeter' and
+    'footprint' (the plan outline as an (M, 2) array). A coordinate store is
+    read chunk by chunk, keeping only each band's hull vertices.
+    """
+    if not len(elevations):
+        return []
+    levels, first_storey = np.unique(np.asarray(elevations, dtype=float), return_index=True)
+
+    def band_groups(coords):
+        bands = storey_bands(coords[:, 2], levels)
+        order = np.argsort(bands, kind='stable')
+        boundaries = np.searchsorted(bands[order], np.arange(1, len(levels)))
+        return np.split(coords[order][:, :2], boundaries)
+
+    if is_store(coordinates):
+        counts = np.zeros(len(levels), dtype=np.int64)
+        parts = [[] for _ in levels]
+        for chunk in coordinates.chunks():
+            for band, group in enumerate(band_groups(chunk)):
+                if len(group):
+                    counts[band] += len(group)
+                    parts[band].append(_hull_vertices(group))
+        groups = [np.concatenate(part) if part else np.empty((0, 2)) for part in parts]
+        counts = counts.tolist()
+    else:
+        groups = band_groups(np.asarray(coordinates, dtype=float).reshape(-1, 3))
+        counts = [len(group) for group in groups]
+
+    with ThreadPoolExecutor(max_workers=min(len(groups), os.cpu_count() or 1)) as executor:
+        outlines = list(executor.map(_plan_outline, groups))
+
+    geometry = [{'points': 0, 'area': 0.0, 'perimeter': 0.0, 'footprint': np.empty((0, 2))} for _ in elevations]
+    for storey, count, (area, perimeter, footprint) in zip(first_storey, counts, outlines):
+        geometry[storey] = {'points': count, 'area': area, 'perimeter': perimeter, 'footprint': footprint}
+    return geometry
+
 def calculate_wind_loads_and_present(wind_force, building_height, roof_perimeter, ifc_path):
     """
     Calculate and present wind loads on the building.
@@ -166,98 +283,110 @@ def calculate_wind_loads_and_present(wind_force, building_height, roof_perimeter
 
     return results
 
+def _mean_pressure(pressures):
+    """Reduces per-element roof pressures ({GlobalId: value}) to one value."""
+    if isinstance(pressures, dict):
+        values = [float(v) for v in pressures.values() if v is not None]
+        return float(np.mean(values)) if values else 0.0
+    return pressures
+
 def calculate_linear_load(perimeter, uplift_pressures, down_pressures):
-    net_pressure = down_pressures - uplift_pressures
+    """Net roof pressure times perimeter; pressures may be scalars or the
+    per-element dicts returned by extract_roof_pressures (averaged)."""
+    net_pressure = _mean_pressure(down_pressures) - _mean_pressure(uplift_pressures)
     linear_load = net_pressure * perimeter
-    return round(linear_load, 2)
+    return _round(linear_load, 2)
 
 def calculate_wall_moments(wind_force, height):
     moment = wind_force * height
-    return round(moment, 2)
+    return _round(moment, 2)
 
-def calculate_roof_perimeter(coordinates):
-    """Calculate the perimeter of the roof based on the given coordinates."""
-    if not coordinates:
+# Outlines calculate_roof_perimeter can trace around the roof points
+ROOF_OUTLINES = ('hull', 'concave')
+
+# Points within this many feet of the highest point count as roof points
+ROOF_BAND_TOLERANCE = 0.5
+
+def _edge_lengths(points, edges):
+    """Total length of the (M, 2) index pairs edges into points."""
+    ends = points[edges]
+    return float(np.hypot(*(ends[:, 1] - ends[:, 0]).T).sum())
+
+def _concave_edges(xy, alpha=None):
+    """Boundary edges of the alpha shape of xy.
+
+    Delaunay triangles with a circumradius above alpha are dropped; edges
+    left with exactly one triangle form the outline (holes included). With
+    no alpha, twice the median Delaunay edge length is used, which keeps
+    regularly spaced roof points whole but cuts across notches and courtyards.
+    """
+    from scipy.spatial import Delaunay
+    simplices = Delaunay(xy).simplices
+    corners = xy[simplices]
+    a = np.hypot(*(corners[:, 1] - corners[:, 2]).T)
+    b = np.hypot(*(corners[:, 0] - corners[:, 2]).T)
+    c = np.hypot(*(corners[:, 0] - corners[:, 1]).T)
+    if alpha is None:
+        alpha = 2.0 * float(np.median(np.concatenate([a, b, c])))
+    area = triangle_areas(xy, simplices)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circumradius = a * b * c / (4.0 * area)
+    kept = simplices[circumradius <= alpha]
+
+    edges = np.sort(np.concatenate([kept[:, [0, 1]], kept[:, [1, 2]], kept[:, [0, 2]]]), axis=1)
+    # One int64 key per edge makes counting shared edges a 1D unique
+    keys, counts = np.unique(edges[:, 0].astype(np.int64) * len(xy) + edges[:, 1], return_counts=True)
+    boundary = keys[counts == 1]
+    return np.column_stack([boundary // len(xy), boundary % len(xy)])
+
+def roof_points(coordinates, tolerance=ROOF_BAND_TOLERANCE):
+    """Unique XY positions of the points within tolerance of the highest z."""
+    if is_store(coordinates):
+        if not len(coordinates):
+            return np.empty((0, 2))
+        top_z = coordinates.bounds()[1][2] - tolerance
+        parts = [np.unique(chunk[chunk[:, 2] >= top_z, :2], axis=0) for chunk in coordinates.chunks()]
+        return np.unique(np.concatenate(parts), axis=0)
+    coords = np.asarray(coordinates, dtype=float).reshape(-1, 3)
+    if len(coords) == 0:
+        return np.empty((0, 2))
+    top = coords[:, 2] >= coords[:, 2].max() - tolerance
+    return np.unique(coords[top, :2], axis=0)
+
+def calculate_roof_perimeter(coordinates, tolerance=ROOF_BAND_TOLERANCE, outline='hull', alpha=None):
+    """Calculate the perimeter of the roof based on the given coordinates.
+
+    Roof points are those within tolerance (feet) of the highest elevation.
+    outline is 'hull' for their convex hull or 'concave' for an alpha shape
+    that follows L-shaped and notched roofs; alpha is the largest triangle
+    circumradius the concave outline keeps (see _concave_edges).
+    """
+    if outline not in ROOF_OUTLINES:
+        raise ValueError(f"roof outline must be one of {', '.join(ROOF_OUTLINES)}, got {outline!r}")
+    xy = roof_points(coordinates, tolerance)
+    if len(xy) < 3:
         return 0.0
-    
-    # Extract the Z-axis values
-    z_vals = [coord[2] for coord in coordinates]
-    
-    # Find the maximum Z-axis value (highest elevation)
-    max_z = max(z_vals)
-    
-    # Extract coordinates that are at the highest elevation
-    roof_coords = [coord[:2] for coord in coordinates if coord[2] == max_z]
-    
-    if len(roof_coords) < 3:
+
+    from scipy.spatial import ConvexHull, QhullError
+    try:
+        if outline == 'hull':
+            edges = ConvexHull(xy).simplices
+        else:
+            edges = _concave_edges(xy, alpha)
+    except QhullError:
+        # All roof points on a line: no enclosed roof
         return 0.0
+    return round(_edge_lengths(xy, edges), 2)
 
-    perimeter = 0.0
-    num_points = len(roof_coords)
-    
-    for i in range(num_points):
-        x1, y1 = roof_coords[i]
-        x2, y2 = roof_coords[(i + 1) % num_points]
-        distance = np.sqrt((x2 - x1)**2 + (y2 - y1)**2)
-        perimeter += distance
-    
-    return round(perimeter, 2)
-
-def calculate_dead_load(ifc_file):
-    # Open the IFC file
-    model = ifcopenshell.open(ifc_file)
-
-    total_dead_load = 0.0
-
-    for element in model.by_type('IfcElementQuantity'):
-        for quantity in element.Quantities:
-            if quantity.is_a('IfcQuantityWeight'):
-                if 'Dead Load' in quantity.Name or 'DeadLoad' in quantity.Name or 'Gross Weight' in quantity.Name or 'GrossWeight' in quantity.Name:
-                    total_dead_load += quantity.WeightValue
-
-    return total_dead_load
-
-
-def calculate_wind_loads(ifc_file):
-    # Open the IFC file
-    model = ifcopenshell.open(ifc_file)
-
-    wind_pressure = 0.0
-    wall_moment = 0.0
-
-    # List of possible names for wind pressure and wall moment
-    wind_pressure_names = ['Wind Pressure', 'WindPressure', 'Wind Load', 'WindLoad', 'Wind_Pressure', 'Wind_Load']
-    wall_moment_names = ['Wall Moment', 'WallMoment', 'Wind Moment', 'WindMoment', 'Wall_Moment', 'Wind_Moment']
-
-    for element in model.by_type('IfcElementQuantity'):
-        for quantity in element.Quantities:
-            # Check for wind pressure
-            if any(name in quantity.Name for name in wind_pressure_names):
-                if quantity.is_a('IfcQuantityArea'):
-                    wind_pressure = quantity.AreaValue
-                elif quantity.is_a('IfcQuantityLength'):
-                    wind_pressure = quantity.LengthValue
-                elif quantity.is_a('IfcQuantityVolume'):
-                    wind_pressure = quantity.VolumeValue
-                elif quantity.is_a('IfcQuantityForce'):
-                    wind_pressure = quantity.ForceValue
-                elif quantity.is_a('IfcQuantityPressure'):
-                    wind_pressure = quantity.PressureValue
-
-            # Check for wall moment
-            if any(name in quantity.Name for name in wall_moment_names):
-                if quantity.is_a('IfcQuantityArea'):
-                    wall_moment = quantity.AreaValue
-                elif quantity.is_a('IfcQuantityLength'):
-                    wall_moment = quantity.LengthValue
-                elif quantity.is_a('IfcQuantityVolume'):
-                    wall_moment = quantity.VolumeValue
-                elif quantity.is_a('IfcQuantityForce'):
-                    wall_moment = quantity.ForceValue
-                elif quantity.is_a('IfcQuantityMoment'):
-                    wall_moment = quantity.MomentValue
-
-    return {'Wind Pressure': wind_pressure, 'Wall Moment': wall_moment}
+def calculate_dead_load(ifc_source):
+    """Total of the weight quantities named like a dead load alias (see quantities.DEFAULT_ALIASES)."""
+    return quantity_totals(ifc_source)['dead_load']
+
+
+def calculate_wind_loads(ifc_source):
+    """Wind pressure and wall moment quantities, matched by the alias table in quantities."""
+    totals = quantity_totals(ifc_source)
+    return {'Wind Pressure': totals['wind_pressure'], 'Wall Moment': totals['wall_moment']}
 
 def calculate_snow_load(roof_area, snow_load_per_unit_area):
     """
@@ -268,7 +397,7 @@ def calculate_snow_load(roof_area, snow_load_per_unit_area):
     :return: Total snow load in lbs.
     """
     total_snow_load = roof_area * snow_load_per_unit_area
-    return round(total_snow_load, 2)
+    return _round(total_snow_load, 2)
 
 def calculate_ice_load(roof_area, ice_load_per_unit_area):
     """
@@ -279,5 +408,5 @@ def calculate_ice_load(roof_area, ice_load_per_unit_area):
     :return: Total ice load in lbs.
     """
     total_ice_load = roof_area * ice_load_per_unit_area
-    return round(total_ice_load, 2)
+    return _round(total_ice_load, 2)
 
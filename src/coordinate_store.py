@@ -0,0 +1,192 @@
+"""Memory-mapped on-disk store for point clouds larger than memory.
+
+In low-memory mode the cartesian points never exist as one in-memory
+array: StreamedModel appends them to a StoreWriter as it scans the file,
+and every later copy (scaled to feet, cleaned) is another store written
+chunk by chunk. A CoordinateStore is an (N, 3) float64 .npy file mapped
+read-only; chunks() copies CHUNK_POINTS rows at a time and drops the pages
+it has read from the process again, so a full pass costs one chunk of
+memory however many points there are.
+
+The geometry, cleanup and plotting code checks is_store() and then works
+chunk by chunk: convex hulls are merged from per-chunk hull vertices,
+deduplication and outlier removal run slab by slab (see point_cleanup),
+and plots are drawn from per-chunk level-of-detail polylines.
+
+    with StoreWriter(path) as writer:
+        for block in blocks:
+            writer.append(block)
+    store = writer.store
+    for chunk in store.chunks():
+        ...
+
+Stores pickle as a reference to their file, so cached extraction results
+and stage memo entries stay small; unpickling fails once the file has been
+removed or rewritten, which the caches treat as a miss.
+"""
+import io
+import mmap
+import os
+import pickle
+
+import numpy as np
+
+# Rows per chunk: 24 MB of float64 coordinates
+CHUNK_POINTS = 1 << 20
+
+_HEADER_SIZE = 128
+
+
+def _header(count):
+    buf = io.BytesIO()
+    np.lib.format.write_array_header_1_0(buf, {'descr': '<f8', 'fortran_order': False, 'shape': (count, 3)})
+    header = buf.getvalue()
+    if len(header) != _HEADER_SIZE:
+        raise ValueError(f"unexpected .npy header size {len(header)}")
+    return header
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def is_store(coords):
+    return isinstance(coords, CoordinateStore)
+
+
+def _reopen(path, stamp):
+    try:
+        if _stamp(path) == stamp:
+            return CoordinateStore(path)
+    except OSError:
+        pass
+    raise pickle.UnpicklingError(f"coordinate store {path} is missing or has changed")
+
+
+class CoordinateStore:
+    """An (N, 3) float64 .npy file, memory-mapped read-only; see the module docstring."""
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+            if dtype != np.float64 or fortran_order or len(shape) != 2 or shape[1] != 3:
+                raise ValueError(f"{path} is not an (N, 3) float64 array")
+            self._offset = f.tell()
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stamp = _stamp(path)
+        self.array = np.frombuffer(self._mmap, dtype=np.float64, count=shape[0] * 3, offset=self._offset).reshape(shape)
+
+    def __len__(self):
+        return len(self.array)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    def __array__(self, dtype=None, copy=None):
+        # The mapped array itself: callers that need every point get it without a copy
+        return self.array if dtype is None else self.array.astype(dtype, copy=False)
+
+    def __reduce__(self):
+        return _reopen, (self.path, self.stamp)
+
+    def memo_key(self):
+        """Identity for stage_graph memo keys: the file and its modification stamp."""
+        return f"{self.path}:{self.stamp[0]}:{self.stamp[1]}"
+
+    def sibling(self, name):
+        """Path for a store derived from this one, next to it."""
+        return f"{os.path.splitext(self.path)[0]}-{name}.npy"
+
+    def _release(self, start, stop):
+        """Drops the mapped pages of rows start:stop from this process."""
+        if not hasattr(self._mmap, 'madvise') or not hasattr(mmap, 'MADV_DONTNEED'):
+            return
+        begin = self._offset + start * 24
+        begin -= begin % mmap.PAGESIZE
+        end = min(self._offset + stop * 24, len(self._mmap))
+        if end > begin:
+            self._mmap.madvise(mmap.MADV_DONTNEED, begin, end - begin)
+
+    def chunks(self, size=None):
+        """Yields the rows as in-memory (M, 3) arrays of at most size (default CHUNK_POINTS) rows, in order."""
+        size = size or CHUNK_POINTS
+        for start in range(0, len(self.array), size):
+            stop = min(start + size, len(self.array))
+            chunk = np.array(self.array[start:stop])
+            self._release(start, stop)
+            yield chunk
+
+    def bounds(self):
+        """(low, high) corners of the points, each a length-3 array."""
+        low = np.full(3, np.inf)
+        high = np.full(3, -np.inf)
+        for chunk in self.chunks():
+            low = np.minimum(low, chunk.min(axis=0))
+            high = np.maximum(high, chunk.max(axis=0))
+        return low, high
+
+
+class StoreWriter:
+    """Appends (M, 3) blocks to a new store; the file appears at path on close."""
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self.store = None
+        self._tmp_path = f"{path}.{os.getpid()}.tmp"
+        self._file = open(self._tmp_path, 'wb')
+        self._file.write(_header(0))
+
+    def append(self, points):
+        points = np.ascontiguousarray(points, dtype=np.float64).reshape(-1, 3)
+        if not len(points):
+            return
+        self._file.write(memoryview(points).cast('B'))
+        self.count += len(points)
+
+    def close(self):
+        """Finishes the file and returns it as a CoordinateStore."""
+        if self.store is None:
+            self._file.seek(0)
+            self._file.write(_header(self.count))
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+            self.store = CoordinateStore(self.path)
+        return self.store
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self._tmp_path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def write_store(path, blocks):
+    """Writes an iterable of (M, 3) blocks to a new store at path and returns it."""
+    with StoreWriter(path) as writer:
+        for block in blocks:
+            writer.append(block)
+    return writer.store
+
+
+def coordinate_bounds(coords):
+    """(low, high) corners of a store or an (N, 3) array."""
+    if is_store(coords):
+        return coords.bounds()
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    return coords.min(axis=0), coords.max(axis=0)
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sys
+import pickle
+import tempfile
+
+# Bump whenever an extractor changes what it returns, so stale entries are
+# never served for a file whose content has not changed.
+EXTRACTOR_VERSION = 3
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'IFC_ANALYZER_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.ifc_analyzer_cache'),
+)
+DEFAULT_MAX_BYTES = int(os.environ.get('IFC_ANALYZER_CACHE_MAX_MB', '1024')) * 1024 * 1024
+
+_MISSING = object()
+_default_cache = None
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Returns the hex content hash of a file, read in chunks."""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """On-disk store of extraction results keyed by IFC content hash.
+
+    Each entry is one pickle file named after the file hash, the extractor
+    version and the result name. Reads refresh the entry's modification time,
+    and writes evict the least recently used entries once the directory grows
+    past max_bytes.
+    """
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, version=EXTRACTOR_VERSION):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, file_hash, name):
+        safe_name = ''.join(c if c.isalnum() or c in '-_.' else '_' for c in name)
+        return os.path.join(self.cache_dir, f"{file_hash}-v{self.version}-{safe_name}.pkl")
+
+    def get(self, file_hash, name, default=None):
+        path = self._entry_path(file_hash, name)
+        try:
+            # Touch first: another process or thread may evict the entry at any moment
+            os.utime(path)
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return default
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+            print(f"Discarding unreadable cache entry {path}: {e}", file=sys.stderr)
+            self._remove(path)
+            return default
+        return value
+
+    def put(self, file_hash, name, value):
+        path = self._entry_path(file_hash, name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def store_path(self, file_hash, name):
+        """Path for a coordinate_store file kept, and evicted, alongside the entries."""
+        return self._entry_path(file_hash, name)[:-len('.pkl')] + '.npy'
+
+    def has(self, file_hash, name):
+        return os.path.exists(self._entry_path(file_hash, name))
+
+    def entries(self):
+        """Returns (mtime, size, path) for every entry and coordinate store, oldest first."""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(('.pkl', '.npy')):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    # Evicted by another process or thread since the scan
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        entries.sort()
+        return entries
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """Removes least recently used entries until the cache fits in max_bytes."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # A store still mapped by another process cannot be removed on Windows
+            print(f"Could not remove cache entry {path}: {e}", file=sys.stderr)
+
+
+def default_cache():
+    """Returns the shared cache, or None when IFC_ANALYZER_CACHE=0 disables it."""
+    global _default_cache
+    if os.environ.get('IFC_ANALYZER_CACHE', '1') == '0':
+        return None
+    if _default_cache is None:
+        _default_cache = ExtractionCache()
+    return _default_cache
@@ -17,126 +17,207 @@ Include a header with Mythic Systems branding in each Python file:
 # (c) 2024 Mythic Systems
 # All rights reserved.
 '''
-import matplotlib
-#from main import *
-
-# from calculate import calculate_area_from_coords
-matplotlib.use('Agg')  # Use a non-interactive backend
-
-
-from read_methods import *
-from report import *
-from widget import *
-import tkinterDnD
-import ifcopenshell
-import re
-import seaborn as sns
-import matplotlib.pyplot as plt
-import numpy as np
-from scipy.spatial import Delaunay, ConvexHull
-from tkinter import Tk, messagebox, Label, Checkbutton, BooleanVar, Entry
-from tkinterdnd2 import TkinterDnD, DND_FILES
+import multiprocessing
 import os
-from fpdf import FPDF
-import tkinter as tk
-from tkinter import simpledialog
+import queue
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import customtkinter as ctk
 from CTkMessagebox import CTkMessagebox
 
-def on_drop(event, values):
+# Upper bound on files analyzed at once; each worker holds one whole model in memory
+MAX_WORKERS = int(os.environ.get('IFC_ANALYZER_GUI_WORKERS', min(4, os.cpu_count() or 1)))
+
+
+def split_drop_data(root, data):
+    """Splits a <<Drop>> payload into paths; Tcl braces paths that contain spaces."""
+    return [path for path in root.tk.splitlist(data) if path]
+
+
+class JobStatusView:
+    """One row per dropped file: name, progress bar, stage or output paths, and a cancel button."""
+    def __init__(self, master, width=250):
+        self.master = master
+        self.width = width
+        self.rows = {}
+
+    def add(self, job, on_cancel):
+        row = len(self.rows)
+        name = ctk.CTkLabel(self.master, text=os.path.basename(job['path']), font=("Arial", 12, "bold"), anchor='w')
+        name.grid(row=row, column=0, pady=2, padx=(10, 5), sticky='w')
+        bar = ctk.CTkProgressBar(self.master, width=self.width // 2, progress_color='#677791')
+        bar.grid(row=row, column=1, pady=2, padx=5)
+        bar.set(0)
+        status = ctk.CTkLabel(self.master, text="Queued", font=("Arial", 12), anchor='w', justify='left', wraplength=self.width)
+        status.grid(row=row, column=2, pady=2, padx=5, sticky='w')
+        cancel = ctk.CTkButton(self.master, text="Cancel", width=60, fg_color='#677791', hover_color='#677791',
+                               command=lambda: on_cancel(job['id']))
+        cancel.grid(row=row, column=3, pady=2, padx=(5, 10))
+        self.rows[job['id']] = {'bar': bar, 'status': status, 'cancel': cancel}
+
+    def update(self, job_id, fraction=None, text=None, finished=False):
+        row = self.rows[job_id]
+        if fraction is not None:
+            row['bar'].set(fraction)
+        if text is not None:
+            row['status'].configure(text=text)
+        if finished:
+            row['cancel'].configure(state='disabled')
+
+
+class AnalysisJobs:
+    """Runs dropped files through the pipeline in worker processes, up to max_workers at once.
+
+    Tk widgets may only be touched from the main thread and worker processes
+    cannot touch them at all, so workers (batch.analyze_job) post messages to
+    a manager queue that poll() drains every poll_ms via root.after, updating
+    the status view and showing the result boxes. Live loads are asked for
+    the same way: the main thread opens a widget.LiveLoadDialog for the job
+    and its callback puts the answer on the job's replies queue, which the
+    worker is waiting on.
+    """
+    def __init__(self, root, view=None, summary_label=None, max_workers=MAX_WORKERS, poll_ms=100):
+        self.root = root
+        self.view = view
+        self.summary_label = summary_label
+        self.poll_ms = poll_ms
+        # spawn, so workers never inherit a forked copy of the Tk interpreter
+        context = multiprocessing.get_context('spawn')
+        self.manager = context.Manager()
+        self.messages = self.manager.Queue()
+        # Drops beyond max_workers wait in the executor's queue
+        self.executor = ProcessPoolExecutor(max_workers=max(1, max_workers), mp_context=context)
+        self.jobs = {}
+        self.next_id = 0
+        self.root.after(self.poll_ms, self.poll)
+
+    @property
+    def pending(self):
+        return sum(1 for job in self.jobs.values() if job['state'] in ('queued', 'running'))
+
+    def submit(self, ifc_path, inputs):
+        from batch import analyze_job
+        self.next_id += 1
+        job = {
+            'id': self.next_id, 'path': ifc_path, 'state': 'queued',
+            'cancel': self.manager.Event(), 'replies': self.manager.Queue(),
+        }
+        self.jobs[job['id']] = job
+        if self.view is not None:
+            self.view.add(job, self.cancel)
+        self.executor.submit(analyze_job, job['id'], ifc_path, inputs, self.messages, job['cancel'], job['replies'])
+        self._update_summary()
+        return job
+
+    def cancel(self, job_id=None):
+        """Cancels one job, or every unfinished one; running jobs stop before their next stage."""
+        for job in self.jobs.values():
+            if (job_id is None or job['id'] == job_id) and job['state'] in ('queued', 'running'):
+                job['cancel'].set()
+                if job.get('live_load_dialog') is not None:
+                    job['live_load_dialog'].close()
+                self._update_view(job['id'], text="Cancelling...")
+
+    def shutdown(self):
+        self.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.manager.shutdown()
+
+    def poll(self):
+        try:
+            while True:
+                self._handle(self.messages.get_nowait())
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self.poll)
+
+    def _handle(self, message):
+        kind, job = message[0], self.jobs[message[1]]
+        if kind == 'started':
+            job['state'] = 'running'
+            self._update_view(job['id'], 0.0, "Starting")
+        elif kind == 'progress':
+            stage, index, total = message[2:]
+            text = f"{stage.replace('_', ' ')} ({index + 1}/{total})" if stage != 'done' else "Done"
+            self._update_view(job['id'], index / total, text)
+        elif kind == 'live_loads':
+            from widget import LiveLoadDialog
+            self._update_view(job['id'], text="Waiting for live loads")
+            job['live_load_dialog'] = LiveLoadDialog(
+                self.root, message[2], lambda live_loads, job=job: self._reply_live_loads(job, live_loads),
+                title=f"Live Load Input - {os.path.basename(job['path'])}")
+        else:
+            job['state'] = kind
+            if kind == 'done':
+                summary = message[2]
+                self._update_view(job['id'], 1.0, f"{summary['report_pdf']}", finished=True)
+                self._show_summary(summary)
+            elif kind == 'cancelled':
+                self._update_view(job['id'], 0.0, "Cancelled", finished=True)
+            else:
+                self._update_view(job['id'], None, f"Failed: {message[2]}", finished=True)
+                CTkMessagebox(title="Error", message=f"An error occurred analyzing {job['path']}: {message[2]}", icon="cancel")
+        self._update_summary()
+
+    def _reply_live_loads(self, job, live_loads):
+        job['live_load_dialog'] = None
+        job['replies'].put(live_loads)
+
+    def _show_summary(self, summary):
+        # Message about the number of stories
+        floor_count = summary['floor_count']
+        multi_story_msg = "The building is a single story."
+        if floor_count > 1:
+            multi_story_msg = f"The building has {floor_count} stories."
+        CTkMessagebox(title="Info", message=f"Report saved to {summary['report_pdf']}\nPlot saved to {summary['plot_pdf']}\nAuxiliary data saved to {summary['aux_pdf']}\n{multi_story_msg}")
+
+    def _update_view(self, job_id, fraction=None, text=None, finished=False):
+        if self.view is not None:
+            self.view.update(job_id, fraction, text, finished)
+
+    def _update_summary(self):
+        if self.summary_label is None:
+            return
+        states = [job['state'] for job in self.jobs.values()]
+        running, queued = states.count('running'), states.count('queued')
+        finished = len(states) - running - queued
+        self.summary_label.configure(text=f"{running} running, {queued} queued, {finished} finished" if states else "Idle")
+
+
+def on_drop(event, values, jobs):
     try:
-        print("Drop event triggered!")
-        
-        # Print the event data
-        print(f"Event data: {event.data}")
-        
-        ifc_file_path = event.data.strip('{}')  # Remove curly braces if present
-        print(f"Processed file path: {ifc_file_path}")
-
-        # Entry widgets
-        wind_speed_entry = values["wind_speed_entry"]
-        snow_load_entry = values["snow_load_entry"]
-        ice_load_entry = values["ice_load_entry"]
-        zero_check = values["remove_zero_point_var"]
-        site_class_entry = values["site_class_entry"]
-        importance_factor_entry = values["importance_factor_entry"]
-        spectral_response_acceleration_entry = values["spectral_response_acceleration_entry"]
-
-        # Assume parse_ifc_file, extract methods, calculate methods are correctly implemented
-        from read_methods import parse_ifc_file, extract_element_counts, extract_section_types, extract_floor_data, extract_forces_moments, extract_roof_pressures
-        from calculate import calculate_perimeter, calculate_roof_perimeter, calculate_area_from_coords, calculate_snow_load, calculate_ice_load, calculate_wind_loads, calculate_dead_load, calculate_beam_column_weight
-        from report import create_Aux_pdf, plot_coordinates
-        from widget import live_load_widget
-        from Seismicwidget import compute_seismic_load
-
-        coordinates = parse_ifc_file(ifc_file_path, zero_val=zero_check)
-        areas = calculate_area_from_coords(coordinates)
-
-        output_path = os.path.splitext(ifc_file_path)[0] + "_coordinate_plots.pdf"
-        floor_count = extract_floor_data(ifc_file_path)
-        forces, moments = extract_forces_moments(ifc_file_path)
-        uplift_pressures, down_pressures = extract_roof_pressures(ifc_file_path)
-        perimeter = calculate_perimeter(coordinates)
-        roof_perimeter = calculate_roof_perimeter(coordinates)
-
-        # Call the live_load_widget function to get live load inputs
-        live_loads = live_load_widget(floor_count)
-        ## print("Live Loads: ", live_loads)
-
-        plot_coordinates(coordinates, areas, output_path, ifc_file_path)
-        print(f"Output saved to: {output_path}")
-
-        Aux_output_path = os.path.splitext(ifc_file_path)[0] + "_Aux.pdf"
-
-        # Validate and convert inputs safely
+        # Several files arrive as one Tcl list, e.g. "{C:/My Models/a.ifc} C:/b.ifc"
+        paths = split_drop_data(jobs.root, event.data)
+        ifc_paths = [path for path in paths if path.lower().endswith('.ifc')]
+        skipped = [path for path in paths if path not in ifc_paths]
+        if skipped:
+            CTkMessagebox(title="Error", message="Not IFC files, skipped:\n" + "\n".join(skipped), icon="warning")
+        if not ifc_paths:
+            return
+
+        from pipeline import parse_inputs
+
+        # Entry values are read here, on the Tk thread; the analyses run in the workers
         try:
-            # roof_uplift = float(roof_uplift_entry or "0")
-            ## print('daaaaaa',roof_uplift)
-            # roof_downpressure = float(roof_downpressure_entry or "0")
-            wind_speed = float(wind_speed_entry or "0")
-            snow_load_per_unit_area = float(snow_load_entry or "0")
-            ice_load_per_unit_area = float(ice_load_entry or "0")
-
-            # Calculate total snow and ice loads
-            roof_area = areas[0]  # Assuming the XY area is the roof area
-            total_snow_load = calculate_snow_load(roof_area, snow_load_per_unit_area)
-            ice_load_total = calculate_ice_load(roof_area, ice_load_per_unit_area)
-            seismic_load = compute_seismic_load(
-                float(site_class_entry or "0"),
-                float(importance_factor_entry or "0"),
-                float(spectral_response_acceleration_entry or "0")
-            )
-
-            # Extract element counts
-            element_counts = extract_element_counts(ifc_file_path)
-
-            # Calculate wind loads
-            wind_loads = calculate_wind_loads(ifc_file_path)
-
-            # Calculate dead load
-            dead_load = calculate_dead_load(ifc_file_path)
-
-            # Calculate beam and column weights
-            total_weight = calculate_beam_column_weight(ifc_file_path)
-
-            # Create Auxiliary PDF
-            create_Aux_pdf(
-                element_counts, Aux_output_path, ifc_file_path, floor_count, forces, moments, perimeter,
-                uplift_pressures, down_pressures, wind_speed, roof_perimeter, areas,
-                wind_loads, dead_load, total_weight, total_snow_load, ice_load_total, live_loads,
-                seismic_load
-            )
-
-            # Message about the number of stories
-            multi_story_msg = "The building is a single story."
-            if floor_count > 1:
-                multi_story_msg = f"The building has {floor_count} stories."
-
-            CTkMessagebox(title="Info", message=f"Plot saved to {output_path}\nAuxiliary data saved to {Aux_output_path}\n{multi_story_msg}")
-
+            inputs = parse_inputs({
+                "wind_speed": values["wind_speed_entry"].get(),
+                "snow_load": values["snow_load_entry"].get(),
+                "ice_load": values["ice_load_entry"].get(),
+                "remove_zero_point": values["remove_zero_point_var"].get(),
+                "site_class": values["site_class_entry"].get(),
+                "importance_factor": values["importance_factor_entry"].get(),
+                "spectral_response_acceleration": values["spectral_response_acceleration_entry"].get(),
+                "dedup_tolerance": values["dedup_tolerance_entry"].get(),
+                "outlier_std_ratio": values["outlier_std_ratio_entry"].get(),
+            })
         except ValueError as e:
             CTkMessagebox(title="Error", message=f"Please enter valid numbers: {e}")
-    except Exception as e:
-        print(f"Error in on_drop function: {e}")
-        CTkMessagebox(title="Error", message=f"An error occurred: {e}", icon="cancel")
+            return
 
+        for ifc_file_path in ifc_paths:
+            jobs.submit(ifc_file_path, inputs)
 
+    except Exception as e:
+        print(f"Error in on_drop function: {e}", file=sys.stderr)
+        CTkMessagebox(title="Error", message=f"An error occurred: {e}", icon="cancel")
@@ -0,0 +1,114 @@
+"""Measures how long the headless core takes to import.
+
+Run from the src directory:
+
+    python import_budget.py [--budget-ms 400]
+
+The core modules are imported in a fresh interpreter with -X importtime.
+The check fails if the total exceeds the budget or if any GUI, plotting or
+PDF module gets pulled in along the way.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+CORE_MODULES = [
+    'IFCAnalyzer',
+    'read_methods',
+    'calculate',
+    'step_reader',
+    'property_index',
+    'quantities',
+    'pipeline',
+    'extraction_cache',
+    'Seismicaddons',
+    'Seismicwidget',
+    'report',
+    'instrument',
+    'streamed_model',
+    'coordinate_store',
+    'point_cleanup',
+    'sweep',
+    'stage_graph',
+    'pdf_stream',
+    'model_export',
+]
+
+# Modules the core must never import at load time
+FORBIDDEN_MODULES = [
+    'tkinter',
+    'customtkinter',
+    'tkinterdnd2',
+    'CTkMessagebox',
+    'PIL',
+    'matplotlib',
+    'seaborn',
+    'scipy',
+    'fpdf',
+    'ifcopenshell',
+]
+
+DEFAULT_BUDGET_MS = float(os.environ.get('IFC_ANALYZER_IMPORT_BUDGET_MS', '400'))
+
+
+def measure_imports(modules=CORE_MODULES):
+    """Imports modules in a fresh interpreter.
+
+    Returns (total_ms, per_module_ms, loaded), where per_module_ms maps each
+    top-level import to its cumulative time and loaded is every module name
+    that ended up in sys.modules.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    code = (
+        "import sys\n"
+        + ''.join(f"import {name}\n" for name in modules)
+        + "print('\\n'.join(sorted(sys.modules)))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=here, capture_output=True, text=True, check=True,
+    )
+
+    per_module_ms = {}
+    for line in result.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package"
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        if not name.startswith(' ' * 2):
+            per_module_ms[name.strip()] = int(cumulative) / 1000.0
+    total_ms = sum(per_module_ms.values())
+    loaded = set(result.stdout.split())
+    return total_ms, per_module_ms, loaded
+
+
+def check_budget(budget_ms=DEFAULT_BUDGET_MS, modules=CORE_MODULES):
+    """Returns (problems, total_ms): a list of problems, empty when the core is
+    within budget, and the measured total import time in milliseconds."""
+    total_ms, per_module_ms, loaded = measure_imports(modules)
+    problems = []
+    leaked = sorted(name for name in FORBIDDEN_MODULES if name in loaded)
+    if leaked:
+        problems.append(f"core imports GUI/plotting modules: {', '.join(leaked)}")
+    if total_ms > budget_ms:
+        slowest = sorted(per_module_ms.items(), key=lambda item: item[1], reverse=True)[:5]
+        detail = ', '.join(f"{name} {ms:.0f} ms" for name, ms in slowest)
+        problems.append(f"core import took {total_ms:.0f} ms (budget {budget_ms:.0f} ms); slowest: {detail}")
+    return problems, total_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check the import-time budget of the headless core.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    problems, total_ms = check_budget(args.budget_ms)
+    print(f"Core import time: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""Opt-in per-stage instrumentation for the analysis pipeline.
+
+Set IFC_ANALYZER_PROFILE=1 (or pass profile=True to run_analysis, or
+--profile to batch.py) to record, for every pipeline stage, its wall time,
+CPU time, peak traced memory and the number of entities or values it
+produced. IFC_ANALYZER_PROFILE=time records timings only and skips
+tracemalloc, which slows allocation-heavy stages down noticeably.
+
+Peak memory is what tracemalloc sees (Python and NumPy allocations); the
+process's peak resident size is recorded alongside it, where the platform
+reports one, to cover memory held inside ifcopenshell.
+
+CPU time is the process's (time.process_time), so a stage that overlapped
+another one is charged for both; its record's cpu_scope is then 'process'
+rather than 'stage'.
+"""
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+PROFILE_ENV = 'IFC_ANALYZER_PROFILE'
+
+
+def profile_mode(value=None):
+    """Returns None (off), 'time' or 'memory' for a flag or the environment setting."""
+    if value is None:
+        value = os.environ.get(PROFILE_ENV, '')
+    if isinstance(value, bool):
+        return 'memory' if value else None
+    value = str(value).strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return None
+    return 'time' if value == 'time' else 'memory'
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / 1e6 if sys.platform == 'darwin' else rss / 1e3
+
+
+class StageRecorder:
+    """Collects one record per stage; use stage() as a context manager around each one."""
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = []
+        self.planned = []
+        self._running = 0
+        self._starts = 0
+        self._lock = threading.Lock()
+        self._own_tracing = False
+        self._started = time.perf_counter()
+
+    def start(self, stages=None):
+        """Starts timing the run; stages names every stage it is expected to record."""
+        if stages is not None:
+            self.planned = list(stages)
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._own_tracing = True
+        self._started = time.perf_counter()
+        return self
+
+    def stop(self):
+        if self._own_tracing:
+            tracemalloc.stop()
+            self._own_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Times the enclosed block; set record['count'] inside it to note how much it produced."""
+        record = {'stage': name, 'count': None}
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        with self._lock:
+            self._running += 1
+            self._starts += 1
+            starts = self._starts
+            overlapped = self._running > 1
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall0, 4)
+            record['cpu_s'] = round(time.process_time() - cpu0, 4)
+            # Another stage was running when this one started, or started while it ran
+            with self._lock:
+                overlapped = overlapped or self._starts != starts
+                self._running -= 1
+            record['cpu_scope'] = 'process' if overlapped else 'stage'
+            record['peak_mb'] = None
+            if self.memory and tracemalloc.is_tracing():
+                record['peak_mb'] = round((tracemalloc.get_traced_memory()[1] - base) / 1e6, 2)
+            rss = _max_rss_mb()
+            record['max_rss_mb'] = round(rss, 1) if rss is not None else None
+            self.stages.append(record)
+
+    def to_dict(self):
+        return {
+            'total_wall_s': round(time.perf_counter() - self._started, 4),
+            'memory_traced': self.memory,
+            'stages': list(self.stages),
+        }
+
+    def write_json(self, path, **extra):
+        with open(path, 'w') as f:
+            json.dump(dict(self.to_dict(), **extra), f, indent=2)
+
+    def report_lines(self):
+        """One text line per stage recorded so far, slowest stages first, for the PDF appendix.
+
+        A last line names the planned stages that have no record yet, such as
+        the ones still running or writing the PDF the lines go into.
+        """
+        lines = []
+        for record in sorted(self.stages, key=lambda r: r['wall_s'], reverse=True):
+            cpu = 'CPU, process-wide' if record['cpu_scope'] == 'process' else 'CPU'
+            parts = [f"{record['stage']}: {record['wall_s']:.3f} s wall, {record['cpu_s']:.3f} s {cpu}"]
+            if record['peak_mb'] is not None:
+                parts.append(f"peak {record['peak_mb']:.1f} MB")
+            if record['count'] is not None:
+                parts.append(f"count {record['count']}")
+            lines.append(', '.join(parts))
+        recorded = {record['stage'] for record in self.stages}
+        unrecorded = [name for name in self.planned if name not in recorded]
+        if unrecorded:
+            lines.append(f"Not yet finished when this page was built, see the profile JSON: {', '.join(unrecorded)}")
+        return lines
+
+
+class NullRecorder:
+    """Stand-in used when profiling is off; stage() only hands back a scratch dict."""
+    stages = ()
+
+    def start(self, stages=None):
+        return self
+
+    def stop(self):
+        pass
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        yield {}
+
+
+def recorder_for(profile=None, stages=None):
+    """Returns a started recorder for a profile flag, recorder or the environment setting.
+
+    stages names the stages the run will record (see StageRecorder.start).
+    """
+    if isinstance(profile, (StageRecorder, NullRecorder)):
+        return profile.start(stages)
+    mode = profile_mode(profile)
+    if mode is None:
+        return NullRecorder()
+    return StageRecorder(memory=mode == 'memory').start(stages)
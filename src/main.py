@@ -61,7 +61,7 @@ def on_calculate(entries):
 
 
 def main():
-    from gui import on_drop
+    from gui import AnalysisJobs, JobStatusView, on_drop
     ctk.set_appearance_mode("system")  # Default to light mode
     root = CTk()
 
@@ -85,9 +85,18 @@ def main():
     my_button = ctk.CTkButton(content_frame, text='Change Mode', command=change, font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791',image=dark_light_image, compound='left')
     my_button.grid(row=0, column=2, pady=(0, 0), sticky='e')  # Adjusted to be visible
 
+    # Point cleanup options (see point_cleanup.py), applied before any geometry
+    cleanup_frame = ctk.CTkFrame(content_frame, fg_color='transparent')
+    cleanup_frame.grid(row=0, column=0, columnspan=2, pady=(30, 10), padx=(50, 0), sticky='w')
     remove_zero_point_var = BooleanVar(value=False)
-    checkbox = ctk.CTkCheckBox(content_frame, text="Remove (0,0,0) Point", variable=remove_zero_point_var, font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791')
-    checkbox.grid(row=0, column=0, pady=50, padx=(50, 0), sticky='w')
+    checkbox = ctk.CTkCheckBox(cleanup_frame, text="Remove (0,0,0) Points", variable=remove_zero_point_var, font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791')
+    checkbox.grid(row=0, column=0, columnspan=2, pady=(0, 10), sticky='w')
+    ctk.CTkLabel(cleanup_frame, text="Merge Points Within (ft)", font=("Arial", 14, "bold")).grid(row=1, column=0, pady=5, sticky='w')
+    dedup_tolerance_entry = ctk.CTkEntry(cleanup_frame, width=120, placeholder_text="0 = exact")
+    dedup_tolerance_entry.grid(row=1, column=1, padx=(20, 0), sticky='w')
+    ctk.CTkLabel(cleanup_frame, text="Drop Outliers Beyond (std)", font=("Arial", 14, "bold")).grid(row=2, column=0, pady=5, sticky='w')
+    outlier_std_ratio_entry = ctk.CTkEntry(cleanup_frame, width=120, placeholder_text="0 = off")
+    outlier_std_ratio_entry.grid(row=2, column=1, padx=(20, 0), sticky='w')
 
 
     # Site Class Dropdown
@@ -132,6 +141,8 @@ def main():
         "ice_load_entry": ice_load_entry,
         "wind_speed_entry": wind_speed_entry,
         "remove_zero_point_var": remove_zero_point_var,
+        "dedup_tolerance_entry": dedup_tolerance_entry,
+        "outlier_std_ratio_entry": outlier_std_ratio_entry,
         "site_class_entry": site_class_entry,
         "importance_factor_entry": importance_factor_entry,
         "spectral_response_acceleration_entry": spectral_response_acceleration_entry,
@@ -144,8 +155,24 @@ def main():
                                      command=lambda: on_calculate(entries))
     calculate_button.grid(row=12, column=2, pady=20, padx=(50, 0), sticky='e')
 
+    summary_label = ctk.CTkLabel(content_frame, text="Idle", font=("Arial", 12))
+    summary_label.grid(row=9, column=0, pady=(10, 0), padx=(50, 0), sticky='w')
+    cancel_button = ctk.CTkButton(content_frame, text="Cancel All", font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791')
+    cancel_button.grid(row=9, column=2, pady=(10, 0), padx=(50, 0), sticky='e')
+    # Combined status of every dropped file
+    status_frame = ctk.CTkScrollableFrame(content_frame, height=200)
+    status_frame.grid(row=10, column=0, columnspan=3, pady=(10, 0), padx=(50, 0), sticky='we')
+
+    jobs = AnalysisJobs(root, view=JobStatusView(status_frame, width=entry_width), summary_label=summary_label)
+    cancel_button.configure(command=jobs.cancel)
+
+    def on_close():
+        jobs.shutdown()
+        root.destroy()
+
     # Ensure the event is properly bound
-    root.dnd_bind('<<Drop>>', lambda event: on_drop(event, entries))  
+    root.dnd_bind('<<Drop>>', lambda event: on_drop(event, entries, jobs))
+    root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
 
 if __name__ == '__main__':
@@ -0,0 +1,192 @@
+"""Columnar export of everything the analysis reads from an IFC model.
+
+export_model runs the model-reading stages of pipeline.ANALYSIS_GRAPH once
+and writes their results to one compressed NumPy archive, <model>.npz, as
+flat arrays, one per column:
+
+    coordinates          (N, 3) cartesian points in feet, before cleanup
+    floor_count, cfs_weight, dead_load, total_weight,
+    wind_pressure, wall_moment                     scalars
+    element_types, element_counts                  model-wide counts
+    vector_floors, forces, moments                 (F,) storey GlobalIds, (F, 3) totals
+    uplift_ids, uplift_values,
+    down_ids, down_values                          roof pressures by GlobalId
+    storey_ids, storey_names, storey_elevations,
+    storey_count_types, storey_counts              (S, T) counts per storey
+    member_ids, member_types, member_names, member_profiles,
+    member_storeys, member_lengths, member_weights the member schedule
+    format_version, file_hash, source
+
+Text columns are fixed-width unicode arrays with '' for a missing value
+(NaN for missing numbers), so the archive loads with allow_pickle=False and
+any NumPy or pandas job can read it without ifcopenshell:
+
+    data = np.load('tower.npz')
+    members = pd.DataFrame({name: data[name] for name in ('member_profiles', 'member_weights')})
+
+load_model turns an archive back into the analysis values, and run_analysis
+accepts the .npz path in place of the IFC file.
+"""
+import os
+
+import numpy as np
+
+from IFCAnalyzer import IFCAnalyzer
+
+# Bump when the columns change; load_model refuses other versions
+FORMAT_VERSION = 1
+
+EXPORT_SUFFIX = '.npz'
+
+_MEMBER_COLUMNS = [
+    ('member_ids', 'global_id'),
+    ('member_types', 'type'),
+    ('member_names', 'name'),
+    ('member_profiles', 'profile'),
+    ('member_storeys', 'storey'),
+]
+
+
+def is_model_export(path):
+    return str(path).lower().endswith(EXPORT_SUFFIX)
+
+
+def export_path(ifc_path, output_dir=None):
+    """Returns the path of the .npz export for an IFC file."""
+    base = os.path.splitext(ifc_path)[0]
+    if output_dir:
+        base = os.path.join(output_dir, os.path.basename(base))
+    return base + EXPORT_SUFFIX
+
+
+def _text(values):
+    return np.array(['' if value is None else str(value) for value in values], dtype=str)
+
+
+def _floats(values):
+    return np.array([np.nan if value is None else float(value) for value in values], dtype=np.float64)
+
+
+def _optional(value):
+    return value or None
+
+
+def _optional_float(value):
+    return None if np.isnan(value) else value
+
+
+def model_columns(values, file_hash, source):
+    """Flattens the model-reading stage outputs into the export's arrays."""
+    storeys = values['storey_list']
+    members = values['member_schedule']
+    count_types = list(storeys[0]['element_counts']) if storeys else []
+    columns = {
+        'format_version': np.array(FORMAT_VERSION),
+        'file_hash': np.array(file_hash),
+        'source': np.array(source),
+        'coordinates': np.asarray(values['raw_coordinates'], dtype=np.float64).reshape(-1, 3),
+        'floor_count': np.array(values['floor_count']),
+        'cfs_weight': np.array(float(values['cfs_weight'])),
+        'dead_load': np.array(float(values['dead_load'])),
+        'total_weight': np.array(float(values['total_weight'])),
+        'wind_pressure': np.array(float(values['wind_loads']['Wind Pressure'])),
+        'wall_moment': np.array(float(values['wind_loads']['Wall Moment'])),
+        'element_types': _text(values['element_counts']),
+        'element_counts': np.array(list(values['element_counts'].values()), dtype=np.int64),
+        'vector_floors': _text(values['forces']),
+        'forces': np.array(list(values['forces'].values()), dtype=np.float64).reshape(-1, 3),
+        'moments': np.array([values['moments'][floor] for floor in values['forces']], dtype=np.float64).reshape(-1, 3),
+        'uplift_ids': _text(values['uplift_pressures']),
+        'uplift_values': _floats(values['uplift_pressures'].values()),
+        'down_ids': _text(values['down_pressures']),
+        'down_values': _floats(values['down_pressures'].values()),
+        'storey_ids': _text(storey['global_id'] for storey in storeys),
+        'storey_names': _text(storey['name'] for storey in storeys),
+        'storey_elevations': _floats(storey['elevation'] for storey in storeys),
+        'storey_count_types': _text(count_types),
+        'storey_counts': np.array([[storey['element_counts'][t] for t in count_types] for storey in storeys],
+                                  dtype=np.int64).reshape(len(storeys), len(count_types)),
+        'member_lengths': _floats(member['length'] for member in members),
+        'member_weights': _floats(member['weight'] for member in members),
+    }
+    for column, key in _MEMBER_COLUMNS:
+        columns[column] = _text(member[key] for member in members)
+    return columns
+
+
+def write_model(path, values, file_hash, source):
+    """Writes the model-reading stage outputs to path as a compressed .npz archive."""
+    np.savez_compressed(path, **model_columns(values, file_hash, source))
+    return path
+
+
+def load_model(path):
+    """Reads an export back into the values the model-reading stages produce.
+
+    Returns a dict keyed like the pipeline.MODEL_GRAPH outputs, plus the
+    source IFC 'file_hash' and 'source' name.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        version = int(data['format_version'])
+        if version != FORMAT_VERSION:
+            raise ValueError(f"{path} is a version {version} model export; this version reads version {FORMAT_VERSION}")
+        count_types = data['storey_count_types'].tolist()
+        storeys = [
+            {
+                'global_id': global_id,
+                'name': _optional(name),
+                'elevation': _optional_float(elevation),
+                'element_counts': dict(zip(count_types, counts)),
+            }
+            for global_id, name, elevation, counts in zip(
+                data['storey_ids'].tolist(), data['storey_names'].tolist(),
+                data['storey_elevations'].tolist(), data['storey_counts'].tolist())
+        ]
+        member_text = [data[column].tolist() for column, _ in _MEMBER_COLUMNS]
+        members = [
+            {
+                'global_id': global_id,
+                'type': member_type,
+                'name': _optional(name),
+                'profile': _optional(profile),
+                'storey': _optional(storey),
+                'length': length,
+                'weight': weight,
+            }
+            for global_id, member_type, name, profile, storey, length, weight in zip(
+                *member_text, data['member_lengths'].tolist(), data['member_weights'].tolist())
+        ]
+        floors = data['vector_floors'].tolist()
+        return {
+            'raw_coordinates': data['coordinates'],
+            'floor_count': int(data['floor_count']),
+            'cfs_weight': float(data['cfs_weight']),
+            'dead_load': float(data['dead_load']),
+            'total_weight': float(data['total_weight']),
+            'wind_loads': {'Wind Pressure': float(data['wind_pressure']), 'Wall Moment': float(data['wall_moment'])},
+            'element_counts': dict(zip(data['element_types'].tolist(), data['element_counts'].tolist())),
+            'forces': dict(zip(floors, data['forces'])),
+            'moments': dict(zip(floors, data['moments'])),
+            'uplift_pressures': {k: _optional_float(v) for k, v in zip(data['uplift_ids'].tolist(), data['uplift_values'].tolist())},
+            'down_pressures': {k: _optional_float(v) for k, v in zip(data['down_ids'].tolist(), data['down_values'].tolist())},
+            'storey_list': storeys,
+            'member_schedule': members,
+            'file_hash': str(data['file_hash']),
+            'source': str(data['source']),
+        }
+
+
+def export_model(ifc_path, path=None, cache=None, output_dir=None, low_memory=None):
+    """Reads ifc_path through the model-reading stages and writes the export; returns a summary dict."""
+    from pipeline import MODEL_GRAPH
+    session = IFCAnalyzer(ifc_path, cache=cache, low_memory=low_memory)
+    values, _ = MODEL_GRAPH.run({'session': session})
+    path = path or export_path(ifc_path, output_dir)
+    write_model(path, values, session.file_hash, os.path.basename(ifc_path))
+    return {
+        'file': ifc_path,
+        'export': path,
+        'points': len(values['raw_coordinates']),
+        'members': len(values['member_schedule']),
+        'storeys': len(values['storey_list']),
+    }
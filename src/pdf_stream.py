@@ -0,0 +1,183 @@
+"""Minimal streaming PDF writer for long reports.
+
+fpdf keeps every page of a document in memory until output(). StreamPDF
+writes each page to disk as soon as it is finished, so a schedule with
+tens of thousands of rows costs the same memory as a one-page report and
+time linear in the row count. Only what the reports need is supported:
+the standard Helvetica and Courier fonts (not embedded, WinAnsi text),
+text lines, thin rules and RGB images.
+
+    with StreamPDF(path) as pdf:
+        pdf.image_page(rgb_array)
+        page = pdf.page()
+        page.text(36, 800, "Title", size=14, font='bold')
+        pdf.end_page(page)
+        pdf.table("Members", ["Name", "Weight"], rows, widths=[40, 12])
+"""
+import zlib
+
+PAGE_WIDTH = 595.28   # A4, points
+PAGE_HEIGHT = 841.89
+MARGIN = 36
+
+FONTS = {
+    'regular': 'Helvetica',
+    'bold': 'Helvetica-Bold',
+    'mono': 'Courier',
+    'mono-bold': 'Courier-Bold',
+}
+
+# Courier glyphs are 600/1000 em wide
+_MONO_ADVANCE = 0.6
+
+
+def _escape(text):
+    data = str(text).encode('cp1252', errors='replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class Page:
+    """Content of one page being written; drawing calls append PDF operators."""
+    def __init__(self):
+        self.ops = []
+        self.images = []
+
+    def text(self, x, y, text, size=10, font='regular'):
+        """Draws text with its baseline starting at (x, y), in points from the bottom left."""
+        self.ops.append(b'BT /%s %.2f Tf %.2f %.2f Td (%s) Tj ET' % (
+            font.replace('-', '_').encode(), size, x, y, _escape(text)))
+
+    def rule(self, x0, y, x1, width=0.5):
+        self.ops.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (width, x0, y, x1, y))
+
+
+class StreamPDF:
+    """Writes a PDF page by page; see the module docstring."""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.offsets = [0]   # object number -> byte offset; object 0 is the free list head
+        self.page_ids = []
+        self.file.write(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        # Objects 1-2 (catalog, page tree) are written last but numbered first
+        self.offsets.extend([None, None])
+        self.font_ids = {}
+        for key, name in FONTS.items():
+            self.font_ids[key] = self._object(
+                b'<< /Type /Font /Subtype /Type1 /BaseFont /%s /Encoding /WinAnsiEncoding >>' % name.encode())
+
+    def _reserve(self):
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def _object(self, body, number=None):
+        if number is None:
+            number = self._reserve()
+        self.offsets[number] = self.file.tell()
+        self.file.write(b'%d 0 obj\n' % number)
+        self.file.write(body)
+        self.file.write(b'\nendobj\n')
+        return number
+
+    def _stream(self, data, extra=b''):
+        data = zlib.compress(data, 6)
+        return self._object(b'<< /Length %d /Filter /FlateDecode %s>>\nstream\n%s\nendstream' % (len(data), extra, data))
+
+    def page(self):
+        return Page()
+
+    def end_page(self, page):
+        """Writes a finished page to disk; the Page can be discarded afterwards."""
+        content = self._stream(b'\n'.join(page.ops))
+        fonts = b' '.join(b'/%s %d 0 R' % (key.replace('-', '_').encode(), number) for key, number in self.font_ids.items())
+        images = b' '.join(b'/Im%d %d 0 R' % (number, number) for number in page.images)
+        resources = b'<< /Font << %s >> /XObject << %s >> >>' % (fonts, images)
+        self.page_ids.append(self._object(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %.2f %.2f] /Resources %s /Contents %d 0 R >>'
+            % (PAGE_WIDTH, PAGE_HEIGHT, resources, content)))
+
+    def image_page(self, rgb):
+        """Adds a page showing an (H, W, 3) uint8 image, scaled to fit inside the margins."""
+        height, width = rgb.shape[:2]
+        image = self._stream(
+            rgb.tobytes(),
+            b'/Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceRGB /BitsPerComponent 8 '
+            % (width, height))
+        scale = min((PAGE_WIDTH - 2 * MARGIN) / width, (PAGE_HEIGHT - 2 * MARGIN) / height)
+        w, h = width * scale, height * scale
+        page = self.page()
+        page.images.append(image)
+        page.ops.append(b'q %.2f 0 0 %.2f %.2f %.2f cm /Im%d Do Q' % (
+            w, h, (PAGE_WIDTH - w) / 2, (PAGE_HEIGHT - h) / 2, image))
+        self.end_page(page)
+
+    def lines(self, title, lines, size=12, leading=None):
+        """Writes a title and text lines, starting new pages as they fill up."""
+        leading = leading or size * 1.4
+        page, y = None, 0
+        for line in lines:
+            if page is None or y < MARGIN:
+                if page is not None:
+                    self.end_page(page)
+                page = self.page()
+                y = PAGE_HEIGHT - MARGIN - size
+                if title:
+                    page.text(MARGIN, y, title, size=size + 2, font='bold')
+                    y -= 2 * leading
+            page.text(MARGIN, y, line, size=size)
+            y -= leading
+        if page is not None:
+            self.end_page(page)
+
+    def table(self, title, header, rows, widths, size=7):
+        """Streams rows (an iterable of sequences) as a monospaced table.
+
+        widths are column widths in characters; longer values are cut. The
+        title and header repeat on every page. Returns the number of rows.
+        """
+        leading = size * 1.3
+        advance = size * _MONO_ADVANCE
+
+        def format_row(values):
+            return ''.join(str('' if v is None else v)[:w - 1].ljust(w) for v, w in zip(values, widths))
+
+        header_line = format_row(header)
+        rule_end = MARGIN + advance * sum(widths)
+        page, y, count = None, 0, 0
+        for row in rows:
+            if page is None or y < MARGIN:
+                if page is not None:
+                    self.end_page(page)
+                page = self.page()
+                y = PAGE_HEIGHT - MARGIN - 12
+                page.text(MARGIN, y, title, size=12, font='bold')
+                y -= 2 * leading
+                page.text(MARGIN, y, header_line, size=size, font='mono-bold')
+                page.rule(MARGIN, y - leading / 3, rule_end)
+                y -= leading * 1.3
+            page.text(MARGIN, y, format_row(row), size=size, font='mono')
+            y -= leading
+            count += 1
+        if page is not None:
+            self.end_page(page)
+        return count
+
+    def close(self):
+        if self.file is None:
+            return
+        kids = b' '.join(b'%d 0 R' % number for number in self.page_ids)
+        self._object(b'<< /Type /Pages /Kids [%s] /Count %d >>' % (kids, len(self.page_ids)), number=2)
+        self._object(b'<< /Type /Catalog /Pages 2 0 R >>', number=1)
+        xref = self.file.tell()
+        self.file.write(b'xref\n0 %d\n0000000000 65535 f \n' % len(self.offsets))
+        for offset in self.offsets[1:]:
+            self.file.write(b'%010d 00000 n \n' % offset)
+        self.file.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(self.offsets), xref))
+        self.file.close()
+        self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,600 @@
+"""Headless analysis pipeline shared by the GUI drop handler and the batch CLI."""
+import os
+import sys
+import time
+
+import numpy as np
+
+from IFCAnalyzer import IFCAnalyzer
+
+# Analysis inputs, named after the GUI entries they come from
+DEFAULT_INPUTS = {
+    'wind_speed': 0.0,
+    'snow_load': 0.0,
+    'ice_load': 0.0,
+    'site_class': 0.0,
+    'importance_factor': 1.0,
+    'spectral_response_acceleration': 0.0,
+    'remove_zero_point': False,
+    # Point cleanup (see point_cleanup.py): points within dedup_tolerance feet
+    # of a kept point are dropped, 0 = exact duplicates only; outlier
+    # threshold in standard deviations, 0 = off
+    'dedup_tolerance': 0.0,
+    'outlier_std_ratio': 0.0,
+    'outlier_neighbors': 8,
+    # Roof perimeter (see calculate.calculate_roof_perimeter): points within
+    # roof_tolerance feet of the top count as roof; outline 'hull' or 'concave'
+    'roof_tolerance': 0.5,
+    'roof_outline': 'hull',
+    # ASCE 7-16 equivalent lateral force (see Seismicaddons): design spectral
+    # accelerations SDS (0 = off), SD1 and mapped S1 in g, response
+    # modification R (3 = steel not detailed for seismic), long-period
+    # transition TL in seconds and the Table 12.8-2 structure type for Ta
+    'seismic_sds': 0.0,
+    'seismic_sd1': 0.0,
+    'seismic_s1': 0.0,
+    'response_modification': 3.0,
+    'long_period_transition': 8.0,
+    'period_system': 'other',
+}
+
+
+
+class AnalysisCancelled(Exception):
+    """Raised by run_analysis between stages once its cancel event is set."""
+
+
+_NUMERIC_INPUTS = ['wind_speed', 'snow_load', 'ice_load', 'site_class', 'importance_factor', 'spectral_response_acceleration',
+                   'dedup_tolerance', 'outlier_std_ratio', 'outlier_neighbors', 'roof_tolerance',
+                   'seismic_sds', 'seismic_sd1', 'seismic_s1', 'response_modification', 'long_period_transition']
+
+# Allowed ranges of the numeric inputs, for parse_inputs and sweeps alike
+_POSITIVE_INPUTS = ('response_modification', 'long_period_transition')
+_NON_NEGATIVE_INPUTS = tuple(key for key in _NUMERIC_INPUTS if key not in _POSITIVE_INPUTS)
+
+
+def check_input(key, values):
+    """Raises ValueError naming key unless values (a number or an array of them) are all in its range."""
+    values = np.atleast_1d(np.asarray(values, dtype=float))
+    label = key.replace('_', ' ')
+    if not np.isfinite(values).all():
+        raise ValueError(f"{label} must be a finite number, got {values[~np.isfinite(values)][0]:g}")
+    if key in _POSITIVE_INPUTS and (values <= 0).any():
+        raise ValueError(f"{label} must be positive, got {values[values <= 0][0]:g}")
+    if key in _NON_NEGATIVE_INPUTS and (values < 0).any():
+        raise ValueError(f"{label} must not be negative, got {values[values < 0][0]:g}")
+
+
+def check_inputs(inputs):
+    """Applies check_input to every numeric input present, then the checks between inputs.
+
+    Values may be numbers or equally long arrays, one element per sweep scenario.
+    """
+    for key in _NUMERIC_INPUTS:
+        if key in inputs:
+            check_input(key, inputs[key])
+    if 'seismic_sds' in inputs and 'seismic_sd1' in inputs:
+        sds, sd1 = np.broadcast_arrays(np.asarray(inputs['seismic_sds'], dtype=float),
+                                       np.asarray(inputs['seismic_sd1'], dtype=float))
+        # Without SD1 the 12.8-3/12.8-4 cap is 0 and Cs would fall to its floor
+        missing = (sds > 0) & (sd1 <= 0)
+        if missing.any():
+            raise ValueError(f"seismic sd1 must be positive when seismic sds is set, got {sd1[missing].flat[0]:g}")
+
+
+def parse_inputs(values):
+    """Converts raw input values (numbers or entry strings) to an inputs dict.
+
+    Empty strings count as 0, the same as the GUI has always treated them.
+    Raises ValueError naming the first field that is not a number or is
+    out of range (see check_inputs).
+    """
+    inputs = dict(DEFAULT_INPUTS)
+    for key in _NUMERIC_INPUTS:
+        if key not in values:
+            continue
+        raw = values[key]
+        if isinstance(raw, str):
+            raw = raw.strip() or "0"
+        try:
+            inputs[key] = float(raw if raw is not None else 0)
+        except (TypeError, ValueError):
+            raise ValueError(f"{key.replace('_', ' ')} must be a number, got {values[key]!r}")
+    if 'remove_zero_point' in values:
+        inputs['remove_zero_point'] = bool(values['remove_zero_point'])
+    if values.get('roof_outline'):
+        from calculate import ROOF_OUTLINES
+        inputs['roof_outline'] = str(values['roof_outline']).strip().lower()
+        if inputs['roof_outline'] not in ROOF_OUTLINES:
+            raise ValueError(f"roof outline must be one of {', '.join(ROOF_OUTLINES)}, got {values['roof_outline']!r}")
+    if values.get('period_system'):
+        from Seismicaddons import PERIOD_PARAMETERS
+        inputs['period_system'] = str(values['period_system']).strip().lower()
+        if inputs['period_system'] not in PERIOD_PARAMETERS:
+            raise ValueError(f"period system must be one of {', '.join(PERIOD_PARAMETERS)}, got {values['period_system']!r}")
+    check_inputs(inputs)
+    inputs['outlier_neighbors'] = int(inputs['outlier_neighbors'])
+    return inputs
+
+
+def normalize_live_loads(live_loads, floor_count):
+    """Returns one {'floor', 'percentage_load', 'area_load'} entry per floor.
+
+    live_loads may be a list of such entries or a dict keyed by floor number;
+    floors without an entry get zero loads.
+    """
+    by_floor = {}
+    if isinstance(live_loads, dict):
+        for floor, load in live_loads.items():
+            by_floor[int(floor)] = dict(load, floor=int(floor))
+    else:
+        for load in live_loads or []:
+            by_floor[int(load['floor'])] = dict(load)
+    normalized = []
+    for floor in range(1, floor_count + 1):
+        load = by_floor.get(floor, {})
+        normalized.append({
+            'floor': floor,
+            'percentage_load': load.get('percentage_load', 0),
+            'area_load': load.get('area_load', 0),
+        })
+    return normalized
+
+
+def output_paths(ifc_path, output_dir=None):
+    """Returns the (plot PDF, Aux PDF) paths for an IFC file."""
+    base = os.path.splitext(ifc_path)[0]
+    if output_dir:
+        base = os.path.join(output_dir, os.path.basename(base))
+    return base + "_coordinate_plots.pdf", base + "_Aux.pdf"
+
+
+def report_paths(ifc_path, output_dir=None):
+    """Returns the (combined report PDF, plot image) paths for an IFC file."""
+    base = os.path.splitext(ifc_path)[0]
+    if output_dir:
+        base = os.path.join(output_dir, os.path.basename(base))
+    return base + "_report.pdf", base + "_coordinate_plots.png"
+
+
+def _to_builtin(value):
+    """Converts NumPy values inside a result to plain JSON-friendly types."""
+    if isinstance(value, dict):
+        return {str(k): _to_builtin(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_builtin(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def combine_storeys(storeys, geometry, forces, moments, live_loads):
+    """Joins per-storey records into one dict per storey, lowest first.
+
+    storeys comes from extract_storeys and geometry from storey_geometry over
+    the storeys that have an elevation; forces and moments are keyed by storey
+    GlobalId, as extract_forces_moments returns them. Live load floor n is
+    the n-th storey from the bottom, and a floor whose live load area is
+    left empty gets the storey's plan area.
+    """
+    combined = []
+    outlines = iter(geometry)
+    for floor, storey in enumerate(storeys, start=1):
+        outline = next(outlines) if storey['elevation'] is not None else None
+        load = live_loads[floor - 1] if floor <= len(live_loads) else {'percentage_load': 0, 'area_load': 0}
+        area = outline['area'] if outline else 0.0
+        combined.append({
+            'floor': floor,
+            'global_id': storey['global_id'],
+            'name': storey['name'],
+            'elevation': storey['elevation'],
+            'element_counts': storey['element_counts'],
+            'points': outline['points'] if outline else 0,
+            'area': area,
+            'perimeter': outline['perimeter'] if outline else 0.0,
+            'footprint': outline['footprint'] if outline else np.empty((0, 2)),
+            'force': forces.get(storey['global_id'], np.zeros(3)),
+            'moment': moments.get(storey['global_id'], np.zeros(3)),
+            'live_load': {
+                'percentage_load': load.get('percentage_load') or 0,
+                'area_load': load.get('area_load') or area,
+            },
+        })
+    return combined
+
+
+def storey_seismic_weights(storeys, member_schedule, dead_load):
+    """(storey indices, weights, heights) of the storeys the ELF procedure loads.
+
+    storeys is the combine_storeys table. Only storeys with an elevation
+    count; heights are above the lowest of them, in feet. A storey weighs
+    the members contained in it (matched by storey name, the first storey
+    of a name taking them) plus a share of the rest of the model's dead
+    load, the part those members do not already account for, in proportion
+    to its plan area, or an equal share when no storey has an area.
+
+    Storeys at the base (height 0) take no lateral force, so they are left
+    out and their weight is spread over the storeys above in proportion to
+    those storeys' weights: W is the effective seismic weight above the
+    base. No storeys are returned when none is above the base.
+    """
+    indices = [i for i, storey in enumerate(storeys) if storey['elevation'] is not None]
+    if not indices:
+        return indices, np.empty(0), np.empty(0)
+    elevations = np.array([storeys[i]['elevation'] for i in indices], dtype=float)
+    positions = {}
+    for position, i in enumerate(indices):
+        positions.setdefault(storeys[i]['name'], position)
+    member_storeys = np.array([positions.get(member['storey'], -1) for member in member_schedule], dtype=np.int64)
+    member_weights = np.array([member['weight'] for member in member_schedule], dtype=float)
+    contained = member_storeys >= 0
+    weights = np.bincount(member_storeys[contained], weights=member_weights[contained], minlength=len(indices))
+    areas = np.array([storeys[i]['area'] for i in indices], dtype=float)
+    share = areas / areas.sum() if areas.sum() > 0 else np.full(len(indices), 1.0 / len(indices))
+    # Dead load quantities usually include the members' own weights
+    rest = max((dead_load or 0.0) - float(weights.sum()), 0.0)
+    weights = weights + share * rest
+    heights = elevations - elevations.min()
+
+    above = heights > 0
+    if not above.any():
+        return [], np.empty(0), np.empty(0)
+    base_weight = float(weights[~above].sum())
+    weights, heights = weights[above], heights[above]
+    spread = weights / weights.sum() if weights.sum() > 0 else np.full(len(weights), 1.0 / len(weights))
+    indices = [i for i, keep in zip(indices, above) if keep]
+    return indices, weights + spread * base_weight, heights
+
+
+def profile_path(ifc_path, output_dir=None):
+    """Returns the path of the _profile.json written when profiling is on."""
+    base = os.path.splitext(ifc_path)[0]
+    if output_dir:
+        base = os.path.join(output_dir, os.path.basename(base))
+    return base + "_profile.json"
+
+
+# Stage functions for ANALYSIS_GRAPH. Each takes its declared inputs as
+# keyword arguments; heavy modules are imported when the stage first runs.
+
+def _parse(session):
+    from read_methods import parse_ifc_file
+    return session.cached("parse_ifc_file-zero0-array", parse_ifc_file, zero_val=False, as_array=True)
+
+
+def _cleanup(raw_coordinates, remove_zero_point, dedup_tolerance, outlier_std_ratio, outlier_neighbors):
+    from point_cleanup import clean_points
+    return clean_points(
+        raw_coordinates,
+        remove_origin=bool(remove_zero_point),
+        tolerance=dedup_tolerance,
+        std_ratio=outlier_std_ratio,
+        neighbors=outlier_neighbors,
+    )
+
+
+def _areas(coordinates):
+    from calculate import calculate_area_from_coords
+    return calculate_area_from_coords(coordinates)
+
+
+def _extract(name):
+    """Stage function running the read_methods extractor name through the session cache."""
+    def extract(session):
+        import read_methods
+        return session.cached(name, getattr(read_methods, name))
+    extract.__name__ = f"_{name}"
+    return extract
+
+
+def _perimeters(coordinates, roof_tolerance, roof_outline):
+    from calculate import calculate_perimeter, calculate_roof_perimeter, building_height
+    perimeter = calculate_perimeter(coordinates)
+    roof_perimeter = calculate_roof_perimeter(coordinates, roof_tolerance, roof_outline)
+    return perimeter, roof_perimeter, building_height(coordinates)
+
+
+def _storey_geometry(coordinates, storey_list):
+    from calculate import storey_geometry
+    elevations = [storey['elevation'] for storey in storey_list if storey['elevation'] is not None]
+    return storey_geometry(coordinates, elevations)
+
+
+def _live_loads(live_loads_arg, floor_count):
+    if callable(live_loads_arg):
+        return live_loads_arg(floor_count)
+    return normalize_live_loads(live_loads_arg, floor_count)
+
+
+def _storey_table(storey_list, storey_geometry, forces, moments, live_loads):
+    return combine_storeys(storey_list, storey_geometry, forces, moments, live_loads)
+
+
+def _plot(coordinates, areas, output_path, image_path, cfs_weight, perimeter):
+    from report import plot_coordinates
+    plot_coordinates(coordinates, areas, output_path, None, weight=cfs_weight, perimeter=perimeter, image_path=image_path)
+    print(f"Output saved to: {output_path}", file=sys.stderr)
+    return output_path, image_path
+
+
+def _section_breakdown(member_schedule):
+    from read_methods import section_breakdown
+    return section_breakdown(member_schedule)
+
+
+def _wind_dead_weight(session):
+    from calculate import calculate_wind_loads, calculate_dead_load, calculate_beam_column_weight
+    return (
+        session.cached("calculate_wind_loads", calculate_wind_loads),
+        session.cached("calculate_dead_load", calculate_dead_load),
+        session.cached("calculate_beam_column_weight", calculate_beam_column_weight),
+    )
+
+
+def _loads(areas, snow_load, ice_load, site_class, importance_factor, spectral_response_acceleration):
+    from calculate import calculate_snow_load, calculate_ice_load
+    from Seismicwidget import compute_seismic_load
+    roof_area = areas[0]  # Assuming the XY area is the roof area
+    return (
+        calculate_snow_load(roof_area, snow_load),
+        calculate_ice_load(roof_area, ice_load),
+        compute_seismic_load(site_class, importance_factor, spectral_response_acceleration),
+    )
+
+
+def _seismic_elf(storeys, member_schedule, dead_load, building_height, importance_factor, seismic_sds, seismic_sd1,
+                 seismic_s1, response_modification, long_period_transition, period_system):
+    """ASCE 7-16 ELF base shear and storey forces, or None when seismic_sds is 0 or no storey is above the base."""
+    indices, weights, heights = storey_seismic_weights(storeys, member_schedule, dead_load)
+    if not seismic_sds or not indices:
+        return None
+    from Seismicaddons import PERIOD_PARAMETERS, equivalent_lateral_force
+    Ct, x = PERIOD_PARAMETERS[period_system]
+    # The structural height is the model's full height, not the top storey's elevation
+    hn = max(float(building_height), float(heights.max()))
+    elf = equivalent_lateral_force(
+        weights, heights, seismic_sds, seismic_sd1, response_modification, I=importance_factor,
+        TL=long_period_transition, S1=seismic_s1, hn=hn, Ct=Ct, x=x)
+    return {
+        'hn': round(hn, 2),
+        'Ta': round(float(elf['Ta']), 3),
+        'k': round(float(elf['k']), 3),
+        'Cs': round(float(elf['Cs']), 4),
+        'W': round(float(elf['W']), 2),
+        'V': round(float(elf['V']), 2),
+        'storeys': [
+            {'floor': storeys[i]['floor'], 'name': storeys[i]['name'], 'height': round(float(h), 2),
+             'weight': round(float(w), 2), 'Cvx': round(float(c), 4), 'Fx': round(float(f), 2), 'Vx': round(float(v), 2)}
+            for i, h, w, c, f, v in zip(indices, heights, weights, elf['Cvx'], elf['Fx'], elf['Vx'])
+        ],
+    }
+
+
+def _aux_sections(recorder, element_counts, floor_count, forces, moments, perimeter, uplift_pressures,
+                  down_pressures, wind_speed, building_height, roof_perimeter, areas, wind_loads, dead_load,
+                  total_weight, total_snow_load, total_ice_load, live_loads, seismic_load, cleanup_report, storeys,
+                  sections, seismic_elf):
+    from report import aux_sections
+    return aux_sections(
+        element_counts, floor_count, forces, moments, perimeter,
+        uplift_pressures, down_pressures, wind_speed, building_height, roof_perimeter, areas,
+        wind_loads, dead_load, total_weight, total_snow_load, total_ice_load, live_loads,
+        seismic_load, cleanup_report=cleanup_report, storeys=storeys, section_breakdown=sections,
+        seismic_elf=seismic_elf, profile_lines=recorder.report_lines() if recorder.stages else None
+    )
+
+
+def _aux_pdf(aux_path, aux_sections):
+    from report import write_Aux_pdf
+    write_Aux_pdf(aux_path, aux_sections)
+    print(f"Auxiliary data saved to: {aux_path}", file=sys.stderr)
+    return aux_path
+
+
+def _report(report_path, aux_sections, plot_png, member_schedule):
+    from report import create_report
+    create_report(report_path, aux_sections, plot_image=plot_png, members=member_schedule)
+    print(f"Report saved to: {report_path}", file=sys.stderr)
+    return report_path
+
+
+def _analysis_graph():
+    from stage_graph import Stage, StageGraph
+    # Stages that read the IFC model take the 'model' lock: one model reader at a time
+    return StageGraph([
+        Stage('parse', _parse, ['session'], ['raw_coordinates'], memo=False, lock='model',
+              count=lambda out: len(out['raw_coordinates'])),
+        Stage('cleanup', _cleanup,
+              ['raw_coordinates', 'remove_zero_point', 'dedup_tolerance', 'outlier_std_ratio', 'outlier_neighbors'],
+              ['coordinates', 'cleanup_report'],
+              count=lambda out: out['cleanup_report']['input'] - out['cleanup_report']['output']),
+        Stage('areas', _areas, ['coordinates'], ['areas']),
+        Stage('floor_count', _extract('extract_floor_data'), ['session'], ['floor_count'], memo=False, lock='model',
+              count=lambda out: out['floor_count']),
+        Stage('forces_moments', _extract('extract_forces_moments'), ['session'], ['forces', 'moments'],
+              memo=False, lock='model', count=lambda out: len(out['forces'])),
+        Stage('roof_pressures', _extract('extract_roof_pressures'), ['session'], ['uplift_pressures', 'down_pressures'],
+              memo=False, lock='model', count=lambda out: len(out['uplift_pressures']) + len(out['down_pressures'])),
+        Stage('perimeters', _perimeters, ['coordinates', 'roof_tolerance', 'roof_outline'],
+              ['perimeter', 'roof_perimeter', 'building_height']),
+        Stage('storeys', _extract('extract_storeys'), ['session'], ['storey_list'], memo=False, lock='model',
+              count=lambda out: len(out['storey_list'])),
+        Stage('storey_geometry', _storey_geometry, ['coordinates', 'storey_list'], ['storey_geometry']),
+        Stage('live_loads', _live_loads, ['live_loads_arg', 'floor_count'], ['live_loads'], memo=False),
+        Stage('storey_table', _storey_table, ['storey_list', 'storey_geometry', 'forces', 'moments', 'live_loads'],
+              ['storeys'], memo=False),
+        Stage('cfs_weight', _extract('extract_ifc_data'), ['session'], ['cfs_weight'], memo=False, lock='model'),
+        Stage('plot', _plot, ['coordinates', 'areas', 'output_path', 'image_path', 'cfs_weight', 'perimeter'],
+              ['plot_pdf', 'plot_png'], files=['plot_pdf', 'plot_png']),
+        Stage('members', _extract('extract_member_schedule'), ['session'], ['member_schedule'], memo=False,
+              lock='model', count=lambda out: len(out['member_schedule'])),
+        Stage('sections', _section_breakdown, ['member_schedule'], ['sections'],
+              count=lambda out: len(out['sections'])),
+        Stage('element_counts', _extract('extract_element_counts'), ['session'], ['element_counts'], memo=False,
+              lock='model', count=lambda out: sum(out['element_counts'].values())),
+        Stage('wind_dead_weight', _wind_dead_weight, ['session'], ['wind_loads', 'dead_load', 'total_weight'],
+              memo=False, lock='model'),
+        Stage('loads', _loads,
+              ['areas', 'snow_load', 'ice_load', 'site_class', 'importance_factor', 'spectral_response_acceleration'],
+              ['total_snow_load', 'total_ice_load', 'seismic_load'], memo=False),
+        Stage('seismic_elf', _seismic_elf,
+              ['storeys', 'member_schedule', 'dead_load', 'building_height', 'importance_factor', 'seismic_sds',
+               'seismic_sd1', 'seismic_s1', 'response_modification', 'long_period_transition', 'period_system'],
+              ['seismic_elf'], memo=False),
+        Stage('aux_sections', _aux_sections,
+              ['recorder', 'element_counts', 'floor_count', 'forces', 'moments', 'perimeter',
+               'uplift_pressures', 'down_pressures', 'wind_speed', 'building_height', 'roof_perimeter', 'areas',
+               'wind_loads', 'dead_load', 'total_weight', 'total_snow_load', 'total_ice_load', 'live_loads',
+               'seismic_load', 'cleanup_report', 'storeys', 'sections', 'seismic_elf'],
+              ['aux_sections'], memo=False),
+        Stage('aux_pdf', _aux_pdf, ['aux_path', 'aux_sections'], ['aux_pdf'], memo=False),
+        Stage('report', _report, ['report_path', 'aux_sections', 'plot_png', 'member_schedule'], ['report_pdf'],
+              memo=False),
+    ])
+
+
+ANALYSIS_GRAPH = _analysis_graph()
+
+
+def _model_stages(reads_model):
+    from stage_graph import StageGraph
+    return StageGraph([stage for stage in ANALYSIS_GRAPH.stages if ('session' in stage.inputs) == reads_model])
+
+
+# The stages that read the IFC model, whose outputs model_export stores, and
+# the rest, which run_analysis runs on their own for a .npz export
+MODEL_GRAPH = _model_stages(True)
+EXPORT_GRAPH = _model_stages(False)
+
+# run_analysis stages, for progress reporting
+STAGES = [stage.name for stage in ANALYSIS_GRAPH.stages]
+
+
+def run_analysis(ifc_path, inputs, live_loads=None, cache=None, output_dir=None, profile=None, progress=None, cancel=None, low_memory=None, max_workers=None):
+    """Runs the full drop-to-PDF analysis for one IFC file.
+
+    inputs is a dict as returned by parse_inputs. live_loads is either a list
+    (or floor-keyed dict) of live load entries, or a callable that receives
+    the floor count and returns them, which is how the GUI asks the user.
+    Writes the _coordinate_plots.pdf and _Aux.pdf files, plus _report.pdf
+    combining the plot page, the Aux sections and the member schedule
+    (see report.create_report), and returns a summary dict of every computed value.
+
+    The stages in ANALYSIS_GRAPH run concurrently on up to max_workers
+    threads as their inputs become ready. With a cache, their outputs are
+    memoized by input (see stage_graph), so a re-run that only changes, say,
+    the snow or seismic inputs recomputes the loads and the Aux PDF and
+    reuses everything else; the summary's 'reused_stages' lists what was
+    served from the memo.
+
+    profile turns on per-stage instrumentation (see instrument.py); None
+    defers to IFC_ANALYZER_PROFILE. When on, the stage records are written to
+    _profile.json, added to the summary and appended to the Aux PDF. The Aux
+    PDF is built while the run is still going, so its appendix lists the
+    stages that had finished by then and names the rest (at least aux_sections,
+    aux_pdf and report); _profile.json has them all. Memory profiling runs the
+    stages one at a time so each peak belongs to one stage. When stages
+    overlap, CPU times are the whole process's and are labelled so.
+
+    progress, if given, is called as progress(stage, index, total) as each
+    stage starts, index counting the stages started before it and total the
+    stages in the run (len(STAGES), fewer for an export), and once more with
+    'done' at the end. cancel is a threading.Event (or
+    anything with is_set()); when it is set no further stage starts and the
+    run stops with AnalysisCancelled.
+
+    low_memory streams the file into a StreamedModel instead of loading it
+    whole; None defers to IFC_ANALYZER_LOW_MEMORY_MB (see IFCAnalyzer).
+
+    ifc_path may also be a .npz written by model_export, in which case the
+    model values come from it and only EXPORT_GRAPH runs.
+    """
+    from instrument import recorder_for
+    from stage_graph import StageMemo
+    from model_export import is_model_export, load_model
+
+    started = time.perf_counter()
+    inputs = dict(DEFAULT_INPUTS, **inputs)
+    output_path, Aux_output_path = output_paths(ifc_path, output_dir)
+    report_path, image_path = report_paths(ifc_path, output_dir)
+    graph = EXPORT_GRAPH if is_model_export(ifc_path) else ANALYSIS_GRAPH
+    recorder = recorder_for(profile, stages=[stage.name for stage in graph.stages])
+    if getattr(recorder, 'memory', False):
+        max_workers = 1
+    started_stages = []
+
+    def run_stage(stage, call):
+        if cancel is not None and cancel.is_set():
+            raise AnalysisCancelled(ifc_path)
+        if progress is not None:
+            progress(stage.name, len(started_stages), len(graph.stages))
+        started_stages.append(stage.name)
+        with recorder.stage(stage.name) as record:
+            outputs = call()
+            if stage.count is not None:
+                record['count'] = stage.count(outputs)
+        return outputs
+
+    try:
+        if graph is EXPORT_GRAPH:
+            # Everything read from the model comes from the export
+            model_values = load_model(ifc_path)
+            file_hash = model_values.pop('file_hash')
+            model_values.pop('source')
+        else:
+            # Open the model at most once; on a repeat run of the same file every
+            # extraction comes from the on-disk cache and the model is never opened
+            session = IFCAnalyzer(ifc_path, cache=cache, low_memory=low_memory)
+            model_values = {'session': session}
+            file_hash = session.file_hash
+        memo = StageMemo(cache, file_hash) if cache is not None else None
+        seeds = dict(inputs, **model_values, live_loads_arg=live_loads, output_path=output_path,
+                     aux_path=Aux_output_path, report_path=report_path, image_path=image_path, recorder=recorder)
+        values, reused = graph.run(seeds, memo=memo, max_workers=max_workers, run_stage=run_stage)
+        if progress is not None:
+            progress('done', len(graph.stages), len(graph.stages))
+    finally:
+        recorder.stop()
+
+    areas = values['areas']
+    summary = {
+        'file': ifc_path,
+        'plot_pdf': output_path,
+        'aux_pdf': Aux_output_path,
+        'report_pdf': report_path,
+        'inputs': inputs,
+        'floor_count': values['floor_count'],
+        'element_counts': values['element_counts'],
+        'point_count': len(values['coordinates']),
+        'cleanup': values['cleanup_report'],
+        'areas': {'xy': areas[0], 'yz': areas[1], 'xz': areas[2]},
+        'perimeter': values['perimeter'],
+        'roof_perimeter': values['roof_perimeter'],
+        'building_height': values['building_height'],
+        'storeys': values['storeys'],
+        'forces': values['forces'],
+        'moments': values['moments'],
+        'uplift_pressures': values['uplift_pressures'],
+        'down_pressures': values['down_pressures'],
+        'wind_loads': values['wind_loads'],
+        'dead_load': values['dead_load'],
+        'total_weight': values['total_weight'],
+        'cfs_weight': values['cfs_weight'],
+        'total_snow_load': values['total_snow_load'],
+        'total_ice_load': values['total_ice_load'],
+        'seismic_load': values['seismic_load'],
+        'seismic_elf': values['seismic_elf'],
+        'live_loads': values['live_loads'],
+        'member_count': len(values['member_schedule']),
+        'sections': values['sections'],
+        'reused_stages': sorted(reused),
+        'elapsed_s': round(time.perf_counter() - started, 3),
+    }
+    if recorder.stages:
+        summary['profile_json'] = profile_path(ifc_path, output_dir)
+        summary['profile'] = recorder.to_dict()
+        recorder.write_json(summary['profile_json'], file=ifc_path)
+        print(f"Stage profile saved to: {summary['profile_json']}", file=sys.stderr)
+    return _to_builtin(summary)
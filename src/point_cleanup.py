@@ -0,0 +1,284 @@
+"""Point cloud cleanup ahead of the geometry stages.
+
+Stray origin points, coincident points and far outliers all add qhull work
+to Delaunay/ConvexHull and stretch the plot limits. clean_points removes
+them with array operations and a KD-tree, in this order:
+
+    origin       points exactly at (0, 0, 0)
+    duplicates   points within tolerance of a point already kept, scanning
+                 along x (exact duplicates when the tolerance is 0), so the
+                 kept points are at least tolerance apart
+    outliers     points whose mean distance to their k nearest neighbours is
+                 more than std_ratio standard deviations above the average
+
+and reports how many points each step removed.
+
+A coordinate store (see coordinate_store.py) is cleaned without loading
+it: the steps mark a keep mask chunk by chunk, and deduplication and the
+neighbour search run on one x slab of about SLAB_POINTS points at a time.
+Deduplication scans the slabs in x order and carries over the kept points
+within tolerance of the next slab, so it keeps the same points as the
+in-memory scan. Neighbour distances found inside a slab
+are exact when the k-th neighbour is nearer than the slab's edges; the
+remaining points are searched again against the neighbouring slabs. The
+kept points are written to a new store.
+"""
+import numpy as np
+
+from coordinate_store import is_store, write_store
+
+DEFAULT_NEIGHBORS = 8
+
+# Points per slab when cleaning a coordinate store
+SLAB_POINTS = 1 << 21
+
+# Array rounds of the deduplication scan before it goes point by point
+_SETTLE_ROUNDS = 32
+
+
+def _exact_duplicates_kept(coords):
+    """Indices of the first of each set of identical points, in input order."""
+    if len(coords) == 0:
+        return np.arange(0)
+    # A stable sort by x, y, z puts equal points next to each other with the
+    # earliest first; much cheaper than np.unique(axis=0)
+    order = np.lexsort(coords.T[::-1])
+    sorted_coords = coords[order]
+    first = np.ones(len(coords), dtype=bool)
+    first[1:] = np.any(sorted_coords[1:] != sorted_coords[:-1], axis=1)
+    return np.sort(order[first])
+
+
+def _scan_order(coords, indices):
+    """Order of the points along x, ties by index: the order deduplication scans them in."""
+    return np.lexsort((indices, coords[:, 0]))
+
+
+def _drop_near(points, tolerance, previous=None):
+    """Which points lie within tolerance of a point kept before them.
+
+    points are in scan order and distinct; previous holds kept points that
+    come before all of them. Each point is decided in turn: dropped if a
+    kept point before it is within tolerance, else kept.
+    """
+    from scipy.spatial import cKDTree
+    dropped = np.zeros(len(points), dtype=bool)
+    if not len(points):
+        return dropped
+    if previous is not None and len(previous):
+        # query's bound is exclusive, query_pairs' inclusive; widen it by one ulp to match
+        bound = np.nextafter(tolerance, np.inf)
+        distances, _ = cKDTree(previous).query(points, k=1, distance_upper_bound=bound, workers=-1)
+        dropped |= np.isfinite(distances)
+    # (i, j) with i < j for every pair within tolerance
+    pairs = cKDTree(points).query_pairs(tolerance, output_type='ndarray')
+    # Array rounds settle every point whose neighbours before it are all
+    # settled: kept when none of them is kept, else dropped. Near-duplicate
+    # clusters settle in a few rounds.
+    kept = np.zeros(len(points), dtype=bool)
+    for _ in range(_SETTLE_ROUNDS):
+        pairs = pairs[~dropped[pairs[:, 0]]]
+        if not len(pairs):
+            return dropped
+        waiting = np.zeros(len(points), dtype=bool)
+        waiting[pairs[:, 1]] = True
+        kept |= ~waiting & ~dropped
+        dropped[pairs[kept[pairs[:, 0]], 1]] = True
+        pairs = pairs[~dropped[pairs[:, 1]]]
+    # Long chains of neighbours: finish the scan one point at a time. A
+    # point's status is final by the time the scan reaches it.
+    pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+    starts = np.flatnonzero(np.r_[True, pairs[1:, 0] != pairs[:-1, 0]])
+    ends = np.r_[starts[1:], len(pairs)]
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        if not dropped[pairs[start, 0]]:
+            dropped[pairs[start:end, 1]] = True
+    return dropped
+
+
+def remove_duplicates(coords, tolerance=0.0):
+    """Returns the indices of the points kept after deduplication, in input order.
+
+    With tolerance 0 the first of each set of identical points is kept.
+    Otherwise the points are scanned along x (ties in input order) and a
+    point is dropped when a point kept before it lies within tolerance.
+    """
+    kept = _exact_duplicates_kept(coords)
+    if tolerance <= 0 or len(kept) < 2:
+        return kept
+    order = _scan_order(coords[kept], kept)
+    dropped = _drop_near(coords[kept[order]], tolerance)
+    return np.sort(kept[order[~dropped]])
+
+
+def outlier_mask(coords, std_ratio, neighbors=DEFAULT_NEIGHBORS):
+    """Boolean mask of statistical outliers by mean k-nearest-neighbour distance."""
+    neighbors = int(neighbors)
+    if std_ratio <= 0 or neighbors < 1 or len(coords) <= neighbors + 1:
+        return np.zeros(len(coords), dtype=bool)
+    from scipy.spatial import cKDTree
+    # Unbalanced trees build several times faster and query about as fast
+    tree = cKDTree(coords, balanced_tree=False, compact_nodes=False)
+    distances, _ = tree.query(coords, k=neighbors + 1, workers=-1)
+    # Column 0 is each point's distance to itself
+    mean_distance = distances[:, 1:].mean(axis=1)
+    threshold = mean_distance.mean() + std_ratio * mean_distance.std()
+    return mean_distance > threshold
+
+
+def _offset_chunks(store):
+    """Yields (index of the first row, chunk) for each chunk of a store."""
+    start = 0
+    for chunk in store.chunks():
+        yield start, chunk
+        start += len(chunk)
+
+
+def _slab_edges(store, keep, key):
+    """Ascending key values splitting the kept points into slabs of about SLAB_POINTS."""
+    count = int(keep.sum())
+    slabs = -(-count // SLAB_POINTS)
+    if slabs <= 1:
+        return np.empty(0)
+    # About a thousand sampled keys per slab place the edges
+    step = max(1, count // (slabs * 1024))
+    samples = [key(chunk[keep[start:start + len(chunk)]])[::step] for start, chunk in _offset_chunks(store)]
+    return np.unique(np.quantile(np.concatenate(samples), np.arange(1, slabs) / slabs))
+
+
+def _gather(store, keep, key, edges, slab):
+    """(row indices, points) of the kept points in one slab."""
+    indices, points = [np.empty(0, dtype=np.int64)], [np.empty((0, 3))]
+    for start, chunk in _offset_chunks(store):
+        rows = np.flatnonzero(keep[start:start + len(chunk)] & (np.searchsorted(edges, key(chunk), side='right') == slab))
+        indices.append(rows + start)
+        points.append(chunk[rows])
+    return np.concatenate(indices), np.concatenate(points)
+
+
+def _x_key(points):
+    return points[:, 0]
+
+
+def _drop_store_duplicates(store, keep, tolerance):
+    """Clears keep for the duplicates among the kept points, as remove_duplicates would."""
+    edges = _slab_edges(store, keep, _x_key)
+    # Kept points of the slabs before, within tolerance of the next slab
+    carried = np.empty((0, 3))
+    for slab in range(len(edges) + 1):
+        indices, points = _gather(store, keep, _x_key, edges, slab)
+        # Identical points share x, hence a slab
+        first = _exact_duplicates_kept(points)
+        dropped = np.ones(len(indices), dtype=bool)
+        dropped[first] = False
+        if tolerance > 0 and len(first):
+            order = first[_scan_order(points[first], indices[first])]
+            near = _drop_near(points[order], tolerance, carried)
+            dropped[order[near]] = True
+            if slab < len(edges):
+                carried = np.concatenate([carried, points[order[~near]]])
+                carried = carried[carried[:, 0] >= edges[slab] - tolerance]
+        keep[indices[dropped]] = False
+
+
+def _store_mean_distances(store, keep, neighbors):
+    """Mean distance of each kept point to its k nearest kept neighbours (NaN for the others)."""
+    from scipy.spatial import cKDTree
+    k = neighbors + 1
+    key = _x_key
+    edges = _slab_edges(store, keep, key)
+    bounds = np.concatenate([[-np.inf], edges, [np.inf]])
+    mean_distance = np.full(len(store), np.nan)
+    pending = []
+
+    for slab in range(len(edges) + 1):
+        indices, points = _gather(store, keep, key, edges, slab)
+        if not len(points):
+            continue
+        tree = cKDTree(points, balanced_tree=False, compact_nodes=False)
+        distances, _ = tree.query(points, k=k, workers=-1)
+        # No point of another slab can be nearer than the slab edge
+        margin = np.minimum(points[:, 0] - bounds[slab], bounds[slab + 1] - points[:, 0])
+        exact = distances[:, -1] <= margin
+        mean_distance[indices[exact]] = distances[exact, 1:].mean(axis=1)
+        pending.append((np.full((~exact).sum(), slab), indices[~exact], points[~exact], distances[~exact]))
+
+    if pending:
+        slabs, indices, points, distances = (np.concatenate(parts) for parts in zip(*pending))
+        for slab in range(len(edges) + 1):
+            reach = distances[:, -1]
+            near = (slabs != slab) & (points[:, 0] + reach >= bounds[slab]) & (points[:, 0] - reach < bounds[slab + 1])
+            if not near.any():
+                continue
+            _, slab_points = _gather(store, keep, key, edges, slab)
+            if not len(slab_points):
+                continue
+            found, _ = cKDTree(slab_points, balanced_tree=False, compact_nodes=False).query(points[near], k=k, workers=-1)
+            distances[near] = np.sort(np.concatenate([distances[near], found.reshape(-1, k)], axis=1), axis=1)[:, :k]
+        mean_distance[indices] = distances[:, 1:].mean(axis=1)
+    return mean_distance
+
+
+def _clean_store(store, remove_origin, tolerance, std_ratio, neighbors, path):
+    report = {'input': len(store), 'origin': 0, 'duplicates': 0, 'outliers': 0}
+    keep = np.ones(len(store), dtype=bool)
+
+    if remove_origin:
+        for start, chunk in _offset_chunks(store):
+            keep[start:start + len(chunk)] = np.any(chunk, axis=1)
+        report['origin'] = len(store) - int(keep.sum())
+
+    count = int(keep.sum())
+    _drop_store_duplicates(store, keep, tolerance)
+    report['duplicates'] = count - int(keep.sum())
+
+    count = int(keep.sum())
+    neighbors = int(neighbors)
+    if std_ratio > 0 and neighbors >= 1 and count > neighbors + 1:
+        mean_distance = _store_mean_distances(store, keep, neighbors)
+        kept_distance = mean_distance[keep]
+        threshold = kept_distance.mean() + std_ratio * kept_distance.std()
+        outliers = keep & (mean_distance > threshold)
+        report['outliers'] = int(outliers.sum())
+        keep &= ~outliers
+
+    path = path or store.sibling(f"clean-{int(bool(remove_origin))}-{tolerance:g}-{std_ratio:g}-{neighbors}")
+    cleaned = write_store(path, (chunk[keep[start:start + len(chunk)]] for start, chunk in _offset_chunks(store)))
+    report['output'] = len(cleaned)
+    return cleaned, report
+
+
+def clean_points(coords, remove_origin=False, tolerance=0.0, std_ratio=0.0, neighbors=DEFAULT_NEIGHBORS, path=None):
+    """Returns (cleaned (N, 3) array, report dict of points removed per step).
+
+    tolerance is in the units of coords; std_ratio 0 disables outlier removal.
+    A coordinate store is cleaned into a new store at path, by default next
+    to it and named after the settings.
+    """
+    if is_store(coords):
+        return _clean_store(coords, remove_origin, tolerance, std_ratio, neighbors, path)
+    coords = np.asarray(coords, dtype=float).reshape(-1, 3)
+    report = {'input': len(coords), 'origin': 0, 'duplicates': 0, 'outliers': 0}
+
+    if remove_origin:
+        at_origin = ~np.any(coords, axis=1)
+        report['origin'] = int(at_origin.sum())
+        coords = coords[~at_origin]
+
+    kept = remove_duplicates(coords, tolerance)
+    report['duplicates'] = len(coords) - len(kept)
+    coords = coords[kept]
+
+    outliers = outlier_mask(coords, std_ratio, neighbors)
+    report['outliers'] = int(outliers.sum())
+    coords = coords[~outliers]
+
+    report['output'] = len(coords)
+    return coords, report
+
+
+def format_report(report):
+    removed = report['input'] - report['output']
+    return (f"Point cleanup: kept {report['output']} of {report['input']} points "
+            f"(removed {removed}: {report['origin']} at origin, {report['duplicates']} duplicate, "
+            f"{report['outliers']} outliers)")
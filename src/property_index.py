@@ -0,0 +1,84 @@
+"""Inverse index from elements to their property and quantity values.
+
+Built with a single pass over IfcRelDefinesByProperties, so looking up a
+property or quantity of an element is a dict access instead of a walk over
+element.IsDefinedBy for every element and every extractor.
+"""
+from IFCAnalyzer import IFCAnalyzer, open_model
+
+
+def _definitions(relation):
+    """RelatingPropertyDefinition is a single set, or a tuple of sets in IFC4."""
+    definition = relation.RelatingPropertyDefinition
+    if definition is None:
+        return ()
+    if isinstance(definition, (list, tuple)):
+        return definition
+    return (definition,)
+
+
+def _unwrap(value):
+    return getattr(value, 'wrappedValue', value)
+
+
+class PropertyIndex:
+    """Property and quantity values keyed by element GlobalId and name."""
+    def __init__(self):
+        # GlobalId -> {property name: nominal value}; later sets win, as before
+        self.properties = {}
+        # GlobalId -> [(property set name, [(property name, NominalValue), ...]), ...]
+        self.property_sets = {}
+        # GlobalId -> {quantity name: [IfcPhysicalQuantity, ...]}
+        self.quantities = {}
+
+    @classmethod
+    def build(cls, model):
+        index = cls()
+        for relation in model.by_type('IfcRelDefinesByProperties'):
+            related = relation.RelatedObjects or ()
+            for definition in _definitions(relation):
+                if definition.is_a('IfcPropertySet'):
+                    values = [(prop.Name, prop.NominalValue) for prop in definition.HasProperties or ()
+                              if prop.is_a('IfcPropertySingleValue')]
+                    for element in related:
+                        index._add_properties(element.GlobalId, definition.Name, values)
+                elif definition.is_a('IfcElementQuantity'):
+                    quantities = list(definition.Quantities or ())
+                    for element in related:
+                        index._add_quantities(element.GlobalId, quantities)
+        return index
+
+    def _add_properties(self, global_id, set_name, values):
+        self.property_sets.setdefault(global_id, []).append((set_name, values))
+        properties = self.properties.setdefault(global_id, {})
+        for name, value in values:
+            properties[name] = _unwrap(value) if value is not None else None
+
+    def _add_quantities(self, global_id, quantities):
+        by_name = self.quantities.setdefault(global_id, {})
+        for quantity in quantities:
+            by_name.setdefault(quantity.Name, []).append(quantity)
+
+    def get_property(self, global_id, name, default=None):
+        return self.properties.get(global_id, {}).get(name, default)
+
+    def find_properties(self, global_id, fragment):
+        """Returns {name: value} for the element's properties whose name contains fragment."""
+        return {name: value for name, value in self.properties.get(global_id, {}).items() if fragment in name}
+
+    def get_quantities(self, global_id, name=None):
+        """Returns the element's quantities, all of them or those called name."""
+        by_name = self.quantities.get(global_id, {})
+        if name is not None:
+            return by_name.get(name, [])
+        return [quantity for group in by_name.values() for quantity in group]
+
+
+def property_index(ifc_source, model=None):
+    """Returns the session's shared index, or builds one for a path or model.
+
+    model, when the caller has already opened ifc_source, avoids opening it again.
+    """
+    if isinstance(ifc_source, IFCAnalyzer):
+        return ifc_source.property_index
+    return PropertyIndex.build(model if model is not None else open_model(ifc_source))
@@ -0,0 +1,129 @@
+"""One-sweep aggregation of IfcElementQuantity values.
+
+Quantity names are matched against an alias table (substring matches, as
+the individual calculators always did) using one precompiled pattern per
+category, and each distinct name is only matched once. The table can be
+extended with a JSON file named by IFC_ANALYZER_ALIASES, e.g.
+
+    {"dead_load": ["Self Weight"], "wind_pressure": ["Wind Suction"]}
+"""
+import json
+import os
+import re
+
+from IFCAnalyzer import IFCAnalyzer, open_model
+
+DEFAULT_ALIASES = {
+    'dead_load': ['Dead Load', 'DeadLoad', 'Gross Weight', 'GrossWeight'],
+    'wind_pressure': ['Wind Pressure', 'WindPressure', 'Wind Load', 'WindLoad', 'Wind_Pressure', 'Wind_Load'],
+    'wall_moment': ['Wall Moment', 'WallMoment', 'Wind Moment', 'WindMoment', 'Wall_Moment', 'Wind_Moment'],
+}
+
+# Quantity classes whose value counts for each category, with the attribute holding it
+VALUE_ATTRIBUTES = {
+    'dead_load': {'IfcQuantityWeight': 'WeightValue'},
+    'wind_pressure': {
+        'IfcQuantityArea': 'AreaValue',
+        'IfcQuantityLength': 'LengthValue',
+        'IfcQuantityVolume': 'VolumeValue',
+        'IfcQuantityForce': 'ForceValue',
+        'IfcQuantityPressure': 'PressureValue',
+    },
+    'wall_moment': {
+        'IfcQuantityArea': 'AreaValue',
+        'IfcQuantityLength': 'LengthValue',
+        'IfcQuantityVolume': 'VolumeValue',
+        'IfcQuantityForce': 'ForceValue',
+        'IfcQuantityMoment': 'MomentValue',
+    },
+}
+
+ALIAS_TABLE_ENV = 'IFC_ANALYZER_ALIASES'
+
+_default_matcher = None
+
+
+def load_alias_table(path=None):
+    """Returns the default aliases extended with those in a JSON file.
+
+    path defaults to the file named by IFC_ANALYZER_ALIASES, if any.
+    """
+    aliases = {category: list(names) for category, names in DEFAULT_ALIASES.items()}
+    path = path or os.environ.get(ALIAS_TABLE_ENV)
+    if path:
+        with open(path, 'r') as f:
+            extra = json.load(f)
+        for category, names in extra.items():
+            if category not in VALUE_ATTRIBUTES:
+                raise ValueError(f"Unknown quantity alias category: {category}")
+            aliases[category].extend(name for name in names if name not in aliases[category])
+    return aliases
+
+
+class AliasMatcher:
+    """Maps a quantity name to the categories whose aliases it contains."""
+    def __init__(self, aliases):
+        self.patterns = {
+            category: re.compile('|'.join(re.escape(name) for name in names))
+            for category, names in aliases.items() if names
+        }
+        self._memo = {}
+
+    def categories(self, name):
+        found = self._memo.get(name)
+        if found is None:
+            found = tuple(category for category, pattern in self.patterns.items() if pattern.search(name or ''))
+            self._memo[name] = found
+        return found
+
+
+def default_matcher():
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = AliasMatcher(load_alias_table())
+    return _default_matcher
+
+
+def aggregate_quantities(model, matcher=None):
+    """Sweeps every IfcElementQuantity once and returns the quantity-based totals.
+
+    Returns a dict with:
+        dead_load       sum of weights named like a dead load alias
+        gross_weight    sum of all IfcQuantityWeight values (each quantity once)
+        wind_pressure   value of the last quantity named like a wind pressure alias
+        wall_moment     value of the last quantity named like a wall moment alias
+    """
+    matcher = matcher or default_matcher()
+    totals = {
+        'dead_load': 0.0,
+        'gross_weight': 0.0,
+        'wind_pressure': 0.0,
+        'wall_moment': 0.0,
+    }
+    seen_weights = set()
+
+    for element in model.by_type('IfcElementQuantity'):
+        for quantity in element.Quantities or ():
+            quantity_type = quantity.is_a()
+            if quantity_type == 'IfcQuantityWeight' and quantity.id() not in seen_weights:
+                seen_weights.add(quantity.id())
+                totals['gross_weight'] += quantity.WeightValue or 0.0
+
+            for category in matcher.categories(quantity.Name):
+                attribute = VALUE_ATTRIBUTES[category].get(quantity_type)
+                if attribute is None:
+                    continue
+                value = getattr(quantity, attribute)
+                if category == 'dead_load':
+                    totals['dead_load'] += value or 0.0
+                else:
+                    totals[category] = value
+
+    return totals
+
+
+def quantity_totals(ifc_source, model=None):
+    """Returns aggregate_quantities for a path, model or session (computed once per session)."""
+    if isinstance(ifc_source, IFCAnalyzer):
+        return ifc_source.derived('quantity_totals', lambda: aggregate_quantities(ifc_source.model))
+    return aggregate_quantities(model if model is not None else open_model(ifc_source))
@@ -16,43 +16,31 @@ Include a header with Mythic Systems branding in each Python file:
 # (c) 2024 Mythic Systems
 # All rights reserved.
 '''
-from main import *
-import matplotlib
-matplotlib.use('Agg')  # Use a non-interactive backend
-
-import ifcopenshell
-import re
-import seaborn as sns
-import matplotlib.pyplot as plt
-import numpy as np
-from scipy.spatial import Delaunay, ConvexHull
-from tkinter import Tk, messagebox, Label, Checkbutton, BooleanVar, Entry
-from tkinterdnd2 import TkinterDnD, DND_FILES
+# Extraction layer: importable without Tk, plotting or PDF dependencies.
+# ifcopenshell itself is only imported when a model actually has to be opened.
 import os
-from fpdf import FPDF
-import tkinter as tk
-from tkinter import simpledialog
+import sys
+from array import array
+
+import numpy as np
+from IFCAnalyzer import open_model, source_path
+from property_index import property_index
+from quantities import quantity_totals
 
-def explore_ifc_properties(ifc_path):
-    import ifcopenshell
-    ifc_file = ifcopenshell.open(ifc_path)
+def explore_ifc_properties(ifc_source):
+    ifc_file = open_model(ifc_source)
+    index = property_index(ifc_source, ifc_file)
 
     for element in ifc_file.by_type('IfcElement'):
-        material_set = element.IsDefinedBy
-        if material_set:
-            for definition in material_set:
-                if definition.is_a('IfcRelDefinesByProperties'):
-                    property_set = definition.RelatingPropertyDefinition
-                    if property_set.is_a('IfcPropertySet'):
-                        print(f"Element: {element.GlobalId}")
-                        for prop in property_set.HasProperties:
-                            if prop.is_a('IfcPropertySingleValue'):
-                                print(f"Property Name: {prop.Name}, Value: {prop.NominalValue}")
-
-
-def extract_element_counts(ifc_path):
+        for _, values in index.property_sets.get(element.GlobalId, ()):
+            print(f"Element: {element.GlobalId}")
+            for name, value in values:
+                print(f"Property Name: {name}, Value: {value}")
+
+
+def extract_element_counts(ifc_source):
     """Extracts the counts of specific elements from an IFC file."""
-    ifc_file = ifcopenshell.open(ifc_path)
+    ifc_file = open_model(ifc_source)
     element_counts = {
         'IfcBeam': len(ifc_file.by_type('IfcBeam')),
         'IfcColumn': len(ifc_file.by_type('IfcColumn'))
@@ -60,131 +48,319 @@ def extract_element_counts(ifc_path):
     return element_counts
 
 
-def extract_ifc_data(ifc_path):
+def extract_ifc_data(ifc_source):
     """Extracts IFC data and calculates the total weight from an IFC file using ifcopenshell."""
-    total_weight = 0.0
-    ifc_file = ifcopenshell.open(ifc_path)
-    for quantity in ifc_file.by_type('IfcQuantityWeight'):
-        if quantity:
-            total_weight += quantity.WeightValue
+    total_weight = quantity_totals(ifc_source)['gross_weight']
     return round(total_weight, 2)
 
-def extract_section_types(ifc_path):
+def _by_type_in_schema(ifc_file, ifc_type):
+    """by_type, or no instances when ifc_type is not an entity of the file's schema.
+
+    IfcStructuralProfileProperties only exists in IFC2X3 and IfcMaterialProfileSet
+    only from IFC4 on; asking a model for a type its schema lacks raises RuntimeError.
+    """
+    try:
+        return ifc_file.by_type(ifc_type)
+    except RuntimeError:
+        return []
+
+def extract_section_types(ifc_source):
     """Extracts unique section types from an IFC file using ifcopenshell."""
     section_types = set()
-    ifc_file = ifcopenshell.open(ifc_path)
-    for element in ifc_file.by_type('IfcStructuralProfileProperties'):
-        section_types.add(element.ProfileName)
-    for element in ifc_file.by_type('IfcCShapeProfileDef'):
-        section_types.add(element.ProfileName)
+    ifc_file = open_model(ifc_source)
+    for ifc_type in ('IfcStructuralProfileProperties', 'IfcProfileDef'):
+        for element in _by_type_in_schema(ifc_file, ifc_type):
+            if element.ProfileName:
+                section_types.add(element.ProfileName)
     return section_types
 
-def extract_Aux_data(ifc_path):
-    """Extracts auxiliary data (section counts and weights) from an IFC file using ifcopenshell."""
-    Aux_data = {}
-    ifc_file = ifcopenshell.open(ifc_path)
-    for element in ifc_file.by_type('IfcStructuralProfileProperties'):
-        section_name = element.ProfileName
-        if section_name not in Aux_data:
-            Aux_data[section_name] = {'count': 0, 'total_weight': 0.0}
-        Aux_data[section_name]['count'] += 1
-    for element in ifc_file.by_type('IfcQuantityWeight'):
-        section_name = element.Name
-        if section_name in Aux_data:
-            Aux_data[section_name]['total_weight'] += element.WeightValue
-    for key in Aux_data:
-        Aux_data[key]['total_weight'] = round(Aux_data[key]['total_weight'], 2)
-    total_stud_count = sum(data['count'] for data in Aux_data.values())
-    return total_stud_count, Aux_data
-
-def extract_floor_data(ifc_path):
+# Profile group of members with no profile in the model
+UNASSIGNED_PROFILE = 'Unassigned'
+
+def member_profiles(ifc_file):
+    """Maps element id to the name of the profile associated with it.
+
+    Reads IFC4 material profile sets (directly or through an
+    IfcMaterialProfileSetUsage) and IFC2X3 profile properties, one pass over
+    each kind of association. A set of several profiles is named by joining them.
+    """
+    profiles = {}
+    for relation in _by_type_in_schema(ifc_file, 'IfcRelAssociatesProfileProperties'):
+        properties = relation.RelatingProfileProperties
+        name = getattr(properties, 'ProfileName', None) or getattr(getattr(properties, 'ProfileDefinition', None), 'ProfileName', None)
+        if name:
+            for element in relation.RelatedObjects or ():
+                profiles[element.id()] = name
+
+    for relation in _by_type_in_schema(ifc_file, 'IfcRelAssociatesMaterial'):
+        material = relation.RelatingMaterial
+        if material is not None and material.is_a('IfcMaterialProfileSetUsage'):
+            material = material.ForProfileSet
+        if material is None or not material.is_a('IfcMaterialProfileSet'):
+            continue
+        names = [profile.Profile.ProfileName for profile in material.MaterialProfiles or ()
+                 if profile.Profile is not None and profile.Profile.ProfileName]
+        if names:
+            name = ' + '.join(dict.fromkeys(names))
+            for element in relation.RelatedObjects or ():
+                profiles[element.id()] = name
+    return profiles
+
+def _representation_profile(element):
+    """ProfileName of the first swept-area solid in the element's own representation, if any."""
+    shape = element.Representation
+    for representation in getattr(shape, 'Representations', None) or ():
+        for item in representation.Items or ():
+            area = getattr(item, 'SweptArea', None)
+            if area is not None and area.ProfileName:
+                return area.ProfileName
+    return None
+
+def section_breakdown(members):
+    """Groups extract_member_schedule rows by profile in one array pass.
+
+    Returns {profile: {'count', 'total_length', 'total_weight'}} sorted by
+    profile name; members without a profile are grouped as UNASSIGNED_PROFILE.
+    """
+    if not members:
+        return {}
+    profiles = np.array([row['profile'] or UNASSIGNED_PROFILE for row in members])
+    lengths = np.fromiter((row['length'] for row in members), dtype=np.float64, count=len(members))
+    weights = np.fromiter((row['weight'] for row in members), dtype=np.float64, count=len(members))
+    names, codes = np.unique(profiles, return_inverse=True)
+    counts = np.bincount(codes, minlength=len(names))
+    total_lengths = np.round(np.bincount(codes, weights=lengths, minlength=len(names)), 2)
+    total_weights = np.round(np.bincount(codes, weights=weights, minlength=len(names)), 2)
+    return {
+        name: {'count': count, 'total_length': length, 'total_weight': weight}
+        for name, count, length, weight in zip(names.tolist(), counts.tolist(), total_lengths.tolist(), total_weights.tolist())
+    }
+
+def extract_Aux_data(ifc_source):
+    """Extracts auxiliary data (member counts, lengths and weights per section) from an IFC file.
+
+    Returns (member count, section_breakdown of the member schedule).
+    """
+    members = extract_member_schedule(ifc_source)
+    return len(members), section_breakdown(members)
+
+def extract_floor_data(ifc_source):
     """Extracts floor data to determine the number of stories in the building using ifcopenshell."""
-    ifc_file = ifcopenshell.open(ifc_path)
+    ifc_file = open_model(ifc_source)
     floors = len(ifc_file.by_type('IfcBuildingStorey'))
     return floors
 
 
-def extract_forces_moments(ifc_path):
-    """Extracts total forces and moments from an IFC file."""
+# Element types counted per storey, as in extract_element_counts
+STOREY_ELEMENT_TYPES = ['IfcBeam', 'IfcColumn']
+
+
+def extract_storeys(ifc_source):
+    """Returns one dict per IfcBuildingStorey, lowest first.
+
+    Each has the storey 'global_id' and 'name', its 'elevation' in feet (None when the file
+    gives none; those storeys come last, in file order) and 'element_counts'
+    of the beams and columns contained in it.
+    """
+    ifc_file = open_model(ifc_source)
+    counts = {}
+    for relation in ifc_file.by_type('IfcRelContainedInSpatialStructure'):
+        structure = relation.RelatingStructure
+        if structure is None:
+            continue
+        storey_counts = counts.setdefault(structure.id(), dict.fromkeys(STOREY_ELEMENT_TYPES, 0))
+        for element in relation.RelatedElements or ():
+            # is_a(t) also matches subtypes such as IfcBeamStandardCase, as by_type does
+            for element_type in STOREY_ELEMENT_TYPES:
+                if element.is_a(element_type):
+                    storey_counts[element_type] += 1
+                    break
+
+    storeys = []
+    for storey in ifc_file.by_type('IfcBuildingStorey'):
+        elevation = storey.Elevation
+        storeys.append({
+            'global_id': storey.GlobalId,
+            'name': storey.Name,
+            'elevation': round(elevation / 12, 2) if elevation is not None else None,
+            'element_counts': counts.get(storey.id(), dict.fromkeys(STOREY_ELEMENT_TYPES, 0)),
+        })
+    storeys.sort(key=lambda s: (s['elevation'] is None, s['elevation'] or 0.0))
+    return storeys
+
+
+def extract_member_schedule(ifc_source):
+    """Returns one dict per beam and column, beams first, in file order.
+
+    Each row has the member's 'global_id', 'type' ('Beam' or 'Column'),
+    'name', 'profile', the 'storey' name it is contained in, and its summed
+    IfcQuantityLength 'length' and IfcQuantityWeight 'weight'. The profile
+    comes from member_profiles, else the swept area of the member's
+    representation, else its ObjectType.
+    """
+    ifc_file = open_model(ifc_source)
+    index = property_index(ifc_source, ifc_file)
+    profiles = member_profiles(ifc_file)
+    storey_names = {}
+    for relation in ifc_file.by_type('IfcRelContainedInSpatialStructure'):
+        structure = relation.RelatingStructure
+        if structure is None:
+            continue
+        # Malformed files can point RelatingStructure at a non-spatial entity
+        name = getattr(structure, 'Name', None)
+        for element in relation.RelatedElements or ():
+            storey_names[element.id()] = name
+
+    rows = []
+    for member_type in STOREY_ELEMENT_TYPES:
+        for element in ifc_file.by_type(member_type):
+            length = weight = 0.0
+            for quantity in index.get_quantities(element.GlobalId):
+                if quantity.is_a('IfcQuantityLength'):
+                    length += quantity.LengthValue or 0.0
+                elif quantity.is_a('IfcQuantityWeight'):
+                    weight += quantity.WeightValue or 0.0
+            rows.append({
+                'global_id': element.GlobalId,
+                'type': member_type[3:],
+                'name': element.Name,
+                'profile': profiles.get(element.id()) or _representation_profile(element) or element.ObjectType,
+                'storey': storey_names.get(element.id()),
+                'length': round(length, 2),
+                'weight': round(weight, 2),
+            })
+    return rows
+
+
+def extract_forces_moments(ifc_source):
+    """Extracts total forces and moments per storey from an IFC file.
+
+    The DATA section is streamed from a memory map and never loaded through
+    ifcopenshell. Each IfcForceVector/IfcMomentVector is attributed to the
+    last IfcBuildingStorey that precedes it in the file.
+    """
+    from step_reader import mapped, iter_buffer_entities, read_schema, split_args, unquote
+
     forces = {}
     moments = {}
+    ifc_path = source_path(ifc_source)
 
-    # Load the IFC file
-    ifc_file = ifcopenshell.open(ifc_path)
-    
-    # Check the schema of the IFC file
-    schema = ifc_file.schema
+    # Check the schema of the IFC file from its header
+    schema = read_schema(ifc_path) or ""
 
     # Define patterns based on schema
     if schema == "IFC2X3":
         # If the schema is IFC2X3, handle accordingly
-        print("Using schema IFC2X3")
+        print("Using schema IFC2X3", file=sys.stderr)
         # You may need to use different entity names or extraction methods
         # Currently, there's no direct equivalent for IfcForceVector and IfcMomentVector in IFC2X3
         # Hence, we would need to understand the exact requirement and map them accordingly
         return forces, moments
     elif schema.startswith("IFC4"):
         # If the schema is IFC4 or any of its derivatives
-        print("Using schema IFC4")
-        force_pattern = re.compile(r'IFCFORCEVECTOR\(([^,]+),([^,]+),([^,]+)\);')
-        moment_pattern = re.compile(r'IFCMOMENTVECTOR\(([^,]+),([^,]+),([^,]+)\);')
-        floor_pattern = re.compile(r'#\d+=\s*IFCBUILDINGSTOREY\(([^,]+),')
-
-        current_floor = "Foundation"
-
-        for line in open(ifc_path, 'r'):
-            floor_match = floor_pattern.search(line)
-            if floor_match:
-                current_floor = floor_match.group(1).strip("'")
-                if current_floor not in forces:
-                    forces[current_floor] = np.zeros(3)
-                    moments[current_floor] = np.zeros(3)
-            force_match = force_pattern.search(line)
-            if force_match:
-                force_values = list(map(float, force_match.groups()))
-                forces[current_floor] += np.array(force_values)
-            moment_match = moment_pattern.search(line)
-            if moment_match:
-                moment_values = list(map(float, moment_match.groups()))
-                moments[current_floor] += np.array(moment_values)
+        print("Using schema IFC4", file=sys.stderr)
+        floors = []
+        floor_index = {}
+        current = None
+        # Flat buffers of (floor index, x, y, z) per vector; reduced once at the end
+        vector_floors = {'IFCFORCEVECTOR': array('l'), 'IFCMOMENTVECTOR': array('l')}
+        vector_values = {'IFCFORCEVECTOR': array('d'), 'IFCMOMENTVECTOR': array('d')}
+
+        with mapped(ifc_path) as buf:
+            for _, entity_type, args in iter_buffer_entities(buf, ('IFCBUILDINGSTOREY', 'IFCFORCEVECTOR', 'IFCMOMENTVECTOR')):
+                if entity_type == 'IFCBUILDINGSTOREY':
+                    name = unquote(split_args(args)[0])
+                    if name not in floor_index:
+                        floor_index[name] = len(floors)
+                        floors.append(name)
+                    current = floor_index[name]
+                    continue
+                components = args.split(b',')
+                if len(components) != 3:
+                    continue
+                try:
+                    values = [float(c) for c in components]
+                except ValueError:
+                    continue
+                if current is None:
+                    # Vectors ahead of the first storey belong to the foundation
+                    floor_index["Foundation"] = current = len(floors)
+                    floors.append("Foundation")
+                vector_floors[entity_type].append(current)
+                vector_values[entity_type].extend(values)
+
+        totals = {}
+        for entity_type in vector_floors:
+            index = np.frombuffer(vector_floors[entity_type], dtype='l')
+            values = np.frombuffer(vector_values[entity_type], dtype=np.float64).reshape(-1, 3)
+            total = np.zeros((len(floors), 3))
+            for axis in range(3):
+                total[:, axis] = np.bincount(index, weights=values[:, axis], minlength=len(floors))
+            totals[entity_type] = total
+
+        for i, floor in enumerate(floors):
+            forces[floor] = totals['IFCFORCEVECTOR'][i]
+            moments[floor] = totals['IFCMOMENTVECTOR'][i]
 
         return forces, moments
     else:
         raise ValueError(f"Unsupported IFC schema: {schema}")
 
-def extract_roof_pressures(ifc_path):
+def extract_roof_pressures(ifc_source):
     """Extracts roof uplift and downpressure from an IFC file."""
     uplift_pressures = {}
     down_pressures = {}
 
-    # Load the IFC file
-    ifc_file = ifcopenshell.open(ifc_path)
+    ifc_file = open_model(ifc_source)
+    index = property_index(ifc_source, ifc_file)
 
     for element in ifc_file.by_type('IfcRoof'):
-        material_set = element.IsDefinedBy
-        if material_set:
-            for definition in material_set:
-                if definition.is_a('IfcRelDefinesByProperties'):
-                    property_set = definition.RelatingPropertyDefinition
-                    if property_set.is_a('IfcPropertySet'):
-                        for prop in property_set.HasProperties:
-                            if prop.is_a('IfcPropertySingleValue'):
-                                if 'UpliftPressure' in prop.Name:
-                                    uplift_pressures[element.GlobalId] = prop.NominalValue.wrappedValue
-                                if 'DownPressure' in prop.Name:
-                                    down_pressures[element.GlobalId] = prop.NominalValue.wrappedValue
+        for name, value in index.properties.get(element.GlobalId, {}).items():
+            if 'UpliftPressure' in name:
+                uplift_pressures[element.GlobalId] = value
+            if 'DownPressure' in name:
+                down_pressures[element.GlobalId] = value
 
     return uplift_pressures, down_pressures
 
-def parse_ifc_file(ifc_path, zero_val=None):
-    """Parses the IFC file to extract 3D coordinates using ifcopenshell."""
-    remove_zero_point_var = BooleanVar(value=False)
-    if zero_val is not None:
-        remove_zero_point_var = zero_val
-    coordinates = []
-    ifc_file = ifcopenshell.open(ifc_path)
-    for point in ifc_file.by_type('IfcCartesianPoint'):
-        coord_tuple = tuple(point.Coordinates)
-        if len(coord_tuple) == 3 and (not remove_zero_point_var.get() or coord_tuple != (0.0, 0.0, 0.0)):
-            coordinates.append(tuple(round(x / 12, 2) for x in coord_tuple))
-    return coordinates
+def _flag_value(flag):
+    """Reads a plain bool or a Tk BooleanVar-like object with .get()."""
+    if flag is None:
+        return False
+    if hasattr(flag, 'get'):
+        return bool(flag.get())
+    return bool(flag)
+
+def parse_ifc_file(ifc_source, zero_val=None, as_array=False):
+    """Parses the IFC file to extract 3D coordinates (in feet) using ifcopenshell.
+
+    zero_val may be a bool or the GUI's BooleanVar; when set, points at the
+    origin are dropped. Scaling, rounding and filtering run as array
+    operations. With as_array=True the result is an (N, 3) float array,
+    otherwise a list of (x, y, z) tuples as before. Low-memory models keep
+    their points in a coordinate store; as_array then returns a new store
+    in feet, written chunk by chunk next to it.
+    """
+    remove_zero_point = _flag_value(zero_val)
+    ifc_file = open_model(ifc_source)
+    if hasattr(ifc_file, 'point_coordinates'):
+        # Low-memory models already hold the 3D points as one array or store
+        coords = ifc_file.point_coordinates()
+    else:
+        points = [point.Coordinates for point in ifc_file.by_type('IfcCartesianPoint')]
+        points = [coords for coords in points if len(coords) == 3]
+        coords = np.array(points, dtype=np.float64).reshape(-1, 3)
+
+    def to_feet(block):
+        if remove_zero_point:
+            block = block[np.any(block != 0.0, axis=1)]
+        return np.round(block / 12, 2)
+
+    from coordinate_store import is_store, write_store
+    if is_store(coords):
+        coords = write_store(coords.sibling('feet-nozero' if remove_zero_point else 'feet'), map(to_feet, coords.chunks()))
+    else:
+        coords = to_feet(coords)
+    if as_array:
+        return coords
+    return list(map(tuple, np.asarray(coords).tolist()))
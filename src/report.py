@@ -17,158 +17,326 @@ Include a header with Mythic Systems branding in each Python file:
 # All rights reserved.
 '''
 
-import matplotlib
-matplotlib.use('Agg')  # Use a non-interactive backend
-import seaborn as sns
-import matplotlib.pyplot as plt
+# Plotting and PDF dependencies are imported inside the functions that use
+# them, so importing this module stays cheap for headless callers.
 import numpy as np
-from scipy.spatial import Delaunay, ConvexHull
-from tkinter import Tk, messagebox, Label, Checkbutton, BooleanVar, Entry
-from tkinterdnd2 import TkinterDnD, DND_FILES
-from fpdf import FPDF
-import tkinter as tk
-from tkinter import simpledialog
-
-def plot_coordinates(coordinates, areas, output_path, ifc_file_path):
-    from read_methods import extract_ifc_data
-    from calculate import calculate_perimeter,calculate_footing_perimeter
-    if not all(len(coord) == 3 for coord in coordinates):
-        raise ValueError("Some coordinates do not have exactly three values.")
-
-    x_vals = [coord[0] for coord in coordinates]
-    y_vals = [coord[1] for coord in coordinates]
-    z_vals = [coord[2] for coord in coordinates]
+
+# Above this many points a projection is drawn from a level-of-detail subset
+PLOT_LOD_POINTS = 50000
+# LOD grid cells per axis; several per output pixel at the default figure size
+PLOT_LOD_GRID = 2048
+# Most segments one projection draws, whatever the point count
+PLOT_MAX_SEGMENTS = 200000
+# Most total line length, in LOD grid cells, one projection draws: about
+# twice what it takes to ink every pixel of a panel, past which more lines
+# cannot change the picture but still cost Agg time per pixel crossed
+PLOT_MAX_INK = 1500000
+# Lines with more vertices than this are rasterized inside the PDF
+PLOT_RASTERIZE_VERTICES = 20000
+PLOT_DPI = 150
+
+def projection_polyline(u, v, lod_points=PLOT_LOD_POINTS, grid=PLOT_LOD_GRID, max_segments=PLOT_MAX_SEGMENTS, max_ink=PLOT_MAX_INK, low=None, span=None):
+    """Vertices of the polyline through the points (u[i], v[i]), as a (K, 2) array.
+
+    Up to lod_points points this is every point, in order. Past that, both
+    ends of each segment are snapped to a grid x grid raster over the data
+    range; segments inside one cell are dropped and, of segments joining the
+    same two cells, only the first is kept. If that still leaves more than
+    max_segments segments, or more than max_ink cells of total length (points
+    in random order scribble across the whole panel), an even subset that
+    fits both is drawn. The kept segments come back as
+    runs separated by NaN rows, which matplotlib draws as gaps, so the whole
+    projection stays a single line artist. low and span fix the raster to a
+    larger data range than these points, as store_polylines needs.
+    """
+    points = np.column_stack([u, v])
+    if len(points) <= lod_points:
+        return points
+
+    if low is None:
+        low = points.min(axis=0)
+        span = np.ptp(points, axis=0)
+    span = np.where(span == 0, 1.0, span)
+    cells = np.minimum(((points - low) / span * grid).astype(np.int64), grid - 1)
+    cell = cells[:, 0] * grid + cells[:, 1]
+    start, end = cell[:-1], cell[1:]
+    # The same two cells in either direction are one segment
+    keys = np.minimum(start, end) * (grid * grid) + np.maximum(start, end)
+    keys[start == end] = -1
+    _, first = np.unique(keys, return_index=True)
+    first = first[keys[first] >= 0]
+    ink = np.hypot(*(cells[first + 1] - cells[first]).T).sum()
+    keep = min(len(first), max_segments, int(len(first) * max_ink / ink) if ink > max_ink else len(first))
+    if keep < len(first):
+        first = first[np.linspace(0, len(first) - 1, keep).astype(np.int64)]
+    first.sort()
+    if len(first) == 0:
+        return np.empty((0, 2))
+
+    # Consecutive kept segments share a vertex: emit each run of them as
+    # first[a], ..., first[b], first[b] + 1 followed by a NaN break
+    run_end = np.append(np.flatnonzero(np.diff(first) != 1), len(first) - 1)
+    runs_before = np.searchsorted(run_end, np.arange(len(first)))
+    vertex = np.empty(len(first) + 2 * len(run_end), dtype=np.int64)
+    vertex[np.arange(len(first)) + 2 * runs_before] = first
+    last = run_end + 2 * np.arange(len(run_end))
+    vertex[last + 1] = first[run_end] + 1
+    vertex[last + 2] = -1
+    polyline = points[vertex]
+    polyline[vertex < 0] = np.nan
+    return polyline
+
+def store_polylines(store, axes, low, high):
+    """projection_polyline of each (u column, v column) pair in axes over a coordinate store.
+
+    The store is read one chunk at a time (with the last point of the chunk
+    before, so no segment is lost) on a raster over the whole data range;
+    each chunk gets its share of the segment and ink budgets.
+    """
+    span = high - low
+    parts = [[] for _ in axes]
+    previous = np.empty((0, 3))
+    for chunk in store.chunks():
+        share = len(chunk) / len(store)
+        block = np.concatenate([previous, chunk])
+        previous = chunk[-1:]
+        for part, (u, v) in zip(parts, axes):
+            part.append(projection_polyline(
+                block[:, u], block[:, v], lod_points=0, max_segments=max(1, int(PLOT_MAX_SEGMENTS * share)),
+                max_ink=PLOT_MAX_INK * share, low=low[[u, v]], span=span[[u, v]]))
+            part.append(np.full((1, 2), np.nan))
+    return [np.concatenate(part) if part else np.empty((0, 2)) for part in parts]
+
+def plot_coordinates(coordinates, areas, output_path, ifc_source, weight=None, perimeter=None, image_path=None):
+    """Writes the XZ/YZ/XY projections and the summary panel to output_path.
+
+    weight (CFS weight) and perimeter (the footing hull perimeter) are taken
+    from the caller when given; otherwise they are computed here, weight by
+    reading ifc_source. Each projection is one line through the vertices
+    projection_polyline picks, so drawing time and file size stay bounded as
+    the point count grows; dense lines are rasterized at PLOT_DPI.
+    image_path, if given, also gets a PNG of the page for create_report.
+    """
+    import matplotlib
+    matplotlib.use('Agg')  # Use a non-interactive backend
+    from matplotlib.figure import Figure
+    import seaborn as sns
+    from coordinate_store import is_store
+    coords = coordinates
+    if not is_store(coords) or len(coords) <= PLOT_LOD_POINTS:
+        coords = np.asarray(coords, dtype=float)
+        if coords.ndim != 2 or coords.shape[1] != 3:
+            raise ValueError("Some coordinates do not have exactly three values.")
+    if weight is None:
+        from read_methods import extract_ifc_data
+        weight = extract_ifc_data(ifc_source)
+    if perimeter is None:
+        from calculate import calculate_perimeter
+        perimeter = calculate_perimeter(coords)
+
+    # XZ, YZ and XY as (u column, v column)
+    axes_columns = [(0, 2), (1, 2), (0, 1)]
+    if is_store(coords):
+        # Larger than memory: one chunked pass for the limits, one for the lines
+        low, high = coords.bounds()
+        polylines = store_polylines(coords, axes_columns, low, high)
+    else:
+        low, high = coords.min(axis=0), coords.max(axis=0)
+        polylines = [projection_polyline(coords[:, u], coords[:, v]) for u, v in axes_columns]
 
     # Determine max height for plot uniformity
-    fac = 0.30 * max(max(z_vals), max(x_vals), max(y_vals))
-    max_height = max(z_vals)
-    max_width = max(y_vals)
-    max_length = max(x_vals)
+    max_height = high[2]
+    max_width = high[1]
+    max_length = high[0]
+    fac = 0.30 * max(max_height, max_length, max_width)
 
     max_hw = max(max_height, max_width) + fac
-    min_hw = min(min(y_vals), min(z_vals)) - fac
+    min_hw = min(low[1], low[2]) - fac
 
     max_lw = max(max_length, max_width) + fac
-    min_lw = min(min(y_vals), min(x_vals)) - fac
-
-    fig, axes = plt.subplots(nrows=2, ncols=2, figsize=(10, 14), constrained_layout=True)
-    axes = axes.flatten()  # Flatten the 2x2 grid to 1D for easier indexing
+    min_lw = min(low[1], low[0]) - fac
 
-    sns.set(style="whitegrid")
-    
     # Font settings
     title_fontsize = 14
     label_fontsize = 12
     tick_fontsize = 10
 
-    # XZ Plane
-    axes[0].plot(x_vals, z_vals, color='royalblue', linewidth=1)
-    axes[0].set_title('XZ Plane (Feet)', fontsize=title_fontsize)
-    axes[0].set_xlabel('X (feet)', fontsize=label_fontsize)
-    axes[0].set_ylabel('Z (feet)', fontsize=label_fontsize)
-    axes[0].axis('equal')
-    axes[0].set_xlim([min_lw, max_lw])
-    axes[0].set_ylim([min_hw, max_hw])
-    axes[0].tick_params(axis='both', which='major', labelsize=tick_fontsize)
-
-        # YZ Plane
-    axes[1].plot(y_vals, z_vals, color='royalblue', linewidth=1)
-    axes[1].set_title('YZ Plane (Feet)', fontsize=title_fontsize)
-    axes[1].set_xlabel('Y (feet)', fontsize=label_fontsize)
-    axes[1].set_ylabel('Z (feet)', fontsize=label_fontsize)
-    axes[1].axis('equal')
-    axes[1].set_xlim([min_lw, max_lw])
-    axes[1].set_ylim([min_hw, max_hw])
-    axes[1].tick_params(axis='both', which='major', labelsize=tick_fontsize)
-
-    # XY Plane
-    axes[2].plot(x_vals, y_vals, color='royalblue', linewidth=1)
-    axes[2].set_title('XY Plane (Feet)', fontsize=title_fontsize)
-    axes[2].set_xlabel('X (feet)', fontsize=label_fontsize)
-    axes[2].set_ylabel('Y (feet)', fontsize=label_fontsize)
-    axes[2].axis('equal')
-    axes[2].set_xlim([min_lw, max_lw])
-    axes[2].set_ylim([min_hw, max_hw])
-    axes[2].tick_params(axis='both', which='major', labelsize=tick_fontsize)
-
-    ww = extract_ifc_data(ifc_file_path)
-    perimeter = calculate_perimeter(coordinates)
-    footing_perimeter_coords = calculate_footing_perimeter(coordinates)
-
-    # Plot Footing Perimeter
-
-    footing_perimeter_coords = calculate_footing_perimeter(coordinates)
-
-    if footing_perimeter_coords:
-        x_vals_fp = [point[0] for point in footing_perimeter_coords] + [footing_perimeter_coords[0][0]]
-        y_vals_fp = [point[1] for point in footing_perimeter_coords] + [footing_perimeter_coords[0][1]]
-        #axes[2].plot(x_vals_fp, y_vals_fp, color='red', linewidth=1)
-
-    # Aux Info
-    axes[3].axis('off')
-    axes[3].text(0.1, 0.9, f'XZ Area: {areas[2]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
-    axes[3].text(0.1, 0.8, f'YZ Area: {areas[1]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
-    axes[3].text(0.1, 0.7, f'XY Area: {areas[0]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
-    axes[3].text(0.1, 0.6, f'CFS Weight: {ww} lbs.', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
-    axes[3].text(0.1, 0.5, f'Footing Perimeter: {perimeter} feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
-
-    plt.savefig(output_path)
-    # plt.show()
-
-def create_Aux_pdf(element_counts, output_path, ifc_path, floor_count, forces, moments, perimeter, roof_uplift, roof_downpressure, wind_force, wall_height, roof_perimeter, areas, wind_loads, dead_load, total_weight, total_snow_load, total_ice_load, live_loads, seismic_load):
+    # A Figure without pyplot: no global figure state, so it is safe on a
+    # pipeline worker thread and needs no explicit close. Agg draws long
+    # paths in chunks, which avoids its cell block limit on dense lines.
+    with matplotlib.rc_context(dict(sns.axes_style("whitegrid"), **{'agg.path.chunksize': 10000})):
+        fig = Figure(figsize=(10, 14), constrained_layout=True)
+        axes = fig.subplots(nrows=2, ncols=2).flatten()
+
+        projections = [
+            ('XZ Plane (Feet)', 'X (feet)', 'Z (feet)'),
+            ('YZ Plane (Feet)', 'Y (feet)', 'Z (feet)'),
+            ('XY Plane (Feet)', 'X (feet)', 'Y (feet)'),
+        ]
+        for ax, (title, xlabel, ylabel), polyline in zip(axes, projections, polylines):
+            ax.plot(polyline[:, 0], polyline[:, 1], color='royalblue', linewidth=1,
+                    rasterized=len(polyline) > PLOT_RASTERIZE_VERTICES)
+            ax.set_title(title, fontsize=title_fontsize)
+            ax.set_xlabel(xlabel, fontsize=label_fontsize)
+            ax.set_ylabel(ylabel, fontsize=label_fontsize)
+            ax.axis('equal')
+            ax.set_xlim([min_lw, max_lw])
+            ax.set_ylim([min_hw, max_hw])
+            ax.tick_params(axis='both', which='major', labelsize=tick_fontsize)
+
+        # Aux Info
+        axes[3].axis('off')
+        axes[3].text(0.1, 0.9, f'XZ Area: {areas[2]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
+        axes[3].text(0.1, 0.8, f'YZ Area: {areas[1]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
+        axes[3].text(0.1, 0.7, f'XY Area: {areas[0]} sq. feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
+        axes[3].text(0.1, 0.6, f'CFS Weight: {weight} lbs.', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
+        axes[3].text(0.1, 0.5, f'Footing Perimeter: {perimeter} feet', horizontalalignment='left', verticalalignment='center', fontsize=label_fontsize)
+
+        fig.savefig(output_path, dpi=PLOT_DPI)
+        if image_path:
+            fig.savefig(image_path, dpi=PLOT_DPI)
+
+def aux_sections(element_counts, floor_count, forces, moments, perimeter, roof_uplift, roof_downpressure, wind_force, wall_height, roof_perimeter, areas, wind_loads, dead_load, total_weight, total_snow_load, total_ice_load, live_loads, seismic_load, cleanup_report=None, storeys=None, section_breakdown=None, seismic_elf=None, profile_lines=None):
+    """The Aux report as a list of (title, lines, font size), one page or more per section.
+
+    Shared by write_Aux_pdf and create_report so both show the same values.
+    """
     from calculate import calculate_linear_load, calculate_wall_moments
-    pdf = FPDF()
     multi_story_msg = "The building is a single story."
     if floor_count > 1:
         multi_story_msg = f"The building has {floor_count} stories."
 
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-
-    pdf.cell(200, 10, txt="Auxiliary Data", ln=True, align='C')
-
+    lines = []
     for element_type, count in element_counts.items():
-        pdf.cell(200, 10, txt=f'{element_type} Count: {count}', ln=True)
+        lines.append(f'{element_type} Count: {count}')
 
-    pdf.cell(200, 10, txt=multi_story_msg, ln=True)
-    pdf.cell(200, 10, txt=f'Total_weight: {total_weight} lbs', ln=True)
-    # pdf.cell(200, 10, txt=f'Total Beam Weight: {total_beam_weight} lbs', ln=True)
-    # pdf.cell(200, 10, txt=f'Total Column Weight: {total_column_weight} lbs', ln=True)
+    lines.append(multi_story_msg)
+    lines.append(f'Total_weight: {total_weight} lbs')
 
     for floor in forces:
         total_force = np.sum(forces[floor])
         total_moment = np.sum(moments[floor])
-        pdf.cell(200, 10, txt=f'{floor} - Total Force: {total_force} N, Total Moment: {total_moment} Nm', ln=True)
+        lines.append(f'{floor} - Total Force: {total_force} N, Total Moment: {total_moment} Nm')
 
     linear_load = calculate_linear_load(perimeter, roof_uplift, roof_downpressure)
     wall_moment = calculate_wall_moments(wind_force, wall_height)
     
     wind_pressure = wind_loads['Wind Pressure']
 
-    pdf.cell(200, 10, txt=f'Estimated Linear Load on Perimeter: {linear_load} lbs/ft', ln=True)
-    pdf.cell(200, 10, txt=f'Wall Moment from Wind: {wall_moment} Nm', ln=True)
-    pdf.cell(200, 10, txt=f'Wind Pressure on Roof: {wind_pressure} lbs/ft²', ln=True)
+    lines.append(f'Estimated Linear Load on Perimeter: {linear_load} lbs/ft')
+    lines.append(f'Wall Moment from Wind: {wall_moment} Nm')
+    lines.append(f'Wind Pressure on Roof: {wind_pressure} lbs/ft²')
 
-    pdf.cell(200, 10, txt=f'Roof Perimeter: {roof_perimeter} feet', ln=True)
-    pdf.cell(200, 10, txt=f'XZ Area: {areas[2]} sq. feet', ln=True)
-    pdf.cell(200, 10, txt=f'YZ Area: {areas[1]} sq. feet', ln=True)
-    pdf.cell(200, 10, txt=f'XY Area: {areas[0]} sq. feet', ln=True)
+    lines.append(f'Roof Perimeter: {roof_perimeter} feet')
+    lines.append(f'XZ Area: {areas[2]} sq. feet')
+    lines.append(f'YZ Area: {areas[1]} sq. feet')
+    lines.append(f'XY Area: {areas[0]} sq. feet')
+    if cleanup_report is not None:
+        from point_cleanup import format_report
+        lines.append(format_report(cleanup_report))
 
-    pdf.cell(200, 10, txt="Wind Load Calculation Results:", ln=True)
-    pdf.cell(200, 10, txt=f"Wind Pressure: {wind_loads['Wind Pressure']} lbs/ft", ln=True)
-    pdf.cell(200, 10, txt=f"Wall Moment: {wind_loads['Wall Moment']} ft-lbs", ln=True)
+    lines.append("Wind Load Calculation Results:")
+    lines.append(f"Wind Pressure: {wind_loads['Wind Pressure']} lbs/ft")
+    lines.append(f"Wall Moment: {wind_loads['Wall Moment']} ft-lbs")
 
-    pdf.cell(200, 10, txt="Dead Load Calculation Results:", ln=True)
-    pdf.cell(200, 10, txt=f"Total Dead Load: {dead_load} lbs", ln=True)
+    lines.append("Dead Load Calculation Results:")
+    lines.append(f"Total Dead Load: {dead_load} lbs")
 
-    pdf.cell(200, 10, txt="Snow Load Calculation Results:", ln=True)
-    pdf.cell(200, 10, txt=f"Total Snow Load: {total_snow_load} lbs", ln=True)
+    lines.append("Snow Load Calculation Results:")
+    lines.append(f"Total Snow Load: {total_snow_load} lbs")
 
-    pdf.cell(200, 10, txt="Ice Load Calculation Results:", ln=True)
-    pdf.cell(200, 10, txt=f"Total Ice Load: {total_ice_load} lbs", ln=True)
+    lines.append("Ice Load Calculation Results:")
+    lines.append(f"Total Ice Load: {total_ice_load} lbs")
     
-    pdf.cell(200, 10, txt="Live Loads:", ln=True)
+    lines.append("Live Loads:")
     for load_info in live_loads:
-        pdf.cell(200, 10, txt=f"Floor {load_info['floor']} - Percentage Load: {load_info['percentage_load']}%, Area Load: {load_info['area_load']} sq. feet", ln=True)
+        lines.append(f"Floor {load_info['floor']} - Percentage Load: {load_info['percentage_load']}%, Area Load: {load_info['area_load']} sq. feet")
+    sections = [("Auxiliary Data", lines, 12)]
+
+    if storeys:
+        storey_lines = []
+        for storey in storeys:
+            elevation = f"{storey['elevation']} ft" if storey['elevation'] is not None else "no elevation"
+            counts = ', '.join(f"{count} {element_type[3:]}s" for element_type, count in storey['element_counts'].items())
+            live_load = storey['live_load']
+            storey_lines.append(f"Floor {storey['floor']} - {storey['name']} ({elevation}): {storey['points']} points, "
+                                f"area {storey['area']} sq. feet, perimeter {storey['perimeter']} feet, {counts}")
+            storey_lines.append(f"    Total Force: {np.sum(storey['force'])} N, Total Moment: {np.sum(storey['moment'])} Nm, "
+                                f"Live Load: {live_load['percentage_load']}% over {live_load['area_load']} sq. feet")
+        sections.append(("Per-Storey Breakdown", storey_lines, 9))
+
+    if section_breakdown:
+        # read_methods.section_breakdown: members grouped by profile
+        section_lines = [f"{profile}: {group['count']} members, total length {group['total_length']}, "
+                         f"total weight {group['total_weight']} lbs"
+                         for profile, group in section_breakdown.items()]
+        sections.append(("Section Breakdown", section_lines, 9))
+
+    if seismic_elf:
+        # pipeline._seismic_elf: ASCE 7-16 equivalent lateral force procedure
+        elf_lines = [
+            f"Structural Height hn: {seismic_elf['hn']} feet",
+            f"Approximate Period Ta: {seismic_elf['Ta']} s, Distribution Exponent k: {seismic_elf['k']}",
+            f"Seismic Response Coefficient Cs: {seismic_elf['Cs']}",
+            f"Effective Seismic Weight W: {seismic_elf['W']} lbs",
+            f"Base Shear V: {seismic_elf['V']} lbs",
+        ]
+        for storey in seismic_elf['storeys']:
+            elf_lines.append(f"Floor {storey['floor']} - {storey['name']} (h = {storey['height']} ft): w = {storey['weight']} lbs, "
+                             f"Cvx = {storey['Cvx']}, Fx = {storey['Fx']} lbs, Storey Shear = {storey['Vx']} lbs")
+        sections.append(("Seismic Equivalent Lateral Force (ASCE 7-16)", elf_lines, 9))
+
+    if profile_lines:
+        # Appendix: per-stage timings from instrument.StageRecorder, slowest first
+        sections.append(("Appendix: Analysis Stage Profile", list(profile_lines), 9))
+    return sections
+
+def write_Aux_pdf(output_path, sections):
+    """Writes aux_sections output to output_path with fpdf, one page per section."""
+    from fpdf import FPDF
+    pdf = FPDF()
+    for title, lines, size in sections:
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+        pdf.cell(200, 10, txt=title, ln=True, align='C')
+        pdf.set_font("Arial", size=size)
+        for line in lines:
+            pdf.cell(200, 10 if size >= 12 else 6, txt=line, ln=True)
 
     pdf.output(output_path)
+
+def create_Aux_pdf(element_counts, output_path, ifc_source, floor_count, forces, moments, perimeter, roof_uplift, roof_downpressure, wind_force, wall_height, roof_perimeter, areas, wind_loads, dead_load, total_weight, total_snow_load, total_ice_load, live_loads, seismic_load, cleanup_report=None, storeys=None, section_breakdown=None, seismic_elf=None, profile_lines=None):
+    sections = aux_sections(element_counts, floor_count, forces, moments, perimeter, roof_uplift, roof_downpressure, wind_force, wall_height, roof_perimeter, areas, wind_loads, dead_load, total_weight, total_snow_load, total_ice_load, live_loads, seismic_load, cleanup_report=cleanup_report, storeys=storeys, section_breakdown=section_breakdown, seismic_elf=seismic_elf, profile_lines=profile_lines)
+    write_Aux_pdf(output_path, sections)
+
+# Member schedule columns: (header, row key, width in characters)
+MEMBER_COLUMNS = [
+    ('GlobalId', 'global_id', 24),
+    ('Type', 'type', 8),
+    ('Name', 'name', 24),
+    ('Profile', 'profile', 18),
+    ('Storey', 'storey', 18),
+    ('Length', 'length', 12),
+    ('Weight (lbs)', 'weight', 14),
+]
+
+def create_report(output_path, sections, plot_image=None, members=None):
+    """Writes the combined model report: plot page, Aux sections and member schedule.
+
+    plot_image is the PNG written by plot_coordinates(image_path=...), placed
+    as the first page. members are extract_member_schedule rows. Pages are
+    streamed to disk as they are laid out (see pdf_stream), so the schedule
+    can run to tens of thousands of rows.
+    """
+    from pdf_stream import StreamPDF
+    with StreamPDF(output_path) as pdf:
+        if plot_image:
+            from PIL import Image
+            with Image.open(plot_image) as image:
+                pdf.image_page(np.asarray(image.convert('RGB')))
+        for title, lines, size in sections:
+            pdf.lines(title, lines, size=size)
+        if members:
+            rows = ([row[key] for _, key, _ in MEMBER_COLUMNS] for row in members)
+            pdf.table(f"Member Schedule ({len(members)} members)", [header for header, _, _ in MEMBER_COLUMNS], rows,
+                      [width for _, _, width in MEMBER_COLUMNS])
@@ -0,0 +1,235 @@
+"""Dependency-graph runner for the analysis stages.
+
+A Stage declares the named values it reads and the named values it
+produces. StageGraph starts every stage as soon as its inputs exist, on a
+thread pool, so independent stages (roof pressures, element counts,
+plotting, geometry) overlap; qhull, NumPy, the extraction cache and the
+PDF writers spend most of their time outside the GIL.
+
+With a StageMemo attached, a stage's outputs are stored under a key made
+from the stage name and the keys of its inputs. Seed values are keyed by
+content (fingerprint), and every value a stage produces is keyed by the
+stage key it came from, so large arrays are never hashed to find out
+whether they changed. A later run whose inputs lead to the same key gets
+the stored outputs back without running the stage; anything downstream of
+a changed input gets a new key and runs again.
+"""
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+
+_MISSING = object()
+
+
+class Stage:
+    """One node of a StageGraph.
+
+    func is called with the declared inputs as keyword arguments and returns
+    the value of its single output, or a tuple with one value per output.
+
+    memo=False always runs the stage; use it for stages that are cheaper
+    than a cache read, interactive, or already cached some other way.
+    lock names a resource held exclusively while func runs, e.g. 'model'
+    for stages that read the IFC model. files lists outputs that are paths
+    of files func writes; a memoized result is reused only while those files
+    are unchanged. count maps the outputs dict to the number the profiler
+    records for the stage.
+    """
+    def __init__(self, name, func, inputs, outputs, memo=True, lock=None, files=(), count=None):
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.memo = memo
+        self.lock = lock
+        self.files = list(files)
+        self.count = count
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _feed(digest, value):
+    memo_key = getattr(value, 'memo_key', None)
+    if callable(memo_key):
+        # Objects such as an IFCAnalyzer session name their own identity
+        _feed(digest, ('memo_key', type(value).__name__, memo_key()))
+    elif value is None or isinstance(value, (bool, int, float, str, bytes)):
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+    elif isinstance(value, np.generic):
+        _feed(digest, value.item())
+    elif isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            raise TypeError("object arrays cannot be fingerprinted")
+        digest.update(f"ndarray:{value.dtype.str}:{value.shape};".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}[{len(value)}];".encode())
+        for item in value:
+            _feed(digest, item)
+    elif isinstance(value, dict):
+        digest.update(f"dict[{len(value)}];".encode())
+        for key in sorted(value, key=repr):
+            _feed(digest, key)
+            _feed(digest, value[key])
+    else:
+        raise TypeError(f"cannot fingerprint {type(value).__name__}")
+
+
+def fingerprint(value):
+    """Content digest of a value, or None for values that cannot be fingerprinted (callables, open files...)."""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        _feed(digest, value)
+    except TypeError:
+        return None
+    return digest.hexdigest()
+
+
+def _combine(*parts):
+    return hashlib.blake2b('\0'.join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _stamp(path):
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class StageMemo:
+    """Stage outputs stored in an ExtractionCache next to the model's extraction results."""
+    def __init__(self, cache, file_hash):
+        self.cache = cache
+        self.file_hash = file_hash
+
+    def _name(self, stage, key):
+        return f"stage-{stage.name}-{key}"
+
+    def get(self, stage, key):
+        """The stored outputs dict, or None on a miss or when a written file has changed."""
+        entry = self.cache.get(self.file_hash, self._name(stage, key))
+        if entry is None:
+            return None
+        for name, stamp in entry['files'].items():
+            try:
+                if _stamp(entry['outputs'][name]) != stamp:
+                    return None
+            except OSError:
+                return None
+        return entry['outputs']
+
+    def put(self, stage, key, outputs):
+        files = {name: _stamp(outputs[name]) for name in stage.files}
+        self.cache.put(self.file_hash, self._name(stage, key), {'outputs': outputs, 'files': files})
+
+
+class StageGraph:
+    """A set of stages wired together by their input and output names."""
+    def __init__(self, stages):
+        self.stages = list(stages)
+        self.producers = {}
+        for stage in self.stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"{output!r} is produced by both {self.producers[output].name} and {stage.name}")
+                self.producers[output] = stage
+        self._check_acyclic()
+
+    def _check_acyclic(self):
+        done = set()
+        visiting = set()
+
+        def visit(stage):
+            if stage.name in done:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"stage {stage.name} depends on itself")
+            visiting.add(stage.name)
+            for name in stage.inputs:
+                if name in self.producers:
+                    visit(self.producers[name])
+            visiting.discard(stage.name)
+            done.add(stage.name)
+
+        for stage in self.stages:
+            visit(stage)
+
+    def seeds(self):
+        """Names every run must supply: inputs that no stage produces."""
+        return sorted({name for stage in self.stages for name in stage.inputs} - set(self.producers))
+
+    def run(self, seeds, memo=None, max_workers=None, run_stage=None):
+        """Runs every stage; returns (all values by name, names of the stages served from memo).
+
+        run_stage, if given, is called as run_stage(stage, call) in the worker
+        thread and must return call(); it can time the stage, report progress
+        or raise to stop the run. Once a stage raises, no further stages start,
+        the running ones finish, and the exception is re-raised here.
+        """
+        missing = [name for name in self.seeds() if name not in seeds]
+        if missing:
+            raise ValueError(f"missing seed values: {', '.join(missing)}")
+        values = dict(seeds)
+        keys = {name: fingerprint(value) for name, value in seeds.items()} if memo is not None else {}
+        reused = []
+        locks = {stage.lock: threading.Lock() for stage in self.stages if stage.lock}
+        pending = list(self.stages)
+        running = {}
+        error = None
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for stage in [s for s in pending if all(name in values for name in s.inputs)]:
+                        pending.remove(stage)
+                        key = self._stage_key(stage, keys) if memo is not None else None
+                        kwargs = {name: values[name] for name in stage.inputs}
+                        future = executor.submit(self._execute, stage, kwargs, key, memo, locks, run_stage, reused)
+                        running[future] = (stage, key)
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, key = running.pop(future)
+                    try:
+                        outputs = future.result()
+                    except BaseException as e:
+                        error = error or e
+                        continue
+                    values.update(outputs)
+                    if memo is not None:
+                        for name, value in outputs.items():
+                            keys[name] = _combine(key, name) if key is not None else fingerprint(value)
+        if error is not None:
+            raise error
+        return values, reused
+
+    @staticmethod
+    def _stage_key(stage, keys):
+        input_keys = [keys.get(name) for name in stage.inputs]
+        if any(key is None for key in input_keys):
+            return None
+        return _combine(stage.name, *(f"{name}={key}" for name, key in zip(stage.inputs, input_keys)))
+
+    @staticmethod
+    def _execute(stage, kwargs, key, memo, locks, run_stage, reused):
+        def call():
+            if memo is not None and key is not None and stage.memo:
+                outputs = memo.get(stage, key)
+                if outputs is not None:
+                    reused.append(stage.name)
+                    return outputs
+            lock = locks.get(stage.lock)
+            if lock is not None:
+                with lock:
+                    result = stage.func(**kwargs)
+            else:
+                result = stage.func(**kwargs)
+            outputs = dict(zip(stage.outputs, result if len(stage.outputs) > 1 else (result,)))
+            if memo is not None and key is not None and stage.memo:
+                memo.put(stage, key, outputs)
+            return outputs
+
+        return run_stage(stage, call) if run_stage is not None else call()
@@ -0,0 +1,141 @@
+"""Streaming reader for the DATA section of IFC (ISO 10303-21 STEP) files.
+
+The file is memory-mapped and scanned with a compiled bytes pattern, so
+entity records come out complete even when they span several lines, and
+nothing but the matched records is ever copied into Python objects.
+"""
+import heapq
+import mmap
+import re
+from contextlib import contextmanager
+
+_SCHEMA_RE = re.compile(rb"FILE_SCHEMA\s*\(\s*\(\s*'([^']+)'")
+_DATA_RE = re.compile(rb"\bDATA\s*;")
+
+# Arguments are runs of anything but quotes and semicolons separated by
+# quoted strings (with '' as the escaped quote), so a ';' inside a string
+# never ends a record. The loop is unrolled so a malformed record fails in
+# linear time instead of backtracking.
+_ARGS = rb"([^';]*(?:'[^']*(?:''[^']*)*'[^';]*)*)"
+_ENTITY_RE = re.compile(rb"#(\d+)\s*=\s*([A-Za-z0-9_]+)\s*\(" + _ARGS + rb"\)\s*;")
+
+# Above this many wanted types, merging one substring search per type costs
+# more than a single pattern with the type names as an alternation
+_MAX_SUBSTRING_TYPES = 4
+_typed_patterns = {}
+
+
+def _typed_pattern(wanted):
+    pattern = _typed_patterns.get(wanted)
+    if pattern is None:
+        # Longest names first, so IFCBEAMTYPE is not cut short at IFCBEAM
+        names = b"|".join(sorted(wanted, key=len, reverse=True))
+        pattern = _typed_patterns[wanted] = re.compile(rb"#(\d+)\s*=\s*(" + names + rb")\s*\(" + _ARGS + rb"\)\s*;")
+    return pattern
+
+
+@contextmanager
+def mapped(path):
+    """Yields a read-only memory map of the whole file."""
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _schema_from_buffer(buf):
+    header_end = _DATA_RE.search(buf)
+    match = _SCHEMA_RE.search(buf, 0, header_end.start() if header_end else len(buf))
+    return match.group(1).decode('ascii').upper() if match else None
+
+
+def read_schema(path):
+    """Returns the schema identifier (e.g. 'IFC4') declared in the file header."""
+    with mapped(path) as mm:
+        return _schema_from_buffer(mm)
+
+
+def _find_all(buf, needle, start):
+    i = buf.find(needle, start)
+    while i != -1:
+        yield i
+        i = buf.find(needle, i + len(needle))
+
+
+def iter_buffer_entities(buf, types=None):
+    """Yields (id, TYPE, raw_args) for each entity record in buf, in file order.
+
+    types, when given, restricts the scan to those entity names (in any case).
+    A few type names are located with plain substring search, which runs far
+    faster than trying the record pattern at every '#'; longer lists use one
+    pattern with the names as alternatives. raw_args is the bytes between
+    the outer parentheses, unparsed.
+    """
+    start = _DATA_RE.search(buf)
+    pos = start.end() if start else 0
+    if not types:
+        for match in _ENTITY_RE.finditer(buf, pos):
+            yield int(match.group(1)), match.group(2).decode('ascii').upper(), match.group(3)
+        return
+
+    wanted = frozenset(t.upper().encode('ascii') for t in types)
+    if len(wanted) > _MAX_SUBSTRING_TYPES:
+        for match in _typed_pattern(wanted).finditer(buf, pos):
+            yield int(match.group(1)), match.group(2).decode('ascii'), match.group(3)
+        return
+    hits = heapq.merge(*(_find_all(buf, name, pos) for name in wanted))
+    for i in hits:
+        record_start = buf.rfind(b'#', max(pos, i - 64), i)
+        if record_start == -1:
+            continue
+        match = _ENTITY_RE.match(buf, record_start)
+        # Reject hits inside strings and longer names such as IFCBEAMTYPE
+        if match is None or match.start(2) != i or match.group(2) not in wanted:
+            continue
+        yield int(match.group(1)), match.group(2).decode('ascii'), match.group(3)
+
+
+def iter_entities(path, types=None):
+    """Yields (id, TYPE, raw_args) for each entity record in an IFC file."""
+    with mapped(path) as mm:
+        yield from iter_buffer_entities(mm, types)
+
+
+def split_args(raw_args):
+    """Splits raw entity arguments at top-level commas.
+
+    Nested lists and typed values such as IFCLABEL('a,b') stay in one piece.
+    """
+    parts = []
+    depth = 0
+    in_string = False
+    start = 0
+    i = 0
+    n = len(raw_args)
+    while i < n:
+        c = raw_args[i]
+        if in_string:
+            if c == 0x27:  # '
+                if i + 1 < n and raw_args[i + 1] == 0x27:
+                    i += 1
+                else:
+                    in_string = False
+        elif c == 0x27:
+            in_string = True
+        elif c == 0x28:  # (
+            depth += 1
+        elif c == 0x29:  # )
+            depth -= 1
+        elif c == 0x2C and depth == 0:  # ,
+            parts.append(raw_args[start:i].strip())
+            start = i + 1
+        i += 1
+    parts.append(raw_args[start:].strip())
+    return parts
+
+
+def unquote(token):
+    """Decodes a STEP string token like b"'Level 1'" to 'Level 1'."""
+    token = token.strip()
+    if len(token) >= 2 and token[:1] == b"'" and token[-1:] == b"'":
+        token = token[1:-1].replace(b"''", b"'")
+    return token.decode('utf-8', errors='replace')
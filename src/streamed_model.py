@@ -0,0 +1,361 @@
+"""Low-memory stand-in for an ifcopenshell model.
+
+StreamedModel scans the DATA section once through step_reader and keeps
+only the entity types the analysis reads (KEPT_TYPES and their subtypes);
+everything else in the file is skipped without being parsed. Kept records
+are stored as their raw argument bytes and decoded attribute by attribute
+on first access, and cartesian points go straight into flat coordinate
+arrays, so memory is bounded by the kept entities rather than the file.
+
+It answers the subset of the ifcopenshell API the extractors use: by_type,
+entity attributes and references, inverse attributes such as IsDefinedBy,
+id() and is_a(). References to entities that were not kept come back as
+None, and are left out of lists. Given a point_store path, 3D points are
+written to a coordinate_store file as they are parsed instead of being
+held in memory. The schema itself (attribute names,
+subtypes) still comes from ifcopenshell's bundled schema definitions.
+"""
+from array import array
+
+import numpy as np
+
+from step_reader import mapped, iter_buffer_entities, _schema_from_buffer, split_args, unquote
+
+# Entity types the analysis reads, with their subtypes; types the file's
+# schema lacks are skipped. Force and moment vectors are not IFC4 entities
+# and are read by extract_forces_moments directly.
+KEPT_TYPES = [
+    'IfcCartesianPoint',
+    'IfcBuildingStorey',
+    'IfcBeam',
+    'IfcColumn',
+    'IfcRoof',
+    'IfcRelDefinesByProperties',
+    'IfcRelContainedInSpatialStructure',
+    'IfcPropertySet',
+    'IfcPropertySingleValue',
+    'IfcElementQuantity',
+    'IfcPhysicalSimpleQuantity',
+    # Member profiles for the section breakdown
+    'IfcRelAssociatesMaterial',
+    'IfcMaterialProfileSetUsage',
+    'IfcMaterialProfileSet',
+    'IfcMaterialProfile',
+    'IfcRelAssociatesProfileProperties',
+    'IfcProfileProperties',
+    'IfcProfileDef',
+    'IfcProductDefinitionShape',
+    'IfcShapeRepresentation',
+    'IfcSweptAreaSolid',
+]
+
+# Points parsed per np.fromstring call
+_POINT_BATCH = 65536
+
+_UNRESOLVED = object()
+
+
+def _schema_by_name(name):
+    import ifcopenshell.ifcopenshell_wrapper as wrapper
+    try:
+        return wrapper.schema_by_name(name or 'IFC4')
+    except Exception:
+        # Newer or unusual identifiers (e.g. IFC4X3_RC1) fall back to IFC4
+        return wrapper.schema_by_name('IFC4')
+
+
+def _subtypes(declaration):
+    found = [declaration]
+    for sub in declaration.subtypes():
+        found.extend(_subtypes(sub))
+    return found
+
+
+class TypedValue:
+    """A typed STEP value such as IFCPRESSUREMEASURE(12.5)."""
+    __slots__ = ('type', 'wrappedValue')
+
+    def __init__(self, type_name, value):
+        self.type = type_name
+        self.wrappedValue = value
+
+    def is_a(self, name=None):
+        return self.type if name is None else self.type.upper() == name.upper()
+
+    def __repr__(self):
+        return f"{self.type}({self.wrappedValue!r})"
+
+
+class StreamedEntity:
+    """One kept entity; attributes are decoded from the raw record on first access."""
+    __slots__ = ('_model', '_id', '_type', '_raw', '_values')
+
+    def __init__(self, model, entity_id, entity_type, raw=None, values=None):
+        self._model = model
+        self._id = entity_id
+        self._type = entity_type
+        self._raw = raw
+        self._values = values
+
+    def id(self):
+        return self._id
+
+    def is_a(self, name=None):
+        if name is None:
+            return self._model.canonical_name(self._type)
+        return name.upper() in self._model.ancestors(self._type)
+
+    def __getattr__(self, name):
+        index = self._model.attribute_index(self._type).get(name)
+        if index is None:
+            if name in self._model.inverse_attributes(self._type):
+                return self._model.inverse(self._id, self._type, name)
+            raise AttributeError(f"{self.is_a()} has no attribute {name!r}")
+        if self._values is None:
+            self._values = split_args(self._raw)
+            self._raw = None
+        value = self._values[index] if index < len(self._values) else None
+        if isinstance(value, bytes):
+            value = self._model.decode(value)
+            self._values[index] = value
+        return value
+
+    def __eq__(self, other):
+        return isinstance(other, StreamedEntity) and other._id == self._id and other._model is self._model
+
+    def __hash__(self):
+        return hash(self._id)
+
+    def __repr__(self):
+        return f"#{self._id}={self.is_a()}(...)"
+
+
+class StreamedModel:
+    """The kept entities of one IFC file; see the module docstring."""
+    def __init__(self, schema, kept_types=KEPT_TYPES):
+        self.schema = schema
+        self._schema = _schema_by_name(schema)
+        self._kept = set()
+        for name in kept_types:
+            try:
+                declaration = self._schema.declaration_by_name(name)
+            except RuntimeError:
+                continue
+            self._kept.update(d.name().upper() for d in _subtypes(declaration))
+        # TYPE -> [id, ...] in file order, and id -> (TYPE, raw args) for everything but points
+        self._ids_by_type = {}
+        self._records = {}
+        self._entities = {}
+        # Cartesian points by dimension: ids and flat coordinates
+        self._point_ids = {2: array('q'), 3: array('q')}
+        self._point_coords = {2: np.empty(0), 3: np.empty(0)}
+        self._point_index = None
+        self._attribute_indexes = {}
+        self._inverse_decls = {}
+        self._inverse_maps = {}
+        self._ancestors = {}
+        self._names = {}
+
+    @classmethod
+    def open(cls, path, kept_types=KEPT_TYPES, point_store=None):
+        """Streams path once and returns the model of its kept entities.
+
+        point_store, if given, is the path the 3D points are written to.
+        """
+        with mapped(path) as buf:
+            model = cls(_schema_from_buffer(buf), kept_types)
+            model._read(buf, point_store)
+        return model
+
+    def _read(self, buf, point_store=None):
+        pending = {2: [], 3: []}
+        coords = {2: [], 3: []}
+        writer = None
+        if point_store is not None:
+            from coordinate_store import StoreWriter
+            writer = StoreWriter(point_store)
+
+        def flush(dim):
+            if pending[dim]:
+                block = np.fromstring(b','.join(pending[dim]).decode('ascii'), sep=',')
+                if dim == 3 and writer is not None:
+                    writer.append(block)
+                else:
+                    coords[dim].append(block)
+                pending[dim].clear()
+
+        try:
+            self._scan(buf, pending, flush)
+        except BaseException:
+            if writer is not None:
+                writer.discard()
+            raise
+
+        for dim in (2, 3):
+            flush(dim)
+            if dim == 3 and writer is not None:
+                self._point_coords[3] = writer.close()
+            elif coords[dim]:
+                self._point_coords[dim] = np.concatenate(coords[dim]).reshape(-1, dim)
+            else:
+                self._point_coords[dim] = np.empty((0, dim))
+
+    def _scan(self, buf, pending, flush):
+        for entity_id, entity_type, args in iter_buffer_entities(buf, self._kept):
+            if entity_type == 'IFCCARTESIANPOINT':
+                body = args.strip()[1:-1]
+                dim = body.count(b',') + 1
+                if dim not in pending:
+                    continue
+                self._point_ids[dim].append(entity_id)
+                pending[dim].append(body)
+                if len(pending[dim]) >= _POINT_BATCH:
+                    flush(dim)
+                continue
+            self._ids_by_type.setdefault(entity_type, []).append(entity_id)
+            self._records[entity_id] = (entity_type, bytes(args))
+
+    def point_coordinates(self):
+        """(N, 3) array of every 3D IfcCartesianPoint, in file order; a CoordinateStore with a point_store."""
+        return self._point_coords[3]
+
+    # Schema lookups, cached per entity type
+
+    def canonical_name(self, entity_type):
+        name = self._names.get(entity_type)
+        if name is None:
+            name = self._names[entity_type] = self._schema.declaration_by_name(entity_type).name()
+        return name
+
+    def ancestors(self, entity_type):
+        found = self._ancestors.get(entity_type)
+        if found is None:
+            found = set()
+            declaration = self._schema.declaration_by_name(entity_type)
+            while declaration is not None:
+                found.add(declaration.name().upper())
+                declaration = declaration.supertype()
+            self._ancestors[entity_type] = found
+        return found
+
+    def attribute_index(self, entity_type):
+        index = self._attribute_indexes.get(entity_type)
+        if index is None:
+            attributes = self._schema.declaration_by_name(entity_type).all_attributes()
+            index = self._attribute_indexes[entity_type] = {a.name(): i for i, a in enumerate(attributes)}
+        return index
+
+    def inverse_attributes(self, entity_type):
+        inverses = self._inverse_decls.get(entity_type)
+        if inverses is None:
+            inverses = self._inverse_decls[entity_type] = {
+                a.name(): (a.entity_reference().name(), a.attribute_reference().name())
+                for a in self._schema.declaration_by_name(entity_type).all_inverse_attributes()
+            }
+        return inverses
+
+    def inverse(self, entity_id, entity_type, name):
+        """Kept relationships pointing at entity_id through the inverse attribute name."""
+        relation_type, attribute = self.inverse_attributes(entity_type)[name]
+        key = (relation_type, attribute)
+        by_target = self._inverse_maps.get(key)
+        if by_target is None:
+            by_target = self._inverse_maps[key] = {}
+            for relation in self._by_type_or_empty(relation_type):
+                targets = getattr(relation, attribute)
+                if not isinstance(targets, tuple):
+                    targets = (targets,)
+                for target in targets:
+                    if target is not None:
+                        by_target.setdefault(target.id(), []).append(relation)
+        return tuple(by_target.get(entity_id, ()))
+
+    # Entity access
+
+    def _types_for(self, name):
+        declaration = self._schema.declaration_by_name(name)
+        return [d.name().upper() for d in _subtypes(declaration)]
+
+    def _by_type_or_empty(self, name):
+        return [entity for entity_type in self._types_for(name) for entity in self._instances(entity_type)]
+
+    def _instances(self, entity_type):
+        if entity_type == 'IFCCARTESIANPOINT':
+            return [
+                StreamedEntity(self, entity_id, entity_type, values=[tuple(coordinates)])
+                for dim in (3, 2)
+                for entity_id, coordinates in zip(self._point_ids[dim], np.asarray(self._point_coords[dim]).tolist())
+            ]
+        return [self.by_id(entity_id) for entity_id in self._ids_by_type.get(entity_type, ())]
+
+    def by_type(self, name):
+        """Kept instances of name and its subtypes.
+
+        Raises ValueError when neither the type nor any subtype was kept, so a
+        low-memory run fails loudly instead of silently counting nothing.
+        """
+        types = self._types_for(name)
+        if not any(entity_type in self._kept for entity_type in types):
+            raise ValueError(f"{name} is not kept in low-memory mode")
+        return [entity for entity_type in types for entity in self._instances(entity_type)]
+
+    def by_id(self, entity_id):
+        entity = self._entities.get(entity_id)
+        if entity is None:
+            record = self._records.get(entity_id)
+            if record is None:
+                return self._point(entity_id)
+            entity = self._entities[entity_id] = StreamedEntity(self, entity_id, record[0], raw=record[1])
+        return entity
+
+    def _find_point(self, entity_id):
+        """Returns (dim, row) of a kept point, searching sorted id arrays instead of a dict."""
+        if self._point_index is None:
+            self._point_index = {}
+            for dim in (2, 3):
+                ids = np.frombuffer(self._point_ids[dim], dtype=np.int64) if len(self._point_ids[dim]) else np.empty(0, dtype=np.int64)
+                order = np.argsort(ids, kind='stable')
+                self._point_index[dim] = (ids[order], order)
+        for dim, (sorted_ids, order) in self._point_index.items():
+            i = np.searchsorted(sorted_ids, entity_id)
+            if i < len(sorted_ids) and sorted_ids[i] == entity_id:
+                return dim, int(order[i])
+        return None
+
+    def _point(self, entity_id):
+        location = self._find_point(entity_id)
+        if location is None:
+            raise KeyError(f"#{entity_id} is not kept in low-memory mode")
+        dim, i = location
+        return StreamedEntity(self, entity_id, 'IFCCARTESIANPOINT', values=[tuple(np.asarray(self._point_coords[dim])[i].tolist())])
+
+    def decode(self, token, in_list=False):
+        """Decodes one raw STEP attribute token to the value ifcopenshell would return."""
+        if token in (b'', b'$', b'*'):
+            return None
+        first = token[:1]
+        if first == b'#':
+            entity_id = int(token[1:])
+            if entity_id in self._records or self._find_point(entity_id) is not None:
+                return self.by_id(entity_id)
+            return _UNRESOLVED if in_list else None
+        if first == b"'":
+            return unquote(token)
+        if first == b'(':
+            items = (self.decode(item, in_list=True) for item in split_args(token[1:-1]) if item)
+            return tuple(item for item in items if item is not _UNRESOLVED)
+        if first == b'.':
+            flag = token[1:-1].decode('ascii')
+            return {'T': True, 'F': False, 'U': None}.get(flag, flag)
+        if first.isalpha():
+            open_paren = token.index(b'(')
+            type_name = token[:open_paren].strip().decode('ascii')
+            try:
+                type_name = self._schema.declaration_by_name(type_name).name()
+            except Exception:
+                pass
+            return TypedValue(type_name, self.decode(token[open_paren + 1:-1].strip()))
+        text = token.decode('ascii')
+        if '.' in text or 'E' in text or 'e' in text:
+            return float(text)
+        return int(text)
@@ -0,0 +1,199 @@
+"""Parameter sweeps: many load scenarios against one parsed model.
+
+A sweep parses and measures the model once (points, cleanup, XY area,
+perimeter, building height, roof pressures) and then evaluates the
+scenario-dependent loads for every combination of the swept inputs as
+NumPy array operations, through the same functions run_analysis uses:
+
+    snow_load, ice_load   calculate_snow_load / calculate_ice_load on the XY area
+    seismic_load          compute_seismic_load
+    wall_moment           calculate_wall_moments(wind speed, building height),
+                          as on the Aux PDF
+    linear_load           calculate_linear_load; it depends only on the model,
+                          so every row carries the same value
+    base_shear            Seismicaddons.equivalent_lateral_force over the
+                          storey weights and heights, as on the Aux PDF;
+                          0 where seismic_sds is 0
+
+From the command line, each --sweep names one input and its values, either
+a comma-separated list or an inclusive start:stop:step range:
+
+    python batch.py tower.ifc --params params.json \\
+        --sweep wind_speed=90:150:5 --sweep snow_load=0,20,30,40
+
+writes tower_sweep.csv with one row per scenario. Inputs that are not swept
+keep the value from the parameter file.
+"""
+import os
+
+import numpy as np
+
+from IFCAnalyzer import IFCAnalyzer
+
+# Inputs a sweep can vary, in table column order
+SWEEP_FIELDS = ['wind_speed', 'snow_load', 'ice_load', 'site_class', 'importance_factor', 'spectral_response_acceleration',
+                'seismic_sds', 'seismic_sd1', 'response_modification']
+
+RESULT_COLUMNS = ['total_snow_load', 'total_ice_load', 'seismic_load', 'wall_moment', 'linear_load', 'base_shear']
+
+
+def parse_values(text):
+    """Parses '1,2,5' or an inclusive 'start:stop:step' range into a float array."""
+    text = str(text).strip()
+    try:
+        if ':' in text:
+            start, stop, step = (float(part) for part in text.split(':'))
+            if step <= 0:
+                raise ValueError
+            # Half a step of slack keeps stop in the range despite float error
+            return np.arange(start, stop + step / 2, step)
+        return np.array([float(part) for part in text.split(',') if part.strip()])
+    except ValueError:
+        raise ValueError(f"sweep values must be 'a,b,c' or 'start:stop:step' with a positive step, got {text!r}")
+
+
+def parse_sweep_arg(arg):
+    """Splits a --sweep FIELD=VALUES argument into (field, values array)."""
+    field, sep, values = arg.partition('=')
+    field = field.strip().replace('-', '_')
+    if not sep or field not in SWEEP_FIELDS:
+        raise ValueError(f"--sweep expects FIELD=VALUES with FIELD one of {', '.join(SWEEP_FIELDS)}, got {arg!r}")
+    from pipeline import check_input
+    values = parse_values(values)
+    check_input(field, values)
+    return field, values
+
+
+def scenario_grid(ranges, inputs):
+    """Every combination of the swept values, as one flat array per SWEEP_FIELDS entry.
+
+    ranges maps swept fields to value arrays; other fields are filled from inputs.
+    Raises ValueError, as parse_inputs does, when a scenario has an input out
+    of range.
+    """
+    from pipeline import check_inputs
+    axes = [np.atleast_1d(np.asarray(ranges[field], dtype=float)) if field in ranges
+            else np.array([float(inputs[field])]) for field in SWEEP_FIELDS]
+    grids = np.meshgrid(*axes, indexing='ij')
+    scenarios = {field: grid.ravel() for field, grid in zip(SWEEP_FIELDS, grids)}
+    check_inputs(scenarios)
+    return scenarios
+
+
+def model_measurements(ifc_path, inputs, cache=None, low_memory=None):
+    """The scenario-independent quantities of one model, measured the way run_analysis does.
+
+    ifc_path may be a .npz model export (see model_export.py).
+    """
+    from read_methods import parse_ifc_file, extract_roof_pressures
+    from calculate import calculate_perimeter, plan_area, building_height, calculate_linear_load, storey_geometry
+    from point_cleanup import clean_points
+    from model_export import is_model_export, load_model
+    from pipeline import combine_storeys, storey_seismic_weights
+
+    if is_model_export(ifc_path):
+        model_values = load_model(ifc_path)
+        coordinates = model_values['raw_coordinates']
+        uplift_pressures, down_pressures = model_values['uplift_pressures'], model_values['down_pressures']
+        storey_list, members, dead_load = model_values['storey_list'], model_values['member_schedule'], model_values['dead_load']
+    else:
+        from read_methods import extract_storeys, extract_member_schedule
+        from calculate import calculate_dead_load
+        session = IFCAnalyzer(ifc_path, cache=cache, low_memory=low_memory)
+        coordinates = session.cached("parse_ifc_file-zero0-array", parse_ifc_file, zero_val=False, as_array=True)
+        uplift_pressures, down_pressures = session.cached("extract_roof_pressures", extract_roof_pressures)
+        storey_list = session.cached("extract_storeys", extract_storeys)
+        members = session.cached("extract_member_schedule", extract_member_schedule)
+        dead_load = session.cached("calculate_dead_load", calculate_dead_load)
+    coordinates, _ = clean_points(
+        coordinates,
+        remove_origin=bool(inputs['remove_zero_point']),
+        tolerance=inputs['dedup_tolerance'],
+        std_ratio=inputs['outlier_std_ratio'],
+        neighbors=inputs['outlier_neighbors'],
+    )
+    perimeter = calculate_perimeter(coordinates)
+    height = building_height(coordinates)
+    elevations = [storey['elevation'] for storey in storey_list if storey['elevation'] is not None]
+    storeys = combine_storeys(storey_list, storey_geometry(coordinates, elevations), {}, {}, [])
+    _, storey_weights, storey_heights = storey_seismic_weights(storeys, members, dead_load)
+    return {
+        'roof_area': plan_area(coordinates),
+        'perimeter': perimeter,
+        'building_height': height,
+        'linear_load': calculate_linear_load(perimeter, uplift_pressures, down_pressures),
+        # Lists rather than arrays, so the batch summary line stays JSON
+        'storey_weights': storey_weights.tolist(),
+        'storey_heights': storey_heights.tolist(),
+        'structural_height': max([height] + storey_heights.tolist()),
+    }
+
+
+def evaluate_scenarios(measurements, scenarios, inputs=None):
+    """Loads for every scenario at once; returns the scenario columns plus RESULT_COLUMNS.
+
+    inputs supplies the ELF settings that cannot be swept (seismic_s1,
+    long_period_transition, period_system); DEFAULT_INPUTS otherwise.
+    """
+    from calculate import calculate_snow_load, calculate_ice_load, calculate_wall_moments
+    from Seismicwidget import compute_seismic_load
+    from Seismicaddons import PERIOD_PARAMETERS, equivalent_lateral_force
+    from pipeline import DEFAULT_INPUTS
+    inputs = dict(DEFAULT_INPUTS, **(inputs or {}))
+
+    count = len(scenarios[SWEEP_FIELDS[0]])
+    table = dict(scenarios)
+    table['total_snow_load'] = calculate_snow_load(measurements['roof_area'], scenarios['snow_load'])
+    table['total_ice_load'] = calculate_ice_load(measurements['roof_area'], scenarios['ice_load'])
+    table['seismic_load'] = compute_seismic_load(
+        scenarios['site_class'],
+        scenarios['importance_factor'],
+        scenarios['spectral_response_acceleration'],
+    )
+    table['wall_moment'] = calculate_wall_moments(scenarios['wind_speed'], measurements['building_height'])
+    table['linear_load'] = np.full(count, measurements['linear_load'], dtype=float)
+    # One call for every scenario: the scenario axis leads, the storeys run along the last
+    Ct, x = PERIOD_PARAMETERS[inputs['period_system']]
+    elf = equivalent_lateral_force(
+        measurements['storey_weights'], measurements['storey_heights'], scenarios['seismic_sds'],
+        scenarios['seismic_sd1'], scenarios['response_modification'], I=scenarios['importance_factor'],
+        TL=inputs['long_period_transition'], S1=inputs['seismic_s1'], hn=measurements['structural_height'], Ct=Ct, x=x)
+    table['base_shear'] = np.where(scenarios['seismic_sds'] > 0, np.round(elf['V'], 2), 0.0)
+    return table
+
+
+def sweep_path(ifc_path, output_dir=None):
+    """Returns the path of the _sweep.csv results table for an IFC file."""
+    base = os.path.splitext(ifc_path)[0]
+    if output_dir:
+        base = os.path.join(output_dir, os.path.basename(base))
+    return base + "_sweep.csv"
+
+
+def write_table(table, path):
+    """Writes the scenario table as CSV, one row per scenario."""
+    columns = SWEEP_FIELDS + RESULT_COLUMNS
+    np.savetxt(path, np.column_stack([table[column] for column in columns]),
+               delimiter=',', fmt='%.10g', header=','.join(columns), comments='')
+
+
+def run_sweep(ifc_path, ranges, inputs=None, cache=None, output_dir=None, low_memory=None):
+    """Parses ifc_path once, evaluates every scenario and writes the table.
+
+    ranges maps fields in SWEEP_FIELDS to arrays (or lists) of values;
+    inputs are the parse_inputs-style values for everything else. Returns
+    a summary dict with the measurements, scenario count and table path.
+    """
+    from pipeline import DEFAULT_INPUTS
+    inputs = dict(DEFAULT_INPUTS, **(inputs or {}))
+    measurements = model_measurements(ifc_path, inputs, cache=cache, low_memory=low_memory)
+    table = evaluate_scenarios(measurements, scenario_grid(ranges, inputs), inputs)
+    path = sweep_path(ifc_path, output_dir)
+    write_table(table, path)
+    return {
+        'file': ifc_path,
+        'sweep_csv': path,
+        'scenarios': len(table[SWEEP_FIELDS[0]]),
+        'swept': sorted(ranges),
+        'measurements': measurements,
+    }
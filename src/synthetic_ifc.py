@@ -0,0 +1,197 @@
+"""Generator for synthetic IFC4 buildings used as benchmark input.
+
+The STEP text is written directly, without ifcopenshell, so models with
+millions of cartesian points can be produced in seconds:
+
+    python synthetic_ifc.py model.ifc --storeys 10 --points 1000000
+
+Every model has a project/site/building/storey tree, beams and columns
+contained in their storeys with weight and length quantities and a
+cold-formed C section (IfcCShapeProfileDef in a material profile set), a roof with
+uplift/down pressure properties, IfcForceVector/IfcMomentVector records
+after each storey, wind quantities and a cloud of cartesian points laid
+out on the storey levels (lengths in inches, like the models we receive).
+"""
+import argparse
+import os
+
+import numpy as np
+
+_GUID_CHARS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_$'
+
+DEFAULT_PARAMS = {
+    'storeys': 3,
+    'beams_per_storey': 20,
+    'columns_per_storey': 12,
+    'points': 10000,
+    'vectors_per_storey': 4,
+    'storey_height': 120.0,
+    'length': 1200.0,
+    'width': 600.0,
+    'origin_points': 2,
+    'profiles': 3,
+    'seed': 0,
+}
+
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+        self.next_id = 1
+        self.guid_counter = 0
+
+    def add(self, entity, args):
+        entity_id = self.next_id
+        self.next_id += 1
+        self.f.write(f"#{entity_id}={entity}({args});\n")
+        return entity_id
+
+    def guid(self):
+        self.guid_counter += 1
+        value = self.guid_counter
+        chars = []
+        for _ in range(22):
+            chars.append(_GUID_CHARS[value & 63])
+            value >>= 6
+        return "'" + ''.join(reversed(chars)) + "'"
+
+
+def _refs(ids):
+    return '(' + ','.join(f"#{i}" for i in ids) + ')'
+
+
+def _num(value):
+    text = repr(float(value))
+    return text[:-1] if text.endswith('.0') else text
+
+
+def generate_ifc(path, **params):
+    """Writes a synthetic IFC4 model to path and returns a dict of entity counts.
+
+    Keyword arguments override DEFAULT_PARAMS.
+    """
+    unknown = set(params) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise TypeError(f"Unknown generator parameters: {', '.join(sorted(unknown))}")
+    p = dict(DEFAULT_PARAMS, **params)
+    rng = np.random.default_rng(p['seed'])
+    storeys = int(p['storeys'])
+    counts = {'IfcBuildingStorey': storeys, 'IfcBeam': 0, 'IfcColumn': 0, 'IfcCartesianPoint': 0,
+              'IfcForceVector': 0, 'IfcMomentVector': 0, 'IfcQuantityWeight': 0}
+
+    with open(path, 'w') as f:
+        f.write("ISO-10303-21;\nHEADER;\n")
+        f.write("FILE_DESCRIPTION(('ViewDefinition [CoordinationView]'),'2;1');\n")
+        f.write(f"FILE_NAME('{os.path.basename(path)}','2024-01-01T00:00:00',(''),(''),'synthetic_ifc','synthetic_ifc','');\n")
+        f.write("FILE_SCHEMA(('IFC4'));\nENDSEC;\nDATA;\n")
+        w = _Writer(f)
+
+        project = w.add('IFCPROJECT', f"{w.guid()},$,'Synthetic Project',$,$,$,$,$,$")
+        site = w.add('IFCSITE', f"{w.guid()},$,'Site',$,$,$,$,$,$,$,$,$,$,$")
+        building = w.add('IFCBUILDING', f"{w.guid()},$,'Building',$,$,$,$,$,$,$,$,$")
+        w.add('IFCRELAGGREGATES', f"{w.guid()},$,$,$,#{project},{_refs([site])}")
+        w.add('IFCRELAGGREGATES', f"{w.guid()},$,$,$,#{site},{_refs([building])}")
+
+        # C sections named like cold-formed steel studs (depth S flange - mils)
+        steel = w.add('IFCMATERIAL', "'Steel',$,$")
+        profile_sets = []
+        for i in range(int(p['profiles'])):
+            depth = 3.625 + 2.0 * i
+            name = f"{int(round(depth * 100))}S162-{43 + 11 * (i % 3)}"
+            profile = w.add('IFCCSHAPEPROFILEDEF', f".AREA.,'{name}',$,{_num(depth)},1.625,0.054,0.5,$")
+            material_profile = w.add('IFCMATERIALPROFILE', f"'{name}',$,#{steel},#{profile},$,$")
+            profile_sets.append(w.add('IFCMATERIALPROFILESET', f"'{name}',$,{_refs([material_profile])},$"))
+        members_by_profile = [[] for _ in profile_sets]
+
+        # Cartesian points spread over the storey levels, plus a few stray origin points
+        n_points = int(p['points'])
+        levels = rng.integers(0, storeys + 1, n_points) * p['storey_height']
+        xyz = np.column_stack([
+            np.round(rng.random(n_points) * p['length'], 2),
+            np.round(rng.random(n_points) * p['width'], 2),
+            levels,
+        ])
+        # Sorted by level so each storey's block of points follows its IfcBuildingStorey
+        xyz = xyz[np.argsort(xyz[:, 2], kind='stable')]
+        points_per_storey = np.array_split(xyz, storeys)
+
+        storey_ids = []
+        for level in range(storeys):
+            elevation = level * p['storey_height']
+            storey = w.add('IFCBUILDINGSTOREY', f"{w.guid()},$,'Level {level + 1}',$,$,$,$,$,.ELEMENT.,{_num(elevation)}")
+            storey_ids.append(storey)
+            for _ in range(int(p['vectors_per_storey'])):
+                fx, fy, fz = rng.normal(0, 1000, 3)
+                mx, my, mz = rng.normal(0, 5000, 3)
+                w.add('IFCFORCEVECTOR', f"{_num(round(fx, 2))},{_num(round(fy, 2))},{_num(round(fz, 2))}")
+                w.add('IFCMOMENTVECTOR', f"{_num(round(mx, 2))},{_num(round(my, 2))},{_num(round(mz, 2))}")
+                counts['IfcForceVector'] += 1
+                counts['IfcMomentVector'] += 1
+
+            elements = []
+            for cls, name, n in (('IFCBEAM', 'IfcBeam', p['beams_per_storey']), ('IFCCOLUMN', 'IfcColumn', p['columns_per_storey'])):
+                for i in range(int(n)):
+                    element = w.add(cls, f"{w.guid()},$,'{name[3:]} {level + 1}-{i + 1}',$,$,$,$,$,$")
+                    length = p['length'] / 4 if cls == 'IFCBEAM' else p['storey_height']
+                    weight = round(float(rng.uniform(50, 500)), 2)
+                    quantities = [
+                        w.add('IFCQUANTITYLENGTH', f"'Length',$,$,{_num(length)},$"),
+                        w.add('IFCQUANTITYWEIGHT', f"'Gross Weight',$,$,{_num(weight)},$"),
+                    ]
+                    counts['IfcQuantityWeight'] += 1
+                    qto = w.add('IFCELEMENTQUANTITY', f"{w.guid()},$,'Qto_BaseQuantities',$,$,{_refs(quantities)}")
+                    w.add('IFCRELDEFINESBYPROPERTIES', f"{w.guid()},$,$,$,{_refs([element])},#{qto}")
+                    if profile_sets:
+                        members_by_profile[int(rng.integers(len(profile_sets)))].append(element)
+                    elements.append(element)
+                counts[name] += int(n)
+            w.add('IFCRELCONTAINEDINSPATIALSTRUCTURE', f"{w.guid()},$,$,$,{_refs(elements)},#{storey}")
+
+            f.writelines(
+                f"#{w.next_id + i}=IFCCARTESIANPOINT(({_num(x)},{_num(y)},{_num(z)}));\n"
+                for i, (x, y, z) in enumerate(points_per_storey[level].tolist())
+            )
+            w.next_id += len(points_per_storey[level])
+        w.add('IFCRELAGGREGATES', f"{w.guid()},$,$,$,#{building},{_refs(storey_ids)}")
+
+        for profile_set, members in zip(profile_sets, members_by_profile):
+            if members:
+                w.add('IFCRELASSOCIATESMATERIAL', f"{w.guid()},$,$,$,{_refs(members)},#{profile_set}")
+
+        for _ in range(int(p['origin_points'])):
+            w.add('IFCCARTESIANPOINT', "(0.,0.,0.)")
+        counts['IfcCartesianPoint'] = n_points + int(p['origin_points'])
+
+        # Roof with pressure properties
+        roof = w.add('IFCROOF', f"{w.guid()},$,'Roof',$,$,$,$,$,$")
+        props = [
+            w.add('IFCPROPERTYSINGLEVALUE', f"'UpliftPressure',$,IFCPRESSUREMEASURE({_num(round(float(rng.uniform(5, 20)), 2))}),$"),
+            w.add('IFCPROPERTYSINGLEVALUE', f"'DownPressure',$,IFCPRESSUREMEASURE({_num(round(float(rng.uniform(20, 40)), 2))}),$"),
+        ]
+        pset = w.add('IFCPROPERTYSET', f"{w.guid()},$,'Pset_RoofLoads',$,{_refs(props)}")
+        w.add('IFCRELDEFINESBYPROPERTIES', f"{w.guid()},$,$,$,{_refs([roof])},#{pset}")
+        wind = [
+            w.add('IFCQUANTITYAREA', f"'Wind Pressure',$,$,{_num(round(float(rng.uniform(10, 40)), 2))},$"),
+            w.add('IFCQUANTITYLENGTH', f"'Wall Moment',$,$,{_num(round(float(rng.uniform(100, 900)), 2))},$"),
+        ]
+        wind_qto = w.add('IFCELEMENTQUANTITY', f"{w.guid()},$,'Qto_WindLoads',$,$,{_refs(wind)}")
+        w.add('IFCRELDEFINESBYPROPERTIES', f"{w.guid()},$,$,$,{_refs([roof])},#{wind_qto}")
+        w.add('IFCRELCONTAINEDINSPATIALSTRUCTURE', f"{w.guid()},$,$,$,{_refs([roof])},#{storey_ids[-1]}")
+
+        f.write("ENDSEC;\nEND-ISO-10303-21;\n")
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic IFC4 building.")
+    parser.add_argument('output')
+    for name, default in DEFAULT_PARAMS.items():
+        parser.add_argument('--' + name.replace('_', '-'), type=type(default), default=default)
+    args = vars(parser.parse_args(argv))
+    output = args.pop('output')
+    counts = generate_ifc(output, **args)
+    print(f"Wrote {output}: " + ', '.join(f"{k}={v}" for k, v in counts.items()))
+
+
+if __name__ == '__main__':
+    main()
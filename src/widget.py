@@ -15,68 +15,78 @@ def change():
         ctk.set_appearance_mode("dark")
         mode = "dark"
         # Clear text box if needed
-results = []
-def live_load_widget(floor_count):
-    live_loads = []
-    # Create the main window
-    root = ctk.CTk()
-    root.title("Live Load Input")
-    root.geometry("800x800")
-    root.resizable(False, False)
-    ctk.set_appearance_mode("system") 
-    # Create a scrollable frame
-    scrollable_frame = ctk.CTkScrollableFrame(master=root, width=480, height=480)
-    scrollable_frame.pack(pady=10, padx=10, fill="both", expand=True)
-
-    header_percentage = ctk.CTkLabel(scrollable_frame, text="Live Load Percentage",font=("Arial", 16, "bold"),)
-    header_percentage.grid(row=0, column=0, pady=50, padx=(20,0), sticky='w')
-
-    header_area = ctk.CTkLabel(scrollable_frame, text="Live Load Area (sq. ft.)",font=("Arial", 16, "bold"))
-    header_area.grid(row=0, column=1, pady=10, padx=(20,0), sticky='w')
-
-    # Loop through each floor and create input fields
-    for floor in range(1, floor_count + 1):
-        load_info = {}
-        load_info['floor'] = floor
-
-        # Add a label and entry for percentage load
-        percentage_label = ctk.CTkLabel(scrollable_frame, text=f"Floor {floor}:",font=("Arial", 12, "bold"))
-        percentage_label.grid(row=floor, column=0, pady=5, padx=10, sticky='e',)
-
-        percentage_entry = ctk.CTkEntry(scrollable_frame, placeholder_text="Enter %",font=("Arial", 12, "bold"))
-        percentage_entry.grid(row=floor, column=1, pady=5, padx=10, sticky='w',columnspan=1)
-        load_info['percentage_load'] = percentage_entry
-
-        # Add a label and entry for area load
-        area_entry = ctk.CTkEntry(scrollable_frame, placeholder_text="Enter sq. ft.",font=("Arial", 12, "bold"))
-        area_entry.grid(row=floor, column=2, pady=5, padx=20, sticky='w',columnspan=2)
-        load_info['area_load'] = area_entry
-        
-        percentage3 = load_info['percentage_load'].get()
-        print(percentage3)
-        live_loads.append(load_info)
-    
-
-    # Add a button to submit the inputs
-    submit_button = ctk.CTkButton(scrollable_frame, text="Submit", command=lambda: on_submit(live_loads, root),font=("Arial", 16, "bold"),fg_color='#677791',hover_color='#677791',)
-    submit_button.grid(row=floor_count + 1, columnspan=2, pady=20)
-    my_button = ctk.CTkButton(scrollable_frame, text='Change Mode', command=change, font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791', compound='left')
-    my_button.grid(row=12, columnspan=1, pady=(50, 0), padx=(0, 0))
-    root.mainloop()
-    return results
-    
-
-def on_submit(live_loads, root):
-    # Retrieve the input values and close the window
-    
-    for load_info in live_loads:
-        percentage = load_info['percentage_load'].get()
-        area = load_info['area_load'].get()
-        results.append({
-            "floor": load_info['floor'],
-            "percentage_load": percentage,
-            "area_load": area
-        })
-    root.destroy()
-    print(results) 
-    return results # You can process the results here
+
+
+class LiveLoadDialog(ctk.CTkToplevel):
+    """Per-floor live load form, opened as a window of the running app.
+
+    Submit reads the entries into this dialog's own list and passes it to
+    on_submit(live_loads); closing the window passes an empty list. The
+    dialog runs no mainloop of its own, so the caller's event loop keeps
+    going and several analyses can each have a form open.
+    """
+    def __init__(self, master, floor_count, on_submit, title="Live Load Input"):
+        super().__init__(master)
+        self.title(title)
+        self.geometry("800x800")
+        self.resizable(False, False)
+        self.on_submit = on_submit
+        self.live_loads = []
+        self.finished = False
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Create a scrollable frame
+        scrollable_frame = ctk.CTkScrollableFrame(master=self, width=480, height=480)
+        scrollable_frame.pack(pady=10, padx=10, fill="both", expand=True)
+
+        header_percentage = ctk.CTkLabel(scrollable_frame, text="Live Load Percentage",font=("Arial", 16, "bold"),)
+        header_percentage.grid(row=0, column=0, pady=50, padx=(20,0), sticky='w')
+
+        header_area = ctk.CTkLabel(scrollable_frame, text="Live Load Area (sq. ft.)",font=("Arial", 16, "bold"))
+        header_area.grid(row=0, column=1, pady=10, padx=(20,0), sticky='w')
+
+        # Loop through each floor and create input fields
+        self.entries = []
+        for floor in range(1, floor_count + 1):
+            # Add a label and entry for percentage load
+            percentage_label = ctk.CTkLabel(scrollable_frame, text=f"Floor {floor}:",font=("Arial", 12, "bold"))
+            percentage_label.grid(row=floor, column=0, pady=5, padx=10, sticky='e',)
+
+            percentage_entry = ctk.CTkEntry(scrollable_frame, placeholder_text="Enter %",font=("Arial", 12, "bold"))
+            percentage_entry.grid(row=floor, column=1, pady=5, padx=10, sticky='w',columnspan=1)
+
+            # Add a label and entry for area load
+            area_entry = ctk.CTkEntry(scrollable_frame, placeholder_text="Enter sq. ft.",font=("Arial", 12, "bold"))
+            area_entry.grid(row=floor, column=2, pady=5, padx=20, sticky='w',columnspan=2)
+
+            self.entries.append((floor, percentage_entry, area_entry))
+
+        # Add a button to submit the inputs
+        submit_button = ctk.CTkButton(scrollable_frame, text="Submit", command=self.submit,font=("Arial", 16, "bold"),fg_color='#677791',hover_color='#677791',)
+        submit_button.grid(row=floor_count + 1, columnspan=2, pady=20)
+        my_button = ctk.CTkButton(scrollable_frame, text='Change Mode', command=change, font=("Arial", 16, "bold"), fg_color='#677791', hover_color='#677791', compound='left')
+        my_button.grid(row=12, columnspan=1, pady=(50, 0), padx=(0, 0))
+        # Keep the form in front of the main window until it is answered
+        self.transient(master)
+        self.lift()
+        self.focus_force()
+
+    def submit(self):
+        # Retrieve the input values and close the window
+        self.live_loads = [
+            {"floor": floor, "percentage_load": percentage.get(), "area_load": area.get()}
+            for floor, percentage, area in self.entries
+        ]
+        self._finish()
+
+    def close(self):
+        """Closes the form without loads, as the window's close button does."""
+        self.live_loads = []
+        self._finish()
+
+    def _finish(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.destroy()
+        self.on_submit(list(self.live_loads))
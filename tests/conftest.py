@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The modules live flat in src/ and import each other by bare name
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'src'))
+
+from synthetic_ifc import generate_ifc  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def synthetic_model(tmp_path_factory):
+    """(path, entity counts) of a small generated IFC4 model shared by the session."""
+    path = str(tmp_path_factory.mktemp('models') / 'synthetic.ifc')
+    counts = generate_ifc(path, storeys=3, beams_per_storey=6, columns_per_storey=4, points=3000)
+    return path, counts
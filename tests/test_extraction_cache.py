@@ -0,0 +1,43 @@
+import os
+
+from extraction_cache import ExtractionCache
+
+
+def age(cache, name, seconds_ago):
+    path = cache._entry_path('hash', name)
+    stamp = os.stat(path).st_mtime - seconds_ago
+    os.utime(path, (stamp, stamp))
+
+
+def test_round_trip_and_miss(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    cache.put('hash', 'storeys', [{'name': 'Level 1'}])
+    assert cache.get('hash', 'storeys') == [{'name': 'Level 1'}]
+    assert cache.get('hash', 'missing', default='none') == 'none'
+    assert cache.get('other', 'storeys') is None
+
+
+def test_eviction_drops_least_recently_used_entries(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=10 ** 9)
+    payload = b'x' * 4000
+    for name in ('a', 'b', 'c'):
+        cache.put('hash', name, payload)
+    age(cache, 'a', 30)
+    age(cache, 'b', 20)
+    age(cache, 'c', 10)
+    # Reading a refreshes it, so b is now the oldest
+    assert cache.get('hash', 'a') == payload
+
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert not cache.has('hash', 'b')
+    assert cache.has('hash', 'a') and cache.has('hash', 'c')
+    assert cache.size() <= cache.max_bytes
+
+
+def test_vanished_entries_are_misses(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    cache.put('hash', 'a', 1)
+    os.remove(cache._entry_path('hash', 'a'))
+    assert cache.get('hash', 'a') is None
+    assert cache.entries() == []
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+import coordinate_store
+from calculate import calculate_area_from_coords, calculate_perimeter, plan_area, storey_geometry
+from coordinate_store import write_store
+
+
+@pytest.fixture
+def building():
+    # A box of grid points: its hull has large flat faces that qhull may
+    # triangulate differently depending on which points it is given
+    rng = np.random.default_rng(5)
+    x, y, z = np.meshgrid(np.arange(0, 600, 25.0), np.arange(0, 360, 20.0), np.arange(0, 480, 40.0))
+    grid = np.column_stack([x.ravel(), y.ravel(), z.ravel()])
+    points = np.vstack([grid, rng.uniform([0, 0, 0], [575, 340, 440], (3000, 3))])
+    rng.shuffle(points)
+    return points
+
+
+@pytest.fixture
+def store(building, tmp_path, monkeypatch):
+    monkeypatch.setattr(coordinate_store, 'CHUNK_POINTS', 500)
+    return write_store(str(tmp_path / 'points.bin'), np.array_split(building, 7))
+
+
+def test_store_and_array_measure_the_same_outline(building, store):
+    assert calculate_perimeter(store) == calculate_perimeter(building)
+    assert calculate_area_from_coords(store) == calculate_area_from_coords(building)
+    assert plan_area(store) == plan_area(building)
+
+
+def test_perimeter_does_not_depend_on_point_order(building):
+    assert calculate_perimeter(building[::-1]) == calculate_perimeter(building)
+
+
+def test_storey_geometry_matches_between_store_and_array(building, store):
+    elevations = [0.0, 120.0, 240.0, 360.0]
+    for in_memory, streamed in zip(storey_geometry(building, elevations), storey_geometry(store, elevations)):
+        assert streamed['points'] == in_memory['points']
+        assert streamed['area'] == in_memory['area']
+        assert streamed['perimeter'] == in_memory['perimeter']
+        assert np.array_equal(streamed['footprint'], in_memory['footprint'])
+
+
+def test_storey_bands_are_half_open_and_clip_below_the_lowest():
+    from calculate import storey_bands
+    z = [-5.0, 0.0, 119.9, 120.0, 240.0, 999.0]
+    assert storey_bands(z, [0.0, 120.0, 240.0]).tolist() == [0, 0, 0, 1, 2, 2]
+
+
+def l_shaped_roof(step=2.0):
+    # An L of 40 x 40 with the 20 x 20 corner cut away, on a regular grid
+    x, y = np.meshgrid(np.arange(0, 40 + step / 2, step), np.arange(0, 40 + step / 2, step))
+    xy = np.column_stack([x.ravel(), y.ravel()])
+    xy = xy[(xy[:, 0] <= 20) | (xy[:, 1] <= 20)]
+    low = np.column_stack([xy, np.zeros(len(xy))])
+    high = np.column_stack([xy, np.full(len(xy), 30.0)])
+    return np.vstack([low, high])
+
+
+def test_roof_outline_hull_and_alpha_shape():
+    from calculate import calculate_roof_perimeter, roof_points
+    points = l_shaped_roof()
+    assert len(roof_points(points)) == len(points) // 2
+    # The hull cuts the notch off with one diagonal
+    hull = calculate_roof_perimeter(points, outline='hull')
+    assert hull == pytest.approx(40 + 40 + 20 + 20 + np.hypot(20, 20), abs=0.01)
+    # The alpha shape follows the notch, so it measures about the bounding
+    # square's 160; grid cells are cocircular, and Delaunay may cut a corner
+    # or two by a cell diagonal
+    concave = calculate_roof_perimeter(points, outline='concave')
+    assert 160 - 2 * (4 - np.hypot(2, 2)) - 0.01 <= concave <= 160
+    with pytest.raises(ValueError):
+        calculate_roof_perimeter(points, outline='star')
+
+
+def test_roof_points_match_between_store_and_array(building, store):
+    from calculate import calculate_roof_perimeter
+    for outline in ('hull', 'concave'):
+        assert calculate_roof_perimeter(store, outline=outline) == calculate_roof_perimeter(building, outline=outline)
@@ -0,0 +1,11 @@
+import pytest
+
+from IFCAnalyzer import IFCAnalyzer
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_session_methods_open_the_model_on_first_use(synthetic_model, low_memory):
+    path, counts = synthetic_model
+    with IFCAnalyzer(path, low_memory=low_memory) as session:
+        assert session.extract_element_counts() == {'IfcBeam': counts['IfcBeam'], 'IfcColumn': counts['IfcColumn']}
+        assert session.calculate_total_weight() > 0
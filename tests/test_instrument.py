@@ -0,0 +1,42 @@
+import threading
+
+from instrument import StageRecorder
+
+
+def test_stages_run_alone_have_their_own_cpu_time():
+    recorder = StageRecorder(memory=False).start(['a', 'b'])
+    with recorder.stage('a'):
+        pass
+    with recorder.stage('b'):
+        pass
+    assert [record['cpu_scope'] for record in recorder.stages] == ['stage', 'stage']
+    assert not any('process-wide' in line for line in recorder.report_lines())
+
+
+def test_overlapping_stages_are_labelled_process_wide():
+    recorder = StageRecorder(memory=False).start()
+    inside, release = threading.Event(), threading.Event()
+
+    def outer():
+        with recorder.stage('outer'):
+            inside.set()
+            release.wait(5)
+
+    thread = threading.Thread(target=outer)
+    thread.start()
+    inside.wait(5)
+    with recorder.stage('inner'):
+        pass
+    release.set()
+    thread.join()
+    assert {record['stage']: record['cpu_scope'] for record in recorder.stages} == {'inner': 'process', 'outer': 'process'}
+    assert all('CPU, process-wide' in line for line in recorder.report_lines())
+
+
+def test_report_lines_name_the_stages_not_recorded_yet():
+    recorder = StageRecorder(memory=False).start(['parse', 'aux_pdf', 'report'])
+    with recorder.stage('parse'):
+        pass
+    lines = recorder.report_lines()
+    assert lines[0].startswith('parse:')
+    assert lines[-1].endswith('aux_pdf, report')
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from IFCAnalyzer import IFCAnalyzer
+from model_export import export_model, is_model_export, load_model, write_model
+
+
+@pytest.fixture(scope='module')
+def model_values(synthetic_model):
+    from pipeline import MODEL_GRAPH
+    session = IFCAnalyzer(synthetic_model[0])
+    values, _ = MODEL_GRAPH.run({'session': session})
+    values.pop('session')
+    return values, session.file_hash
+
+
+def same(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, (np.ndarray, float)):
+        return np.allclose(a, b, equal_nan=True)
+    return a == b
+
+
+def test_export_round_trip(tmp_path, model_values):
+    values, file_hash = model_values
+    path = str(tmp_path / 'synthetic.npz')
+    loaded = load_model(write_model(path, values, file_hash, 'synthetic.ifc'))
+    assert loaded.pop('file_hash') == file_hash
+    assert loaded.pop('source') == 'synthetic.ifc'
+    assert loaded.keys() == values.keys()
+    for name in values:
+        assert same(values[name], loaded[name]), name
+
+
+def test_analysis_of_an_export_matches_the_model(tmp_path, synthetic_model):
+    from pipeline import run_analysis
+    path, _ = synthetic_model
+    export = export_model(path, path=str(tmp_path / 'synthetic.npz'))['export']
+    assert is_model_export(export) and not is_model_export(path)
+    (tmp_path / 'model').mkdir()
+    (tmp_path / 'export').mkdir()
+    from_model = run_analysis(path, {}, live_loads=[], output_dir=str(tmp_path / 'model'))
+    from_export = run_analysis(export, {}, live_loads=[], output_dir=str(tmp_path / 'export'))
+    for name in ('point_count', 'areas', 'perimeter', 'roof_perimeter', 'building_height', 'dead_load',
+                 'total_weight', 'member_count', 'sections', 'seismic_elf', 'floor_count'):
+        assert same(from_model[name], from_export[name]), name
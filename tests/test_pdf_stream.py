@@ -0,0 +1,39 @@
+import re
+
+import numpy as np
+
+from pdf_stream import StreamPDF
+
+
+def write_sample(path):
+    with StreamPDF(str(path)) as pdf:
+        pdf.image_page(np.zeros((20, 30, 3), dtype=np.uint8))
+        pdf.lines("Notes", [f"line {i} (with parentheses)" for i in range(200)])
+        rows = pdf.table("Members", ["Name", "Weight"], ([f"B{i}", i * 1.5] for i in range(500)), widths=[20, 10])
+    return rows
+
+
+def test_xref_offsets_point_at_their_objects(tmp_path):
+    path = tmp_path / 'out.pdf'
+    assert write_sample(path) == 500
+    data = path.read_bytes()
+
+    startxref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', data).group(1))
+    assert data[startxref:].startswith(b'xref\n')
+    count = int(re.match(rb'xref\n0 (\d+)\n', data[startxref:]).group(1))
+    entries = re.findall(rb'(\d{10}) (\d{5}) ([nf]) \n', data[startxref:])
+    assert len(entries) == count
+    assert entries[0] == (b'0000000000', b'65535', b'f')
+    for number, (offset, _, _) in enumerate(entries[1:], start=1):
+        assert data[int(offset):].startswith(b'%d 0 obj\n' % number)
+    assert re.search(rb'/Size %d /Root 1 0 R' % count, data)
+
+
+def test_page_tree_lists_every_page(tmp_path):
+    path = tmp_path / 'out.pdf'
+    write_sample(path)
+    data = path.read_bytes()
+    kids = re.search(rb'/Type /Pages /Kids \[([^\]]*)\] /Count (\d+)', data)
+    pages = re.findall(rb'(\d+) 0 obj\n<< /Type /Page ', data)
+    assert int(kids.group(2)) == len(pages) > 3
+    assert re.findall(rb'(\d+) 0 R', kids.group(1)) == pages
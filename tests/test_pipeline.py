@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+import coordinate_store
+import point_cleanup
+from pipeline import run_analysis
+
+# Paths and timings, which differ between any two runs
+VOLATILE = {'file', 'plot_pdf', 'aux_pdf', 'report_pdf', 'elapsed_s', 'reused_stages'}
+
+
+def same(a, b):
+    if isinstance(a, dict):
+        return isinstance(b, dict) and a.keys() == b.keys() and all(same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)):
+        return isinstance(b, (list, tuple)) and len(a) == len(b) and all(same(x, y) for x, y in zip(a, b))
+    if isinstance(a, float):
+        return a == pytest.approx(b)
+    return a == b
+
+
+@pytest.mark.parametrize('dedup_tolerance', [0.0, 2.0])
+def test_low_memory_matches_in_memory(tmp_path, monkeypatch, synthetic_model, dedup_tolerance):
+    # Many chunks and slabs even for a few thousand points
+    monkeypatch.setattr(coordinate_store, 'CHUNK_POINTS', 500)
+    monkeypatch.setattr(point_cleanup, 'SLAB_POINTS', 700)
+    path, counts = synthetic_model
+    inputs = {'dedup_tolerance': dedup_tolerance, 'seismic_sds': 1.0, 'seismic_sd1': 0.6}
+    summaries = {}
+    for low_memory in (False, True):
+        output_dir = tmp_path / str(low_memory)
+        output_dir.mkdir()
+        summaries[low_memory] = run_analysis(path, inputs, live_loads=[], output_dir=str(output_dir),
+                                             low_memory=low_memory)
+    in_memory, streamed = summaries[False], summaries[True]
+    assert in_memory.keys() == streamed.keys()
+    for name in in_memory.keys() - VOLATILE:
+        assert same(in_memory[name], streamed[name]), name
+    assert in_memory['floor_count'] == counts['IfcBuildingStorey']
+    assert in_memory['seismic_elf'] is not None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from scipy.spatial import cKDTree
+
+import coordinate_store
+import point_cleanup
+from point_cleanup import clean_points, remove_duplicates
+
+
+@pytest.fixture
+def cloud():
+    rng = np.random.default_rng(3)
+    points = rng.uniform(0, 100, (4000, 3))
+    points = np.vstack([points, points[:1000] + rng.normal(0, 0.02, (1000, 3)), points[:50], np.zeros((3, 3))])
+    rng.shuffle(points)
+    return points
+
+
+@pytest.fixture
+def small_slabs(monkeypatch):
+    # Many chunks and slabs even for a few thousand points
+    monkeypatch.setattr(coordinate_store, 'CHUNK_POINTS', 700)
+    monkeypatch.setattr(point_cleanup, 'SLAB_POINTS', 900)
+
+
+def test_exact_duplicates_keep_the_first_in_input_order():
+    points = np.array([[1.0, 2, 3], [4, 5, 6], [1, 2, 3], [4, 5, 6], [7, 8, 9]])
+    assert remove_duplicates(points).tolist() == [0, 1, 4]
+
+
+@pytest.mark.parametrize('tolerance', [0.05, 0.5, 3.0])
+def test_tolerance_keeps_points_apart_and_covers_the_dropped(cloud, tolerance):
+    kept = cloud[remove_duplicates(cloud, tolerance)]
+    assert not cKDTree(kept).query_pairs(tolerance)
+    distances, _ = cKDTree(kept).query(cloud, k=1)
+    assert distances.max() <= tolerance
+
+
+def test_points_across_a_grid_cell_edge_are_merged():
+    # 0.99 and 1.01 fall in different cells of a 1.0 grid but are 0.02 apart
+    points = np.array([[0.99, 0, 0], [1.01, 0, 0], [5.0, 0, 0]])
+    assert remove_duplicates(points, 1.0).tolist() == [0, 2]
+
+
+def test_a_point_exactly_at_the_tolerance_is_a_duplicate():
+    points = np.array([[0.0, 0, 0], [0.5, 0, 0], [1.0, 0, 0]])
+    assert remove_duplicates(points, 0.5).tolist() == [0, 2]
+
+
+@pytest.mark.parametrize('settings', [
+    {},
+    {'remove_origin': True},
+    {'tolerance': 0.05},
+    {'tolerance': 3.0},
+    {'std_ratio': 1.0, 'neighbors': 4},
+])
+def test_store_cleanup_matches_in_memory(tmp_path, cloud, small_slabs, settings):
+    store = coordinate_store.write_store(str(tmp_path / 'points.npy'), np.array_split(cloud, 5))
+
+    expected, expected_report = clean_points(cloud, **settings)
+    cleaned, report = clean_points(store, **settings)
+
+    assert coordinate_store.is_store(cleaned)
+    np.testing.assert_array_equal(np.asarray(cleaned), expected)
+    assert report == expected_report
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from pipeline import DEFAULT_INPUTS, _seismic_elf, storey_seismic_weights
+from sweep import evaluate_scenarios, scenario_grid
+
+
+def storey(floor, elevation, area):
+    return {'floor': floor, 'name': f'Level {floor}', 'elevation': elevation, 'area': area}
+
+
+@pytest.fixture
+def storeys():
+    return [storey(1, 0.0, 100.0), storey(2, 12.0, 100.0), storey(3, 24.0, 200.0)]
+
+
+@pytest.fixture
+def members():
+    return [{'storey': 'Level 1', 'weight': 30.0}, {'storey': 'Level 2', 'weight': 10.0},
+            {'storey': 'Level 3', 'weight': 20.0}]
+
+
+def test_base_storey_weight_moves_to_the_storeys_above(storeys, members):
+    indices, weights, heights = storey_seismic_weights(storeys, members, dead_load=100.0)
+    assert indices == [1, 2]
+    assert heights.tolist() == [12.0, 24.0]
+    # The 40 the members leave over goes 10:10:20 by area, so the levels weigh
+    # 40, 20 and 40; Level 1's 40 is spread 1:2 over the other two
+    assert weights == pytest.approx([100 / 3, 200 / 3])
+    assert weights.sum() == pytest.approx(100.0)
+
+
+def test_no_storey_above_the_base_gives_no_elf(members):
+    storeys = [storey(1, 3.0, 100.0), storey(2, 3.0, 50.0)]
+    indices, weights, heights = storey_seismic_weights(storeys, members, dead_load=100.0)
+    assert indices == [] and not len(weights) and not len(heights)
+    assert _seismic_elf(storeys, members, 100.0, 10.0, 1.0, 1.0, 0.6, 0.0, 8, 8.0, 'other') is None
+
+
+def test_pipeline_and_sweep_use_the_same_weight(storeys, members):
+    elf = _seismic_elf(storeys, members, 100.0, 30.0, 1.0, 1.0, 0.6, 0.0, 8, 8.0, 'other')
+    assert elf['W'] == pytest.approx(100.0)
+    assert [row['floor'] for row in elf['storeys']] == [2, 3]
+
+    _, weights, heights = storey_seismic_weights(storeys, members, 100.0)
+    measurements = {'roof_area': 200.0, 'building_height': 30.0, 'linear_load': 0.0,
+                    'storey_weights': weights.tolist(), 'storey_heights': heights.tolist(),
+                    'structural_height': 30.0}
+    inputs = dict(DEFAULT_INPUTS, seismic_sds=1.0, seismic_sd1=0.6, response_modification=8, importance_factor=1.0)
+    table = evaluate_scenarios(measurements, scenario_grid({}, inputs), inputs)
+    assert np.allclose(table['base_shear'], elf['V'])
+
+
+def test_elf_distributes_the_base_shear_over_the_storeys():
+    from Seismicaddons import equivalent_lateral_force
+    weights, heights = np.array([400.0, 350.0, 250.0]), np.array([12.0, 24.0, 36.0])
+    elf = equivalent_lateral_force(weights, heights, SDS=1.0, SD1=0.6, R=8, I=1.25)
+    assert elf['W'] == pytest.approx(1000.0)
+    assert elf['V'] == pytest.approx(elf['Cs'] * 1000.0)
+    assert elf['Cvx'].sum() == pytest.approx(1.0)
+    assert elf['Fx'].sum() == pytest.approx(elf['V'])
+    # Storey shear accumulates from the top down and reaches V at the base
+    assert elf['Vx'] == pytest.approx(np.cumsum(elf['Fx'][::-1])[::-1])
+    assert elf['Vx'][0] == pytest.approx(elf['V'])
+    wh = weights * heights ** elf['k']
+    assert elf['Cvx'] == pytest.approx(wh / wh.sum())
+
+
+def test_elf_broadcasts_over_load_cases():
+    from Seismicaddons import equivalent_lateral_force, stack_storeys
+    weights, heights = stack_storeys([([400.0, 350.0, 250.0], [12.0, 24.0, 36.0]), ([500.0], [15.0])])
+    sds = np.array([[0.5], [1.0]])
+    elf = equivalent_lateral_force(weights, heights, SDS=sds, SD1=0.6, R=8)
+    assert elf['Fx'].shape == (2, 2, 3)
+    for case in range(2):
+        for building in range(2):
+            single = equivalent_lateral_force(weights[building], heights[building], SDS=sds[case, 0], SD1=0.6, R=8)
+            assert elf['V'][case, building] == pytest.approx(single['V'])
+            assert elf['Fx'][case, building] == pytest.approx(single['Fx'])
+
+
+def test_sds_without_sd1_is_rejected():
+    from pipeline import parse_inputs
+    with pytest.raises(ValueError, match='seismic sd1'):
+        parse_inputs({'seismic_sds': 1.0})
+    with pytest.raises(ValueError, match='seismic sd1'):
+        parse_inputs({'seismic_sds': '1.0', 'seismic_sd1': ''})
+    assert parse_inputs({'seismic_sds': 1.0, 'seismic_sd1': 0.6})['seismic_sd1'] == 0.6
+    # With the ELF off, SD1 may stay at its default
+    assert parse_inputs({'seismic_sd1': 0.0})['seismic_sds'] == 0.0
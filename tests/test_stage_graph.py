@@ -0,0 +1,65 @@
+import pytest
+
+from extraction_cache import ExtractionCache
+from stage_graph import Stage, StageGraph, StageMemo
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def graph(calls):
+    def double(x):
+        calls.append('double')
+        return 2 * x
+
+    def offset(doubled, y):
+        calls.append('offset')
+        return doubled + y
+
+    return StageGraph([
+        Stage('double', double, ['x'], ['doubled']),
+        Stage('offset', offset, ['doubled', 'y'], ['result']),
+    ])
+
+
+def test_memo_reuses_stages_whose_inputs_are_unchanged(tmp_path, graph, calls):
+    memo = StageMemo(ExtractionCache(str(tmp_path)), 'hash')
+    values, reused = graph.run({'x': 3, 'y': 1}, memo=memo)
+    assert values['result'] == 7 and reused == []
+
+    calls.clear()
+    values, reused = graph.run({'x': 3, 'y': 1}, memo=memo)
+    assert values['result'] == 7
+    assert sorted(reused) == ['double', 'offset'] and calls == []
+
+    # Only the stage downstream of the changed seed runs again
+    values, reused = graph.run({'x': 3, 'y': 5}, memo=memo)
+    assert values['result'] == 11
+    assert reused == ['double'] and calls == ['offset']
+
+
+def test_memoized_file_outputs_rerun_when_the_file_changes(tmp_path):
+    target = tmp_path / 'out.txt'
+    runs = []
+
+    def write(text):
+        runs.append(text)
+        target.write_text(text)
+        return str(target)
+
+    graph = StageGraph([Stage('write', write, ['text'], ['path'], files=['path'])])
+    memo = StageMemo(ExtractionCache(str(tmp_path / 'cache')), 'hash')
+    graph.run({'text': 'a'}, memo=memo)
+    graph.run({'text': 'a'}, memo=memo)
+    assert runs == ['a']
+    target.write_text('edited by hand')
+    graph.run({'text': 'a'}, memo=memo)
+    assert runs == ['a', 'a']
+
+
+def test_duplicate_outputs_are_rejected():
+    with pytest.raises(ValueError):
+        StageGraph([Stage('a', int, ['x'], ['y']), Stage('b', int, ['x'], ['y'])])
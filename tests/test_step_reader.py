@@ -0,0 +1,46 @@
+from collections import Counter
+
+import pytest
+
+from step_reader import iter_buffer_entities, iter_entities, read_schema, split_args, unquote
+
+BUFFER = b"""ISO-10303-21;
+HEADER;
+FILE_SCHEMA(('IFC4'));
+ENDSEC;
+DATA;
+#1=IFCBUILDINGSTOREY('0001',$,
+  'Level; 1',$,$,
+  $,$,$,.ELEMENT.,120.);
+#2 = IFCBEAM('0002',$,'it''s; a beam',$,$,$,$,$,$);
+#3=IFCLABEL('IFCBEAM(;)');
+#4=IFCBEAMTYPE('0004',$,'type',$,$,$,$,$,$,.BEAM.);
+ENDSEC;
+END-ISO-10303-21;
+"""
+
+
+def test_records_span_lines_and_keep_semicolons_inside_strings():
+    records = list(iter_buffer_entities(BUFFER))
+    assert [(entity_id, entity_type) for entity_id, entity_type, _ in records] == [
+        (1, 'IFCBUILDINGSTOREY'), (2, 'IFCBEAM'), (3, 'IFCLABEL'), (4, 'IFCBEAMTYPE')]
+    storey_args = split_args(records[0][2])
+    assert unquote(storey_args[2]) == 'Level; 1'
+    assert storey_args[-1] == b'120.'
+    assert unquote(split_args(records[1][2])[2]) == "it's; a beam"
+
+
+@pytest.mark.parametrize('types', [['IfcBeam'], ['IfcBeam', 'IfcA', 'IfcB', 'IfcC', 'IfcD', 'IfcE']])
+def test_type_filter_skips_strings_and_longer_names(types):
+    # One type uses substring search, six use the alternation pattern
+    assert [entity_id for entity_id, _, _ in iter_buffer_entities(BUFFER, types)] == [2]
+
+
+def test_generated_model_entity_counts(synthetic_model):
+    path, counts = synthetic_model
+    assert read_schema(path) == 'IFC4'
+    found = Counter(entity_type for _, entity_type, _ in iter_entities(path))
+    for entity_type, count in counts.items():
+        assert found[entity_type.upper()] == count
+    beams = list(iter_entities(path, ['IfcBeam']))
+    assert len(beams) == counts['IfcBeam']
@@ -0,0 +1,36 @@
+import ifcopenshell
+import ifcopenshell.guid
+import pytest
+
+from IFCAnalyzer import IFCAnalyzer
+from read_methods import extract_element_counts, extract_storeys
+
+
+def write_standard_case_model(path):
+    """One storey holding an IfcBeam, an IfcBeamStandardCase and an IfcColumnStandardCase."""
+    model = ifcopenshell.file(schema='IFC4')
+    new_id = ifcopenshell.guid.new
+    model.create_entity('IfcProject', GlobalId=new_id(), Name='Project')
+    storey = model.create_entity('IfcBuildingStorey', GlobalId=new_id(), Name='Level 1', Elevation=120.0)
+    elements = [
+        model.create_entity('IfcBeam', GlobalId=new_id(), Name='B1'),
+        model.create_entity('IfcBeamStandardCase', GlobalId=new_id(), Name='B2'),
+        model.create_entity('IfcColumnStandardCase', GlobalId=new_id(), Name='C1'),
+    ]
+    model.create_entity('IfcRelContainedInSpatialStructure', GlobalId=new_id(),
+                        RelatedElements=elements, RelatingStructure=storey)
+    model.write(str(path))
+    return path
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_storey_counts_include_standard_case_subtypes(tmp_path, low_memory):
+    path = str(write_standard_case_model(tmp_path / 'standard_case.ifc'))
+    session = IFCAnalyzer(path, low_memory=low_memory)
+
+    storeys = extract_storeys(session)
+
+    assert len(storeys) == 1
+    assert storeys[0]['elevation'] == 10.0
+    assert storeys[0]['element_counts'] == {'IfcBeam': 2, 'IfcColumn': 1}
+    assert storeys[0]['element_counts'] == extract_element_counts(session)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from pipeline import DEFAULT_INPUTS, parse_inputs
+from sweep import SWEEP_FIELDS, parse_sweep_arg, parse_values, scenario_grid
+
+
+def test_ranges_include_their_stop():
+    assert parse_values('90:150:5').tolist() == list(range(90, 155, 5))
+    assert parse_values('0:0.3:0.1') == pytest.approx([0.0, 0.1, 0.2, 0.3])
+
+
+def test_lists_and_single_values():
+    assert parse_values('0, 20,30,40,').tolist() == [0, 20, 30, 40]
+    assert parse_values(12).tolist() == [12.0]
+
+
+@pytest.mark.parametrize('text', ['1:5', '1:5:0', '5:1:-1', 'a,b'])
+def test_bad_values_are_rejected(text):
+    with pytest.raises(ValueError):
+        parse_values(text)
+
+
+def test_sweep_arg_names_a_sweep_field():
+    field, values = parse_sweep_arg('wind-speed=100,120')
+    assert field == 'wind_speed' and values.tolist() == [100.0, 120.0]
+    with pytest.raises(ValueError):
+        parse_sweep_arg('perimeter=1,2')
+    with pytest.raises(ValueError):
+        parse_sweep_arg('wind_speed')
+
+
+def test_grid_has_every_combination():
+    grid = scenario_grid({'wind_speed': [100, 120, 140], 'snow_load': [0, 20]}, DEFAULT_INPUTS)
+    assert set(grid) == set(SWEEP_FIELDS)
+    assert all(len(column) == 6 for column in grid.values())
+    pairs = set(zip(grid['wind_speed'].tolist(), grid['snow_load'].tolist()))
+    assert pairs == {(w, s) for w in (100.0, 120.0, 140.0) for s in (0.0, 20.0)}
+    assert np.all(grid['ice_load'] == float(DEFAULT_INPUTS['ice_load']))
+
+
+@pytest.mark.parametrize('arg, field', [
+    ('response_modification=0,8', 'response modification'),
+    ('seismic_sds=-0.5,1', 'seismic sds'),
+    ('seismic_sd1=-1', 'seismic sd1'),
+    ('snow_load=-10:10:5', 'snow load'),
+    ('wind_speed=nan', 'wind speed'),
+])
+def test_sweep_values_are_checked_like_parse_inputs(arg, field):
+    with pytest.raises(ValueError, match=field):
+        parse_sweep_arg(arg)
+    with pytest.raises(ValueError, match=field):
+        parse_inputs({arg.partition('=')[0]: arg.partition('=')[2].split(',')[0].split(':')[0]})
+
+
+def test_grid_rejects_scenarios_out_of_range():
+    with pytest.raises(ValueError, match='response modification'):
+        scenario_grid({'response_modification': [8, 0]}, DEFAULT_INPUTS)
+    # Each scenario with SDS set needs SD1
+    inputs = dict(DEFAULT_INPUTS, seismic_sd1=0.0)
+    with pytest.raises(ValueError, match='seismic sd1'):
+        scenario_grid({'seismic_sds': [0.0, 1.0]}, inputs)
+    assert len(scenario_grid({'seismic_sds': [0.0, 1.0]}, dict(inputs, seismic_sd1=0.6))['seismic_sds']) == 2